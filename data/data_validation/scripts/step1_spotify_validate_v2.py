@@ -6,7 +6,8 @@ Filters out bad matches that don't actually match the query
 import json
 import time
 import os
-from difflib import SequenceMatcher
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
 try:
@@ -17,6 +18,11 @@ except ImportError:
     print('Run: pip install spotipy --break-system-packages')
     exit(1)
 
+sys.path.append(str(Path(__file__).parent.parent.parent.parent / 'scrapers' / 'shared'))
+from spotify_cache import CachedSpotify
+from rate_limit import AdaptiveRateLimiter
+import track_resolver
+
 load_dotenv(r'C:\Users\sw13t\Desktop\Coding\CuseAI\SpotifyMSP\Spotify-MCP-Server-Fall-2025\data\spotify\.env')
 
 class SpotifyValidatorV2:
@@ -27,77 +33,64 @@ class SpotifyValidatorV2:
         if not client_id or not client_secret:
             raise ValueError('Spotify credentials not found')
 
-        self.sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
+        # Cached + throttled: repeat queries never hit the API (or the 0.35s sleep)
+        self.sp = CachedSpotify(spotipy.Spotify(auth_manager=SpotifyClientCredentials(
             client_id=client_id,
             client_secret=client_secret
-        ))
-        self.request_count = 0
+        )), limiter=AdaptiveRateLimiter('Spotify', rate=1 / 0.35, capacity=1))
+        # Songs resolved before (tapestry, archives, scrapes) are matched without an API call
+        self.resolver = track_resolver.TrackResolver()
+        self.request_count = 0  # Real API calls only (cache hits are free)
+        self.last_pause_at = 0
         self.batch_size = 500
 
     def calculate_similarity(self, str1, str2):
         """Calculate similarity between two strings (0.0 to 1.0)"""
-        if not str1 or not str2:
-            return 0.0
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+        return track_resolver.similarity(str1, str2)
 
     def calculate_confidence(self, original_artist, original_song, matched_artist, matched_song):
         """
-        Calculate confidence score for a match
+        Calculate confidence score for a match (shared with the local track resolver)
         Returns: (confidence_score, explanation)
         """
-        # Calculate similarities
-        artist_sim = self.calculate_similarity(original_artist, matched_artist)
-        song_sim = self.calculate_similarity(original_song, matched_song)
-
-        # Check for artist/song swap (common with Reddit data)
-        swap_artist_sim = self.calculate_similarity(original_artist, matched_song)
-        swap_song_sim = self.calculate_similarity(original_song, matched_artist)
-
-        # If swapped version is better, use that
-        if (swap_artist_sim + swap_song_sim) > (artist_sim + song_sim):
-            artist_sim, song_sim = swap_artist_sim, swap_song_sim
-            swapped = True
-        else:
-            swapped = False
-
-        # Calculate overall confidence (weighted: artist 40%, song 60%)
-        confidence = (artist_sim * 0.4) + (song_sim * 0.6)
-
-        # Explanation
-        if confidence >= 0.8:
-            quality = "EXCELLENT"
-        elif confidence >= 0.6:
-            quality = "GOOD"
-        elif confidence >= 0.4:
-            quality = "QUESTIONABLE"
-        else:
-            quality = "POOR"
-
-        explanation = f"{quality} - Artist: {artist_sim:.2f}, Song: {song_sim:.2f}"
-        if swapped:
-            explanation += " (swapped)"
-
-        return confidence, explanation
+        return track_resolver.calculate_confidence(original_artist, original_song, matched_artist, matched_song)
 
     def search_song(self, artist, song):
         """Search for a song on Spotify with confidence scoring"""
         try:
+            # Local index first: scored with the same calculate_confidence, only EXCELLENT matches used
+            local = self.resolver.lookup(artist, song)
+            if local:
+                return {
+                    'matched': True,
+                    'confidence': local['confidence'],
+                    'confidence_explanation': local['confidence_explanation'],
+                    'spotify_id': local['spotify_id'],
+                    'spotify_uri': local['spotify_uri'],
+                    'clean_artist': local['artist'],
+                    'clean_song': local['song'],
+                    'original_artist': artist,
+                    'original_song': song
+                }
+
             # Clean up the query
             query = f"{artist} {song}".strip()
 
             # Rate limiting
-            if self.request_count % 100 == 0 and self.request_count > 0:
+            if self.request_count % 100 == 0 and self.request_count > self.last_pause_at:
                 print(f'  [Rate limit pause at {self.request_count} requests...]')
                 time.sleep(30)
+                self.last_pause_at = self.request_count
 
             results = self.sp.search(q=query, type='track', limit=1)
-            self.request_count += 1
-            time.sleep(0.35)
+            if not self.sp.last_from_cache:
+                self.request_count += 1
 
             if results['tracks']['items']:
                 track = results['tracks']['items'][0]
                 matched_artist = track['artists'][0]['name']
                 matched_song = track['name']
+                self.resolver.learn(track['id'], matched_artist, matched_song)
 
                 # Calculate confidence
                 confidence, explanation = self.calculate_confidence(
@@ -203,6 +196,9 @@ def main():
     print(f'Unmatched: {len(unmatched)} ({(len(unmatched)/len(batch_songs)*100):.1f}%)')
     print(f'\nSaved to: spotify_batch_1_results_v2.json')
     print(f'API requests made: {validator.request_count}')
+    print(validator.sp.cache_summary())
+    print(validator.resolver.summary())
+    validator.resolver.close()
 
     # Show some examples
     if matched_questionable:
@@ -8,16 +8,15 @@ This will:
 2. Dedupe against tapestry
 3. Run Ananki analysis
 4. Inject to tapestry
+   (2-4 overlap in one process - see pipeline_runner.py)
 5. Show you final counts
 
 FULLY AUTOMATED - NO SUBPROCESS ISSUES!
 """
 
 import sys
-import json
 from pathlib import Path
 import subprocess
-import importlib.util
 
 PROJECT_ROOT = Path(__file__).parent.parent
 SCRIPTS_DIR = Path(__file__).parent
@@ -25,13 +24,6 @@ SCRIPTS_DIR = Path(__file__).parent
 # Import modules directly to avoid subprocess issues
 sys.path.insert(0, str(SCRIPTS_DIR))
 
-def load_module_from_file(module_name, file_path):
-    """Load a Python module from file path"""
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
 print("""
 ╔══════════════════════════════════════════════════════════════════╗
 ║                   🎵 TAPESTRY AUTO-SCRAPER 🎵                    ║
@@ -68,7 +60,7 @@ except Exception as e:
     print(f"[ERROR] Scraping error: {e}")
     sys.exit(1)
 
-print(f"\n[STEP 2/5] DEDUPLICATION")
+print(f"\n[STEPS 2-4/5] DEDUPE -> ANANKI -> INJECT (This takes time...)")
 print("="*70)
 
 # Find all raw scrape files
@@ -79,104 +71,40 @@ if not raw_files:
     print("[ERROR] No files to process!")
     sys.exit(1)
 
-# Run deduplication
+# All three stages in this process (NO SUBPROCESS!): each file is analyzed as
+# soon as it is deduped and injected while the next one is with Claude
 try:
-    dedupe_script = SCRIPTS_DIR / 'batch_dedupe_before_ananki.py'
-    file_args = [str(f) for f in raw_files]
-    result = subprocess.run(
-        [sys.executable, str(dedupe_script)] + file_args,
-        cwd=SCRIPTS_DIR
-    )
-    if result.returncode != 0:
+    from pipeline_runner import TapestryPipeline, pending_files
+
+    deduped_files, results_files = pending_files(raw_files)
+    runner = TapestryPipeline()
+    jobs = runner.run(raw_files, deduped_files, results_files)
+
+    for stage, job, error in runner.failed:
+        print(f"  [ERROR] {stage}: {job.get('name', job)}: {error}")
+    if any(stage == 'dedupe' for stage, _, _ in runner.failed):
         print("[ERROR] Deduplication failed!")
         sys.exit(1)
-    print("[OK] Deduplication complete!")
-except Exception as e:
-    print(f"[ERROR] Dedupe error: {e}")
-    sys.exit(1)
 
-print(f"\n[STEP 3/5] ANANKI ANALYSIS (This takes time...)")
-print("="*70)
-
-# Import Ananki module directly (NO SUBPROCESS!)
-try:
-    ananki_module = load_module_from_file('true_ananki', SCRIPTS_DIR / 'true_ananki_claude_api.py')
-    ananki = ananki_module.TrueAnankiClaudeAPI()
-
-    # Find deduped files
-    deduped_dir = PROJECT_ROOT / '2_deduped'
-    deduped_files = list(deduped_dir.glob('*_DEDUPED.json'))
-
-    total_mapped = 0
-    for i, deduped_file in enumerate(deduped_files, 1):
-        print(f"\n[{i}/{len(deduped_files)}] Analyzing: {deduped_file.name}")
-        try:
-            mapped, ambiguous = ananki.map_songs(str(deduped_file))
-            total_mapped += len(mapped)
-            print(f"  Mapped: {len(mapped)} | Ambiguous: {len(ambiguous)}")
-        except Exception as e:
-            print(f"  [ERROR] {e}")
-            continue
-
-    print(f"\n[OK] Ananki complete! Mapped {total_mapped} songs")
+    print(f"\n[OK] Pipeline complete! Added {sum(job['injected'] for job in jobs)} songs")
 
 except Exception as e:
-    print(f"[ERROR] Ananki error: {e}")
+    print(f"[ERROR] Pipeline error: {e}")
     import traceback
     traceback.print_exc()
     sys.exit(1)
 
-print(f"\n[STEP 4/5] INJECTION TO TAPESTRY")
-print("="*70)
-
-# Import injection module directly (NO SUBPROCESS!)
-try:
-    inject_module = load_module_from_file('inject', SCRIPTS_DIR / 'inject_to_tapestry.py')
-
-    # Find mapped files
-    mapped_dir = PROJECT_ROOT / '3_analyzed' / 'mapped'
-    mapped_files = list(mapped_dir.glob('*_CLAUDE_MAPPED.json'))
-
-    total_injected = 0
-    for mapped_file in mapped_files:
-        print(f"\nInjecting: {mapped_file.name}")
-        try:
-            # Call injection function directly
-            result = subprocess.run(
-                [sys.executable, str(SCRIPTS_DIR / 'inject_to_tapestry.py'), str(mapped_file)],
-                cwd=SCRIPTS_DIR,
-                capture_output=True,
-                text=True
-            )
-            if 'Injected:' in result.stdout:
-                import re
-                match = re.search(r'Injected: (\d+)', result.stdout)
-                if match:
-                    injected = int(match.group(1))
-                    total_injected += injected
-                    print(f"  [OK] Injected {injected} songs")
-        except Exception as e:
-            print(f"  [ERROR] {e}")
-            continue
-
-    print(f"\n[OK] Injection complete! Added {total_injected} songs")
-
-except Exception as e:
-    print(f"[ERROR] Injection error: {e}")
-    sys.exit(1)
-
 print(f"\n[STEP 5/5] FINAL RESULTS")
 print("="*70)
 
 # Show final tapestry counts
-tapestry_file = PROJECT_ROOT.parent / 'core' / 'tapestry.json'
-with open(tapestry_file, 'r', encoding='utf-8') as f:
-    t = json.load(f)
+from tapestry_store import TapestryStore
+by_subvibe = TapestryStore().stats()['by_subvibe']
 
 meta_counts = {}
-for k, v in t['vibes'].items():
+for k, count in by_subvibe.items():
     meta = k.split(' - ')[0]
-    meta_counts[meta] = meta_counts.get(meta, 0) + len(v['songs'])
+    meta_counts[meta] = meta_counts.get(meta, 0) + count
 
 total = sum(meta_counts.values())
 
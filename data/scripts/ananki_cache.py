@@ -0,0 +1,215 @@
+"""
+Content-addressed cache for TRUE Ananki classifications
+A song is only ever sent to Claude once per (song, context, model): a
+crash after the last checkpoint, or the same song/context showing up in
+two deduped files, is served from here instead of paying again.
+
+Key: sha256 of (spotify_id, post_title, comment_text[:500], model, prompt version)
+
+Each answer also stores the taxonomy it was made against:
+  - taxonomy_version: hash of the full sub-vibe list (+ manifold entries)
+  - subvibe_fp: fingerprint of the ONE sub-vibe it was mapped to
+After a taxonomy/manifold tweak only affected answers are re-analyzed:
+  - mapped answers stay valid while their sub-vibe still exists unchanged
+  - AMBIGUOUS/low-confidence answers are retried whenever the list changes
+    (a new sub-vibe may fit them now)
+
+CLI:
+    python ananki_cache.py stats
+    python ananki_cache.py invalidate --subvibe "Sad - Crying"
+    python ananki_cache.py invalidate --model claude-sonnet-4-5
+    python ananki_cache.py invalidate --all
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / 'cache' / 'ananki_cache.sqlite'
+MANIFOLD_FILE = Path(__file__).parent.parent / 'emotional_manifold_COMPLETE.json'
+
+# Bump when the classification prompt changes in a way that should redo everything
+PROMPT_VERSION = 2
+
+# Below this an answer counts as ambiguous (same threshold as map_songs)
+MIN_CONFIDENCE = 0.5
+
+
+def _hash(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def load_manifold_subvibes(path=MANIFOLD_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sub_vibes', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def subvibe_fingerprints(subvibes, manifold=None):
+    """{sub_vibe: fingerprint} - changes when a sub-vibe's manifold definition changes"""
+    manifold = load_manifold_subvibes() if manifold is None else manifold
+    return {sv: _hash([sv, manifold.get(sv)])[:16] for sv in subvibes}
+
+
+def is_confident(analysis):
+    try:
+        return analysis.get('sub_vibe') != 'AMBIGUOUS' and float(analysis.get('confidence', 0)) >= MIN_CONFIDENCE
+    except (TypeError, ValueError):
+        return False
+
+
+class AnankiResultCache:
+    """SQLite-backed (song, context) -> Claude analysis cache (thread-safe)"""
+
+    def __init__(self, subvibes, model, path=None, manifold=None):
+        self.path = Path(path or os.getenv('ANANKI_CACHE_PATH') or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self.fingerprints = subvibe_fingerprints(subvibes, manifold)
+        self.taxonomy_version = _hash(sorted(self.fingerprints.items()))[:16]
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS ananki_cache (
+                key TEXT PRIMARY KEY,
+                spotify_id TEXT,
+                analysis TEXT NOT NULL,
+                sub_vibe TEXT NOT NULL,
+                subvibe_fp TEXT,
+                taxonomy_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_ananki_sub_vibe ON ananki_cache(sub_vibe)')
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # cached, but invalidated by a taxonomy change
+
+    def make_key(self, song):
+        return _hash([
+            song.get('spotify_id'),
+            song.get('post_title') or '',
+            (song.get('comment_text') or '')[:500],
+            self.model,
+            PROMPT_VERSION,
+        ])
+
+    def _is_valid(self, analysis, sub_vibe, subvibe_fp, taxonomy_version):
+        if taxonomy_version == self.taxonomy_version:
+            return True
+        if not is_confident(analysis):
+            return False  # taxonomy changed - a new sub-vibe may fit now
+        return self.fingerprints.get(sub_vibe) == subvibe_fp
+
+    def get(self, song):
+        """Cached analysis dict for this song/context, or None"""
+        key = self.make_key(song)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT analysis, sub_vibe, subvibe_fp, taxonomy_version FROM ananki_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        analysis = json.loads(row[0])
+        if not self._is_valid(analysis, row[1], row[2], row[3]):
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return analysis
+
+    def put(self, song, analysis):
+        sub_vibe = analysis.get('sub_vibe', 'AMBIGUOUS')
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO ananki_cache '
+                '(key, spotify_id, analysis, sub_vibe, subvibe_fp, taxonomy_version, model, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.make_key(song), song.get('spotify_id'), json.dumps(analysis, ensure_ascii=False),
+                 sub_vibe, self.fingerprints.get(sub_vibe), self.taxonomy_version, self.model, time.time())
+            )
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"[ANANKI CACHE] {s['hits']} hits / {s['misses']} misses "
+                f"({s['hit_rate']:.0%} hit rate, {s['stale']} stale after taxonomy changes)")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ---- maintenance (no taxonomy needed) ----
+
+def open_db(path=None):
+    path = Path(path or os.getenv('ANANKI_CACHE_PATH') or DEFAULT_CACHE_PATH)
+    if not path.exists():
+        print(f"No cache at {path}")
+        sys.exit(1)
+    return sqlite3.connect(str(path))
+
+
+def print_stats(db):
+    total = db.execute('SELECT COUNT(*) FROM ananki_cache').fetchone()[0]
+    print(f"Cached analyses: {total}")
+    for model, count in db.execute('SELECT model, COUNT(*) FROM ananki_cache GROUP BY model'):
+        print(f"  {model}: {count}")
+    print("\nTop sub-vibes:")
+    for sub_vibe, count in db.execute(
+            'SELECT sub_vibe, COUNT(*) c FROM ananki_cache GROUP BY sub_vibe ORDER BY c DESC LIMIT 15'):
+        print(f"  {count:6}  {sub_vibe}")
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('stats', 'invalidate'):
+        print(__doc__)
+        return
+
+    db = open_db()
+    if args[0] == 'stats':
+        print_stats(db)
+        return
+
+    if '--all' in args:
+        deleted = db.execute('DELETE FROM ananki_cache').rowcount
+    elif '--subvibe' in args:
+        deleted = db.execute('DELETE FROM ananki_cache WHERE sub_vibe = ?', (args[args.index('--subvibe') + 1],)).rowcount
+    elif '--model' in args:
+        deleted = db.execute('DELETE FROM ananki_cache WHERE model = ?', (args[args.index('--model') + 1],)).rowcount
+    else:
+        print("invalidate needs --all, --subvibe NAME or --model NAME")
+        return
+    db.commit()
+    print(f"Invalidated {deleted} cached analyses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Context-quality gate in front of TRUE Ananki (local, stdlib only)
+Claude can only place a song from the human context around it. Records
+whose context says nothing about a mood - a bare "Artist - Song" list, a
+row of Spotify links, a two-word YouTube comment under a generic playlist
+title - give Claude nothing to reason about: it either answers AMBIGUOUS
+after a paid call or places the song from what it knows about the track,
+which a cheaper model does just as well. The gate scores each record from:
+  - emotional-lexicon hits (COMPLETE_KEYWORD_MAP + sub-vibe names, the same
+    patterns as ananki_shortlist.py) in the comment prose
+  - the same lexicon in the post / playlist title
+  - how much prose the comment has once list lines and links are removed
+Routes:
+  score < ambiguous_below  -> straight to the ambiguous bin, no call
+                              (reasoning says why; off by default)
+  score < fast_below       -> the fast model only, never escalated
+  otherwise                -> the normal path (strong model / cascade)
+
+Projected savings for deduped files, before running Ananki:
+    python ananki_context_gate.py report 2_deduped/*_DEDUPED.json [--fast-below 0.2] [--ambiguous-below 0.05]
+Trade-off against answers Ananki already gave (how many of the gated songs
+Claude actually mapped):
+    python ananki_context_gate.py eval 3_analyzed/mapped/*_CLAUDE_MAPPED.json [--thresholds 0.1,0.2,0.3]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from ananki_shortlist import keyword_patterns
+
+MANIFOLD_FILE = Path(__file__).parent.parent / 'emotional_manifold_COMPLETE.json'
+
+# Thin contexts go to the fast model only / straight to the ambiguous bin (tune with `eval`)
+FAST_BELOW = float(os.getenv('ANANKI_GATE_FAST_BELOW', 0.2))
+AMBIGUOUS_BELOW = float(os.getenv('ANANKI_GATE_AMBIGUOUS_BELOW', 0.0))
+
+# Score weights (sum to 1.0)
+PROSE_WEIGHT = 0.4     # x prose words / PROSE_WORDS (capped)
+COMMENT_WEIGHT = 0.35  # x lexicon hits in the comment / COMMENT_HITS (capped)
+TITLE_WEIGHT = 0.25    # x lexicon hits in the title / TITLE_HITS (capped)
+PROSE_WORDS = 30
+COMMENT_HITS = 3
+TITLE_HITS = 2
+
+LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)|https?://\S+")
+# "Artist - Song" / "1. Song by Artist" style lines: recommendations, not context
+LIST_LINE_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])?\s*[^.!?]{1,60}\s(?:[-–—]|by)\s[^.!?]{1,60}$", re.IGNORECASE)
+WORD_RE = re.compile(r"[a-z']{3,}")
+
+
+def prose(comment_text):
+    """Comment text without links and list lines"""
+    lines = LINK_RE.sub(r"\1", comment_text or '').splitlines()
+    return ' '.join(line for line in lines if line.strip() and not LIST_LINE_RE.match(line))
+
+
+class ContextGate:
+    """Scores how much a record's context can tell Claude"""
+
+    def __init__(self, subvibes, fast_below=FAST_BELOW, ambiguous_below=AMBIGUOUS_BELOW, keyword_map=None):
+        self.fast_below = fast_below
+        self.ambiguous_below = ambiguous_below
+        self.patterns = keyword_patterns(sorted(subvibes), keyword_map)
+        self._memo = {}
+        self.gated = 0
+
+    def hits(self, text):
+        text = text.lower()
+        return sum(1 for pattern in self.patterns.values() if pattern.search(text))
+
+    def signals(self, song):
+        """(prose words, comment lexicon hits, title lexicon hits)"""
+        text = prose(song.get('comment_text'))[:1000]
+        return len(WORD_RE.findall(text.lower())), self.hits(text), self.hits(song.get('post_title') or '')
+
+    def score(self, song):
+        """0 (nothing to go on) .. 1 (long, mood-heavy context); memoised per context"""
+        key = (song.get('comment_text') or '', song.get('post_title') or '')
+        if key not in self._memo:
+            words, comment_hits, title_hits = self.signals(song)
+            self._memo[key] = round(PROSE_WEIGHT * min(words / PROSE_WORDS, 1.0)
+                                    + COMMENT_WEIGHT * min(comment_hits / COMMENT_HITS, 1.0)
+                                    + TITLE_WEIGHT * min(title_hits / TITLE_HITS, 1.0), 3)
+        return self._memo[key]
+
+    def route(self, song):
+        """'ambiguous', 'fast' or None (normal path)"""
+        score = self.score(song)
+        if score < self.ambiguous_below:
+            return 'ambiguous'
+        if score < self.fast_below:
+            return 'fast'
+        return None
+
+    def check(self, song):
+        """AMBIGUOUS analysis dict (same shape as Claude's) for a record with nothing to go on, else None"""
+        if self.route(song) != 'ambiguous':
+            return None
+        self.gated += 1
+        words, comment_hits, title_hits = self.signals(song)
+        return {
+            'sub_vibe': 'AMBIGUOUS',
+            'reasoning': (f"Context gate: score {self.score(song):.2f} < {self.ambiguous_below} ({words} prose words, "
+                          f"{comment_hits} mood keywords in the comment, {title_hits} in the title) - not sent to Claude"),
+            'confidence': 0.0,
+            'source': 'context_gate'
+        }
+
+
+# ---- offline report / evaluation ----
+
+def load_songs(path):
+    """Songs from a 2_deduped file, a results stream or a _CLAUDE_MAPPED file (mapped + ambiguous)"""
+    if str(path).endswith('.jsonl'):
+        from ananki_results import AnankiResults
+        return list(AnankiResults(path).songs())
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'mapped_songs' in data:
+        return data['mapped_songs'] + data.get('ambiguous_songs', [])
+    return data.get('songs', [])
+
+
+def song_costs():
+    """($ per song on the strong model, $ per song on the fast model), priced like ananki_preflight.py"""
+    from ananki_preflight import RUN_LOG_FILE, History, cost_per_song
+    from ananki_results import read_runs
+    from true_ananki_claude_api import FAST_MODEL, MODEL
+    history = History(read_runs(RUN_LOG_FILE))
+    return cost_per_song(MODEL, history), cost_per_song(FAST_MODEL, history)
+
+
+def savings(fast, ambiguous, costs):
+    strong, cheap = costs
+    return ambiguous * strong + fast * max(strong - cheap, 0.0)
+
+
+def report(gate, paths):
+    costs = song_costs()
+    total = fast = ambiguous = 0
+    for path in paths:
+        routes = [gate.route(song) for song in load_songs(path)]
+        n_fast, n_ambiguous = routes.count('fast'), routes.count('ambiguous')
+        total += len(routes)
+        fast += n_fast
+        ambiguous += n_ambiguous
+        print(f"{Path(path).name}: {len(routes)} songs | fast model only {n_fast} | "
+              f"ambiguous bin {n_ambiguous} | saves ~${savings(n_fast, n_ambiguous, costs):.2f}")
+    print(f"\nfast below {gate.fast_below}, ambiguous below {gate.ambiguous_below}: "
+          f"{fast}/{total} songs to the fast model only, {ambiguous}/{total} straight to the ambiguous bin")
+    print(f"Projected savings ~${savings(fast, ambiguous, costs):.2f} of ~${total * costs[0]:.2f} "
+          f"({savings(fast, ambiguous, costs) / max(total * costs[0], 1e-9):.1%})")
+
+
+def evaluate(gate, paths, thresholds):
+    from ananki_results import is_mapped
+    costs = song_costs()
+    scored = [(gate.score(song), is_mapped(song)) for path in paths for song in load_songs(path)]
+    mapped_total = sum(1 for _, mapped in scored if mapped)
+    print(f"{len(scored)} answered songs ({mapped_total} mapped, {len(scored) - mapped_total} ambiguous)")
+    print(f"\n{'threshold':>9} | {'below':>14} | {'were ambiguous':>14} | {'were mapped':>11} | "
+          f"saved as fast | saved as ambiguous")
+    print("-" * 92)
+    for threshold in thresholds:
+        below = [mapped for score, mapped in scored if score < threshold]
+        mapped = sum(below)
+        print(f"{threshold:>9.2f} | {len(below):>6} ({len(below) / max(len(scored), 1):5.1%}) | "
+              f"{len(below) - mapped:>14} | {mapped:>4} ({mapped / max(mapped_total, 1):4.1%}) | "
+              f"{f'${savings(len(below), 0, costs):.2f}':>13} | ${savings(0, len(below), costs):.2f}")
+    print("\n('were mapped' songs get a fast-model answer on the fast route, and are lost on the ambiguous route)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-Ananki context-quality gate')
+    parser.add_argument('command', choices=['report', 'eval'])
+    parser.add_argument('files', nargs='+', help='2_deduped files (report) / results or _CLAUDE_MAPPED files (eval)')
+    parser.add_argument('--fast-below', type=float, default=FAST_BELOW)
+    parser.add_argument('--ambiguous-below', type=float, default=AMBIGUOUS_BELOW)
+    parser.add_argument('--thresholds', default='0.1,0.15,0.2,0.25,0.3,0.4')
+    args = parser.parse_args()
+
+    with open(MANIFOLD_FILE, 'r', encoding='utf-8') as f:
+        subvibes = list(json.load(f)['sub_vibes'])
+    gate = ContextGate(subvibes, args.fast_below, args.ambiguous_below)
+
+    if args.command == 'report':
+        report(gate, args.files)
+    else:
+        evaluate(gate, args.files, [float(t) for t in args.thresholds.split(',')])
+
+
+if __name__ == '__main__':
+    main()
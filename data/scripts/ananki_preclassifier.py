@@ -0,0 +1,213 @@
+"""
+Local pre-classifier in front of TRUE Ananki (CPU only, stdlib only)
+Every tapestry song that came through Ananki keeps its post title, comment
+text and sub-vibe - a labelled corpus. New songs are matched against it
+with TF-IDF vectors (words, word bigrams, artist) and a similarity-weighted
+k-nearest-neighbour vote; a prediction whose vote share clears the
+threshold is accepted without calling Claude, everything else goes to
+Claude as before.
+
+Neighbours from the SAME post/comment as the query are ignored during
+evaluation (a new scrape never has its own comment in the tapestry), so
+the numbers below are honest.
+
+Offline evaluation (tune the threshold: API spend vs agreement with Ananki):
+    python ananki_preclassifier.py eval                         # leave-one-comment-out on the tapestry
+    python ananki_preclassifier.py eval --against <results.jsonl | *_CLAUDE_MAPPED.json> ...
+    python ananki_preclassifier.py eval --thresholds 0.6,0.7,0.8,0.9 --k 15 --sample 2000
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from tapestry_store import TapestryStore
+
+# Vote share a prediction needs to skip Claude (tune with `eval`)
+DEFAULT_THRESHOLD = float(os.getenv('ANANKI_PRECLASSIFY_THRESHOLD', 0.9))
+DEFAULT_K = 15
+# Neighbours below this cosine similarity don't vote
+MIN_SIMILARITY = 0.2
+# Never auto-accept on fewer voters than this
+MIN_VOTERS = 3
+
+STOPWORDS = set("""
+a an and are as at be but by for from had has have i i'm im in is it it's its just like me my
+of on or so that the this to was were what when with you your song songs music any some
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def context_of(song):
+    return (song.get('source_url') or '', song.get('comment_text') or '', song.get('post_title') or '')
+
+
+def features(song):
+    """Sparse term counts for a song's human context"""
+    text = f"{song.get('post_title') or ''} {(song.get('comment_text') or '')[:500]}".lower()
+    words = [w.strip("'") for w in TOKEN_RE.findall(text)]
+    words = [w for w in words if len(w) > 1 and w not in STOPWORDS]
+
+    terms = Counter(words)
+    terms.update(f"{a}_{b}" for a, b in zip(words, words[1:]))
+    artist = (song.get('artist') or '').lower().strip()
+    if artist:
+        terms[f"artist={artist}"] += 1
+    return terms
+
+
+def tapestry_corpus(store=None):
+    """[(sub_vibe, song)] for tapestry songs that have a human context"""
+    store = store or TapestryStore()
+    return [(sub_vibe, song) for sub_vibe in store.subvibes() for song in store.songs_for(sub_vibe)
+            if song.get('comment_text') or song.get('post_title')]
+
+
+class PreClassifier:
+    """TF-IDF + inverted-index kNN over labelled tapestry songs"""
+
+    def __init__(self, labelled_songs, k=DEFAULT_K, threshold=DEFAULT_THRESHOLD):
+        """labelled_songs: iterable of (sub_vibe, song)"""
+        self.k = k
+        self.threshold = threshold
+        self.labels = []
+        self.contexts = []
+        self.subvibes = set()
+        doc_terms = []
+        for sub_vibe, song in labelled_songs:
+            terms = features(song)
+            if not terms:
+                continue
+            self.labels.append(sub_vibe)
+            self.contexts.append(context_of(song))
+            self.subvibes.add(sub_vibe)
+            doc_terms.append(terms)
+
+        # IDF, then L2-normalised sublinear TF-IDF postings
+        df = Counter()
+        for terms in doc_terms:
+            df.update(terms.keys())
+        n = len(doc_terms)
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+
+        self.postings = defaultdict(list)
+        for doc_id, terms in enumerate(doc_terms):
+            for term, weight in self._vector(terms).items():
+                self.postings[term].append((doc_id, weight))
+
+    @classmethod
+    def from_tapestry(cls, store=None, **kwargs):
+        """Train on every tapestry song that carries Reddit/YouTube context"""
+        return cls(tapestry_corpus(store), **kwargs)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _vector(self, terms):
+        vector = {}
+        for term, count in terms.items():
+            idf = self.idf.get(term)
+            if idf:
+                vector[term] = (1 + math.log(count)) * idf
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {term: w / norm for term, w in vector.items()}
+
+    def neighbours(self, song, exclude_context=None):
+        """[(similarity, doc_id)] of the k most similar labelled songs"""
+        scores = defaultdict(float)
+        for term, weight in self._vector(features(song)).items():
+            for doc_id, doc_weight in self.postings.get(term, ()):
+                scores[doc_id] += weight * doc_weight
+
+        ranked = sorted(((sim, doc_id) for doc_id, sim in scores.items() if sim >= MIN_SIMILARITY), reverse=True)
+        if exclude_context is not None:
+            ranked = [(sim, doc_id) for sim, doc_id in ranked if self.contexts[doc_id] != exclude_context]
+        return ranked[:self.k]
+
+    def predict(self, song, exclude_context=None):
+        """(sub_vibe, vote_share, voters) or (None, 0.0, 0) with no usable neighbours"""
+        votes = defaultdict(float)
+        near = self.neighbours(song, exclude_context)
+        for sim, doc_id in near:
+            votes[self.labels[doc_id]] += sim
+        if not votes:
+            return None, 0.0, 0
+        sub_vibe, weight = max(votes.items(), key=lambda item: item[1])
+        return sub_vibe, weight / sum(votes.values()), len(near)
+
+    def classify(self, song):
+        """Analysis dict (same shape as Claude's) if confident enough, else None"""
+        sub_vibe, share, voters = self.predict(song)
+        if sub_vibe is None or share < self.threshold or voters < MIN_VOTERS:
+            return None
+        return {
+            'sub_vibe': sub_vibe,
+            'reasoning': f"Local pre-classifier: {share:.0%} of {voters} similar tapestry songs are {sub_vibe}",
+            'confidence': round(share, 2),
+            'source': 'preclassifier'
+        }
+
+
+# ---- offline evaluation ----
+
+def evaluate(model, cases, thresholds):
+    """
+    cases: [(expected_sub_vibe, song)] -> prints coverage / agreement per threshold
+    Each song's own post/comment is held out (it may already be in the tapestry)
+    """
+    predictions = []
+    for expected, song in cases:
+        sub_vibe, share, voters = model.predict(song, exclude_context=context_of(song))
+        predictions.append((expected, sub_vibe, share, voters))
+
+    from ananki_preflight import cost_per_song
+    per_song = cost_per_song()
+    print(f"\n{'threshold':>9} | {'auto-accepted':>14} | {'agreement':>9} | {'saved':>8} | overall accuracy")
+    print("-" * 70)
+    for threshold in thresholds:
+        accepted = [(e, p) for e, p, share, voters in predictions if p and share >= threshold and voters >= MIN_VOTERS]
+        agree = sum(1 for e, p in accepted if e == p)
+        coverage = len(accepted) / len(cases) if cases else 0
+        agreement = agree / len(accepted) if accepted else 0
+        print(f"{threshold:>9.2f} | {len(accepted):>6} ({coverage:5.1%}) | {agreement:>9.1%} | "
+              f"${len(accepted) * per_song:>7.2f} | {(agree + len(cases) - len(accepted)) / max(len(cases), 1):.1%}")
+    print("\n(auto-accepted songs skip Claude; 'overall accuracy' assumes Claude's answer for the rest)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Ananki pre-classifier')
+    parser.add_argument('command', choices=['eval'])
+    parser.add_argument('--against', nargs='*', help='results streams / _CLAUDE_MAPPED files to score against')
+    parser.add_argument('--thresholds', default='0.5,0.6,0.7,0.8,0.9,0.95')
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--sample', type=int, default=0, help='evaluate on a random sample of N songs')
+    args = parser.parse_args()
+
+    corpus = tapestry_corpus()
+    model = PreClassifier(corpus, k=args.k)
+    print(f"Trained on {len(model):,} labelled tapestry songs ({len(model.subvibes)} sub-vibes)")
+
+    if args.against:
+        from ananki_results import load_mapped_songs
+        cases = [(song['ananki_subvibe'], song) for path in args.against
+                 for song in load_mapped_songs(path) if song.get('ananki_subvibe')]
+        print(f"Scoring against {len(cases):,} Ananki answers from {len(args.against)} file(s)")
+    else:
+        cases = corpus
+        print("Leave-one-comment-out over the tapestry")
+
+    if args.sample and len(cases) > args.sample:
+        cases = random.Random(0).sample(cases, args.sample)
+
+    evaluate(model, cases, [float(t) for t in args.thresholds.split(',')])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Preflight estimate for TRUE Ananki runs (no API calls)
+Builds the exact request plan true_ananki_claude_api.py would send for each
+2_deduped file - resume cursor, result cache, context gate, pre-classifier,
+comment grouping, shortlist and cascade all applied - and prices it:
+  - input tokens from the real prompts + the cached system prefix
+    (written once per model/variant, then read at 10%)
+  - output tokens per song, request latency and cascade escalation rate
+    from previous runs (3_analyzed/ananki_runs.jsonl, written by every run),
+    with conservative defaults until there is history
+  - wall-clock at the configured concurrency, capped by the requests/min and
+    tokens/min budgets the live limiter enforces
+
+    python ananki_preflight.py                                   # every 2_deduped/*_DEDUPED.json
+    python ananki_preflight.py 2_deduped/night_*.json --concurrency 8 --cascade
+    python ananki_preflight.py --bulk --budget 2.50              # which files fit in $2.50
+Takes the same tuning flags as true_ananki_claude_api.py.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from ananki_results import RUN_LOG, AnankiResults, read_runs, results_path, run_log_path
+from true_ananki_claude_api import (BATCH_SIZE, CONCURRENCY, ESCALATE_BELOW, FAST_MODEL, MODEL, MODEL_PRICES,
+                                    OUTPUT_TOKENS_PER_SONG, REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE,
+                                    TrueAnankiClaudeAPI, estimate_tokens)
+
+DEDUPED_DIR = Path(__file__).parent.parent / '2_deduped'
+RUN_LOG_FILE = Path(__file__).parent.parent / '3_analyzed' / RUN_LOG
+
+# Only the most recent runs calibrate the estimate
+HISTORY_RUNS = 20
+# Used until the run log has numbers for a model
+FIRST_TOKEN_SECONDS = 1.5
+OUTPUT_TOKENS_PER_SECOND = 50.0
+ESCALATION_RATE = 0.3
+# One song's share of a prompt (context + metadata), for cost_per_song before there is history
+INPUT_TOKENS_PER_SONG = 200
+
+
+class History:
+    """Per-model averages over the last HISTORY_RUNS runs (defaults where there is no data)"""
+
+    def __init__(self, runs):
+        self.runs = runs[-HISTORY_RUNS:]
+        self.tiers = {}
+        for run in self.runs:
+            for model, tier in run.get('tiers', {}).items():
+                tier = {key: value for key, value in tier.items() if isinstance(value, (int, float))}
+                if run.get('mode') == 'bulk':
+                    # Back to list price; the estimate applies the batch discount itself
+                    tier['cost'] = tier.get('cost', 0.0) * 2
+                self.tiers.setdefault(model, Counter()).update(tier)
+
+    def output_per_song(self, model):
+        tier = self.tiers.get(model)
+        if tier and tier['songs'] and tier['output_tokens']:
+            return tier['output_tokens'] / tier['songs']
+        return OUTPUT_TOKENS_PER_SONG
+
+    def latency(self, model, output_tokens):
+        """Seconds for one request that writes output_tokens"""
+        first_token, rate = FIRST_TOKEN_SECONDS, OUTPUT_TOKENS_PER_SECOND
+        tier = self.tiers.get(model)
+        if tier and tier['timed'] and tier['timed_output_tokens'] and tier['seconds'] > 0:
+            # Never let the fixed part eat more than half of the measured latency
+            first_token = min(FIRST_TOKEN_SECONDS, tier['seconds'] / tier['timed'] / 2)
+            rate = tier['timed_output_tokens'] / (tier['seconds'] - first_token * tier['timed'])
+        return first_token + output_tokens / rate
+
+    def escalation_rate(self):
+        tier = self.tiers.get(FAST_MODEL)
+        if tier and tier['escalated']:
+            return tier['escalated'] / tier['songs']
+        return ESCALATION_RATE
+
+    def cost_per_song(self, model):
+        """Actual $ per API-answered song, or None"""
+        tier = self.tiers.get(model)
+        return tier['cost'] / tier['songs'] if tier and tier['songs'] else None
+
+    def summary(self):
+        if not self.runs:
+            return (f"No run history yet: assuming {OUTPUT_TOKENS_PER_SONG} output tokens/song, "
+                    f"{OUTPUT_TOKENS_PER_SECOND:.0f} tokens/s, {ESCALATION_RATE:.0%} cascade escalation")
+        lines = [f"Calibrated from the last {len(self.runs)} run(s):"]
+        for model in sorted(self.tiers):
+            per_song = self.cost_per_song(model)
+            lines.append(f"  {model:<20} {self.output_per_song(model):.0f} output tokens/song | "
+                         f"~{self.latency(model, self.output_per_song(model) * BATCH_SIZE):.1f}s per "
+                         f"{BATCH_SIZE}-song request | "
+                         + (f"${per_song:.4f}/song actual" if per_song is not None else "no cost data"))
+        return "\n".join(lines)
+
+
+def cost_per_song(model=MODEL, history=None):
+    """
+    $ per Claude-answered song: the run log's actual average for the model,
+    else its list price for a typical song (the one cost figure every script quotes)
+    """
+    history = history or History(read_runs(RUN_LOG_FILE))
+    per_song = history.cost_per_song(model)
+    if per_song is not None:
+        return per_song
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES[MODEL])
+    return (INPUT_TOKENS_PER_SONG * input_price + OUTPUT_TOKENS_PER_SONG * output_price) / 1e6
+
+
+def request_cost(model, input_tokens, prefix_tokens, output_tokens, cache_write):
+    """$ for one request; the system prefix is a cache write the first time, a cache read after"""
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES[MODEL])
+    prefix = prefix_tokens * input_price * (1.25 if cache_write else 0.1)
+    return (input_tokens * input_price + prefix + output_tokens * output_price) / 1e6
+
+
+class Preflight:
+    def __init__(self, ananki, history, bulk=False):
+        self.ananki = ananki
+        self.history = history
+        self.bulk = bulk
+        self._prefix_tokens = {}
+
+    def prefix_tokens(self, shortlisted):
+        if shortlisted not in self._prefix_tokens:
+            self._prefix_tokens[shortlisted] = estimate_tokens(
+                self.ananki.system_blocks(shortlisted)[0]['text'] + json.dumps(self.ananki.tools(shortlisted)))
+        return self._prefix_tokens[shortlisted]
+
+    def estimate(self, songs_file):
+        """Expected requests / tokens / cost / seconds for one songs file"""
+        ananki = self.ananki
+        with open(songs_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        songs = data.get('mapped_songs', data.get('songs', []))
+        ananki.meta_vibe = data.get('meta_vibe')
+
+        results = results_path(songs_file)
+        done = set()
+        if results.exists() and AnankiResults(results).matches(songs):
+            done = AnankiResults(results).indices()
+        todo = [i for i in range(len(songs)) if i not in done]
+        api = [i for i in todo if ananki.local_analysis(songs[i]) is None]
+        requests = ananki.plan_requests(songs, api) if api else []
+
+        est = {'file': Path(songs_file).name, 'songs': len(songs), 'done': len(done),
+               'local': len(todo) - len(api), 'api': len(api), 'requests': 0, 'input_tokens': 0,
+               'output_tokens': 0, 'cost': 0.0, 'history_cost': 0.0, 'latency': 0.0}
+        discount = 0.5 if self.bulk else 1.0
+        written = set()
+        for chunk in requests:
+            chunk_songs = [songs[i] for i in chunk]
+            prompt, max_tokens, shortlisted = ananki.prompt_for(chunk_songs)
+            thin = ananki.is_thin(chunk_songs[0])
+            model = FAST_MODEL if thin else ananki.first_model
+            tiers = [(model, 1.0)]
+            if model != MODEL and not thin:
+                # Cascade: the share the fast tier isn't sure about is asked again
+                tiers.append((MODEL, self.history.escalation_rate()))
+
+            for tier_model, share in tiers:
+                prefix = self.prefix_tokens(shortlisted)
+                input_tokens = estimate_tokens(prompt)
+                output_tokens = min(self.history.output_per_song(tier_model) * len(chunk), max_tokens)
+                cache_write = (tier_model, shortlisted) not in written
+                written.add((tier_model, shortlisted))
+
+                est['requests'] += share
+                est['input_tokens'] += share * (input_tokens + prefix)
+                est['output_tokens'] += share * output_tokens
+                est['cost'] += share * discount * request_cost(tier_model, input_tokens, prefix, output_tokens, cache_write)
+                est['latency'] += share * self.history.latency(tier_model, output_tokens)
+                per_song = self.history.cost_per_song(tier_model)
+                if per_song is not None:
+                    est['history_cost'] += share * discount * len(chunk) * per_song
+
+        # Live runs: workers overlap requests, but never beyond the limiter's budgets
+        tokens_per_minute = ananki.token_budget.rate * 60
+        est['seconds'] = max(est['latency'] / ananki.concurrency,
+                             est['requests'] * 60.0 / REQUESTS_PER_MINUTE,
+                             (est['input_tokens'] + est['output_tokens']) * 60.0 / tokens_per_minute)
+        return est
+
+
+def duration(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def report(estimates, concurrency, bulk=False, budget=None):
+    total_cost = sum(e['cost'] for e in estimates)
+    print("\n" + "=" * 100)
+    print("ANANKI PREFLIGHT" + (" (bulk: Message Batches at half price)" if bulk else f" (live, concurrency {concurrency})"))
+    print("=" * 100)
+    print(f"{'file':<45} {'songs':>6} {'local':>6} {'to API':>6} {'reqs':>5} {'in tok':>8} {'out tok':>8} "
+          f"{'est. cost':>9} {'share':>6} {'wall':>9}")
+    for e in sorted(estimates, key=lambda e: -e['cost']):
+        wall = "async" if bulk else duration(e['seconds'])
+        print(f"{e['file'][:45]:<45} {e['songs'] - e['done']:>6} {e['local']:>6} {e['api']:>6} "
+              f"{e['requests']:>5.0f} {e['input_tokens']:>8,.0f} {e['output_tokens']:>8,.0f} "
+              f"${e['cost']:>8.3f} {e['cost'] / max(total_cost, 1e-9):>6.0%} {wall:>9}")
+
+    api = sum(e['api'] for e in estimates)
+    print("-" * 100)
+    print(f"Total: {api} songs to Claude in {sum(e['requests'] for e in estimates):.0f} requests | "
+          f"{sum(e['input_tokens'] for e in estimates):,.0f} input + "
+          f"{sum(e['output_tokens'] for e in estimates):,.0f} output tokens | est. ${total_cost:.2f}")
+    history_cost = sum(e['history_cost'] for e in estimates)
+    if history_cost:
+        print(f"At the $/song of previous runs: ${history_cost:.2f}")
+    if bulk:
+        print("Wall-clock: Message Batches are async (usually < 1 h, at most 24 h)")
+    else:
+        print(f"Wall-clock (files run one after another): ~{duration(sum(e['seconds'] for e in estimates))}")
+
+    if budget is not None:
+        # First fit in the order the pipeline would run them
+        spent = 0.0
+        now, later = [], []
+        for e in estimates:
+            if spent + e['cost'] <= budget:
+                spent += e['cost']
+                now.append(e['file'])
+            else:
+                later.append(e['file'])
+        print(f"\nBudget ${budget:.2f}: run {len(now)} file(s) now (est. ${spent:.2f}), defer {len(later)}")
+        for name in later:
+            print(f"  defer: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate Ananki tokens / cost / wall-clock before a run')
+    parser.add_argument('files', nargs='*', help='2_deduped songs files (default: every *_DEDUPED.json)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--tpm', type=int, default=TOKENS_PER_MINUTE)
+    parser.add_argument('--bulk', action='store_true')
+    parser.add_argument('--cascade', action='store_true')
+    parser.add_argument('--escalate-below', type=float, default=None)
+    parser.add_argument('--shortlist', type=int, default=None)
+    parser.add_argument('--no-gate', action='store_true')
+    parser.add_argument('--no-preclassify', action='store_true')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--no-tools', action='store_true')
+    parser.add_argument('--budget', type=float, default=None, help='$ cap: list which files fit')
+    args = parser.parse_args()
+
+    files = args.files or sorted(str(f) for f in DEDUPED_DIR.glob('*_DEDUPED.json'))
+    if not files:
+        print(f"No *_DEDUPED.json files in {DEDUPED_DIR}")
+        return
+
+    escalate_below = args.escalate_below
+    if args.cascade and escalate_below is None:
+        escalate_below = ESCALATE_BELOW
+    kwargs = {'use_gate': not args.no_gate}
+    if args.no_preclassify:
+        kwargs['preclassify_threshold'] = None
+    ananki = TrueAnankiClaudeAPI(args.batch_size, args.concurrency, args.tpm, use_cache=not args.no_cache,
+                                 shortlist_k=args.shortlist, escalate_below=escalate_below,
+                                 structured=not args.no_tools, offline=True, **kwargs)
+
+    history = History(read_runs(run_log_path(files[0])))
+    print(history.summary())
+
+    preflight = Preflight(ananki, history, bulk=args.bulk)
+    estimates = [preflight.estimate(path) for path in files]
+    report(estimates, ananki.concurrency, args.bulk, args.budget)
+
+
+if __name__ == '__main__':
+    main()
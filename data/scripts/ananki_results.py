@@ -0,0 +1,428 @@
+"""
+Append-only TRUE Ananki results
+map_songs streams every answered song to ONE JSONL file as soon as its
+request returns (flush + fsync per request), instead of keeping everything
+in memory and rewriting an indented checkpoint every 25 songs:
+
+    3_analyzed/<songs_file stem>_CLAUDE_RESULTS.jsonl
+    {"t": "header", "songs_file": "...", "total": 500, "fingerprint": "..."}
+    {"i": 17, "id": "<spotify_id>", "song": {... "ananki_subvibe": ..., "ananki_confidence": ...}}
+
+The file is its own resume cursor: the song indices already in it are
+skipped on the next run (appending an index twice is a no-op, a torn last
+line from a crash is dropped), so a crash loses only in-flight requests.
+The header fingerprint (hash of the songs file's spotify_id list) ties the
+stream to one version of the songs file: when dedupe regenerates it, the
+old stream is renamed to <name>.<timestamp>.stale.jsonl and a fresh one is
+started instead of resuming with the previous scrape's songs. Answers from
+an old <stem>_ANANKI_CHECKPOINT.json are folded into the stream by
+spotify_id, so they are not paid for again.
+
+Every run that made API calls also appends one line of per-model usage
+(requests, songs, latency, tokens, cost) to 3_analyzed/ananki_runs.jsonl;
+ananki_preflight.py calibrates its estimates from it.
+
+Songs whose API calls kept failing (after retries) are NOT written as
+AMBIGUOUS; they go to a dead-letter file next to the stream and can be
+replayed on their own (answers land in the same results stream):
+    3_analyzed/<songs_file stem>_CLAUDE_DEADLETTER.jsonl
+    python true_ananki_claude_api.py <..._CLAUDE_DEADLETTER.jsonl>
+
+The mapped / ambiguous views are read lazily from the stream. The old
+_CLAUDE_MAPPED.json / _CLAUDE_AMBIGUOUS.json files are only written on
+request:
+    python ananki_results.py <results.jsonl> stats
+    python ananki_results.py <results.jsonl> mapped      -> 3_analyzed/mapped/<stem>_CLAUDE_MAPPED.json
+    python ananki_results.py <results.jsonl> ambiguous   -> 3_analyzed/ambiguous/<stem>_CLAUDE_AMBIGUOUS.json
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+RESULTS_SUFFIX = '_CLAUDE_RESULTS.jsonl'
+DEADLETTER_SUFFIX = '_CLAUDE_DEADLETTER.jsonl'
+RUN_LOG = 'ananki_runs.jsonl'
+
+# Below this an answer counts as ambiguous
+MIN_CONFIDENCE = 0.5
+
+
+def results_path(songs_file):
+    """3_analyzed/<stem>_CLAUDE_RESULTS.jsonl for a 2_deduped songs file"""
+    analyzed_dir = Path(songs_file).parent.parent / '3_analyzed'
+    analyzed_dir.mkdir(parents=True, exist_ok=True)
+    return analyzed_dir / f"{Path(songs_file).stem}{RESULTS_SUFFIX}"
+
+
+def deadletter_path(songs_file):
+    """3_analyzed/<stem>_CLAUDE_DEADLETTER.jsonl for a 2_deduped songs file"""
+    return results_path(songs_file).with_name(f"{Path(songs_file).stem}{DEADLETTER_SUFFIX}")
+
+
+def run_log_path(songs_file):
+    """3_analyzed/ananki_runs.jsonl next to a songs file's results stream"""
+    return results_path(songs_file).with_name(RUN_LOG)
+
+
+def results_stem(path):
+    return Path(path).name[:-len(RESULTS_SUFFIX)]
+
+
+def is_mapped(song):
+    return song.get('ananki_subvibe', 'AMBIGUOUS') != 'AMBIGUOUS' and song.get('ananki_confidence', 0.0) >= MIN_CONFIDENCE
+
+
+def song_key(song):
+    """Identity of a song inside a songs file (spotify_id, else artist - title)"""
+    return song.get('spotify_id') or f"{song.get('artist', '')} - {song.get('song', '')}"
+
+
+def songs_fingerprint(songs):
+    """Hash of a songs file's song list - changes whenever dedupe regenerates it"""
+    digest = hashlib.sha1('\n'.join(song_key(song) for song in songs).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def legacy_checkpoint_path(songs_file):
+    """2_deduped/<stem>_ANANKI_CHECKPOINT.json written by the pre-stream map_songs"""
+    return Path(songs_file).parent / f"{Path(songs_file).stem}_ANANKI_CHECKPOINT.json"
+
+
+def rotate_stale(path):
+    """Move a results / dead-letter file that belongs to an older songs file out of the way"""
+    path = Path(path)
+    stale = path.with_name(f"{path.stem}.{time.strftime('%Y%m%d-%H%M%S')}.stale{path.suffix}")
+    os.replace(path, stale)
+    return stale
+
+
+def _read_records(path):
+    """(record, end_offset) for every complete line; stops at a torn tail"""
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            if not line.endswith(b'\n'):
+                return  # killed mid-write
+            offset += len(line)
+            yield record, offset
+
+
+class ResultStream:
+    """
+    Writer side: append-only results journal + resume cursor
+    songs may hold None for songs the caller doesn't have (dead-letter replay);
+    a stream written for a different version of the songs file is rotated away,
+    or raises ValueError with rotate=False.
+    """
+
+    def __init__(self, path, songs_file, songs, fingerprint=None, rotate=True):
+        self.path = Path(path)
+        self.total = len(songs)
+        self.fingerprint = fingerprint or (songs_fingerprint(songs) if None not in songs else None)
+        self.keys = [song_key(song) if song is not None else None for song in songs]
+        self.done = set()
+        self.mapped = 0
+        self.ambiguous = 0
+        self.rotated = None
+
+        good_offset = 0
+        if self.path.exists():
+            records = []
+            for record, good_offset in _read_records(self.path):
+                records.append(record)
+            reason = self._stale(records)
+            if reason and not rotate:
+                raise ValueError(f"{self.path.name} belongs to another version of {songs_file} ({reason})")
+            if reason:
+                self.rotated = rotate_stale(self.path)
+                print(f"[STALE] {self.path.name}: {reason} - moved to {self.rotated.name}, starting fresh")
+                good_offset = 0
+            else:
+                for record in records:
+                    if 'i' in record:
+                        self._count(record['i'], record['song'])
+                if good_offset != self.path.stat().st_size:
+                    # Drop the torn line so appends start on a clean line
+                    with open(self.path, 'r+b') as f:
+                        f.truncate(good_offset)
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if good_offset == 0:
+            self._write([{'t': 'header', 'songs_file': str(songs_file), 'total': self.total,
+                          'fingerprint': self.fingerprint}])
+
+    def _stale(self, records):
+        """Why the existing stream doesn't belong to these songs (None if it does)"""
+        header = records[0] if records and records[0].get('t') == 'header' else {}
+        if header.get('total') is not None and header['total'] != self.total:
+            return f"{header['total']} songs in the stream, {self.total} in the songs file"
+        if header.get('fingerprint') and self.fingerprint and header['fingerprint'] != self.fingerprint:
+            return "songs file regenerated since"
+        # Streams written before the fingerprint: check every answer against its song
+        for record in records:
+            if 'i' not in record:
+                continue
+            index = record['i']
+            if index >= self.total:
+                return f"song #{index} is out of range"
+            expected = self.keys[index]
+            if expected is not None and record.get('id', song_key(record['song'])) != expected:
+                return f"song #{index} is a different song now"
+        return None
+
+    def _count(self, index, song):
+        if index in self.done:
+            return False
+        self.done.add(index)
+        if is_mapped(song):
+            self.mapped += 1
+        else:
+            self.ambiguous += 1
+        return True
+
+    def _write(self, records):
+        self._file.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def __contains__(self, index):
+        return index in self.done
+
+    def append(self, items):
+        """Durably record (index, song) results; indices already recorded are skipped"""
+        records = [{'i': index, 'id': song_key(song), 'song': song} for index, song in items if self._count(index, song)]
+        if records:
+            self._write(records)
+
+    def fold_legacy(self, checkpoint_file):
+        """
+        Append the answers in an old _ANANKI_CHECKPOINT.json (matched by
+        spotify_id, so a regenerated songs file is fine) and delete it
+        Returns the number of songs taken over.
+        """
+        checkpoint_file = Path(checkpoint_file)
+        if not checkpoint_file.exists():
+            return 0
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        indices = {}
+        for index, key in enumerate(self.keys):
+            if key is not None:
+                indices.setdefault(key, index)
+        items = []
+        for song in checkpoint.get('mapped_songs', []) + checkpoint.get('ambiguous_songs', []):
+            index = indices.get(song_key(song))
+            if index is not None and index not in self.done and 'ananki_subvibe' in song:
+                items.append((index, song))
+        before = len(self.done)
+        self.append(items)
+        # Everything it held is in the stream now (the old code deleted it on success too)
+        checkpoint_file.unlink()
+        return len(self.done) - before
+
+    @property
+    def complete(self):
+        return len(self.done) >= self.total
+
+    def close(self):
+        self._file.close()
+
+
+class DeadLetters:
+    """Songs whose API calls failed for good: index -> {song, error, at}"""
+
+    def __init__(self, path, songs_file=None, total=None, meta_vibe=None, fingerprint=None):
+        self.path = Path(path)
+        self.header = {'t': 'header', 'songs_file': str(songs_file) if songs_file else None,
+                       'total': total, 'meta_vibe': meta_vibe, 'fingerprint': fingerprint}
+        self.failed = {}
+        if fingerprint and self.path.exists():
+            # Failures recorded for an older version of the songs file would replay the wrong songs
+            header = next(_read_records(self.path), ({}, 0))[0]
+            if header.get('fingerprint') != fingerprint:
+                print(f"[STALE] {self.path.name} - moved to {rotate_stale(self.path).name}")
+        if self.path.exists():
+            for record, _ in _read_records(self.path):
+                if record.get('t') == 'header':
+                    self.header = record
+                elif 'i' in record:
+                    self.failed[record['i']] = record
+
+    def __len__(self):
+        return len(self.failed)
+
+    def __contains__(self, index):
+        return index in self.failed
+
+    def add(self, items):
+        """Durably record (index, song, error) failures"""
+        records = [{'i': index, 'song': song, 'error': error, 'at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                   for index, song, error in items]
+        if not records:
+            return
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, 'a', encoding='utf-8') as f:
+            lines = ([self.header] if new_file else []) + records
+            f.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self.failed[record['i']] = record
+
+    def discard(self, indices):
+        """Drop entries that have been answered since (deletes the file once empty)"""
+        indices = [i for i in indices if i in self.failed]
+        if not indices:
+            return
+        for index in indices:
+            del self.failed[index]
+        if not self.failed:
+            self.path.unlink(missing_ok=True)
+            return
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for record in [self.header] + list(self.failed.values()):
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp, self.path)
+
+
+def log_run(path, record):
+    """Append one run summary to the run log"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_runs(path):
+    """Run summaries, oldest first ([] if there is no log yet)"""
+    if not Path(path).exists():
+        return []
+    return [record for record, _ in _read_records(path)]
+
+
+class AnankiResults:
+    """Reader side: lazy mapped / ambiguous views over a results stream"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.header = {}
+        for record, _ in _read_records(self.path):
+            if record.get('t') == 'header':
+                self.header = record
+            break
+
+    def songs(self):
+        """Every answered song once (in the order answers arrived)"""
+        seen = set()
+        for record, _ in _read_records(self.path):
+            if 'i' in record and record['i'] not in seen:
+                seen.add(record['i'])
+                yield record['song']
+
+    def indices(self):
+        """Song indices already answered"""
+        return {record['i'] for record, _ in _read_records(self.path) if 'i' in record}
+
+    def matches(self, songs):
+        """Was this stream written for this version of the songs file?"""
+        fingerprint = self.header.get('fingerprint')
+        if fingerprint:
+            return fingerprint == songs_fingerprint(songs)
+        # Pre-fingerprint stream: compare every answer with its song
+        for record, _ in _read_records(self.path):
+            if 'i' in record and (record['i'] >= len(songs) or
+                                  record.get('id', song_key(record['song'])) != song_key(songs[record['i']])):
+                return False
+        return self.header.get('total') in (None, len(songs))
+
+    def mapped(self):
+        return (song for song in self.songs() if is_mapped(song))
+
+    def ambiguous(self):
+        return (song for song in self.songs() if not is_mapped(song))
+
+    def counts(self):
+        mapped = ambiguous = 0
+        for song in self.songs():
+            if is_mapped(song):
+                mapped += 1
+            else:
+                ambiguous += 1
+        return {'total': self.header.get('total'), 'mapped': mapped, 'ambiguous': ambiguous}
+
+    @property
+    def complete(self):
+        counts = self.counts()
+        return counts['total'] is not None and counts['mapped'] + counts['ambiguous'] >= counts['total']
+
+    def materialize(self, kind, output_file=None):
+        """Write the legacy _CLAUDE_MAPPED / _CLAUDE_AMBIGUOUS JSON view"""
+        project_root = self.path.parent.parent
+        stem = results_stem(self.path)
+        if kind == 'mapped':
+            mapped_songs = list(self.mapped())
+            ambiguous_songs = list(self.ambiguous())
+            output_file = output_file or project_root / '3_analyzed' / 'mapped' / f"{stem}_CLAUDE_MAPPED.json"
+            content = {
+                'total': len(mapped_songs) + len(ambiguous_songs),
+                'mapped': len(mapped_songs),
+                'ambiguous': len(ambiguous_songs),
+                'mapped_songs': mapped_songs,
+                'ambiguous_songs': ambiguous_songs
+            }
+        elif kind == 'ambiguous':
+            ambiguous_songs = list(self.ambiguous())
+            output_file = output_file or project_root / '3_analyzed' / 'ambiguous' / f"{stem}_CLAUDE_AMBIGUOUS.json"
+            content = {
+                'total': len(ambiguous_songs),
+                'note': 'These need human review or are not music recommendations',
+                'songs': ambiguous_songs
+            }
+        else:
+            raise ValueError(f"Unknown view: {kind}")
+
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=2, ensure_ascii=False)
+        return output_file
+
+
+def load_mapped_songs(path):
+    """Mapped songs from a results stream or a legacy _CLAUDE_MAPPED.json file"""
+    if str(path).endswith('.jsonl'):
+        return list(AnankiResults(path).mapped())
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # Handle both old and new format
+    return data.get('mapped_songs', data.get('songs', []))
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2 or args[1] not in ('stats', 'mapped', 'ambiguous'):
+        print(__doc__)
+        return
+
+    results = AnankiResults(args[0])
+    if args[1] == 'stats':
+        counts = results.counts()
+        answered = counts['mapped'] + counts['ambiguous']
+        print(f"{results.path.name}: {answered}/{counts['total']} answered "
+              f"({'complete' if results.complete else 'in progress'})")
+        print(f"  Mapped: {counts['mapped']} | Ambiguous: {counts['ambiguous']}")
+    else:
+        print(f"Saved to: {results.materialize(args[1])}")
+
+
+if __name__ == '__main__':
+    main()
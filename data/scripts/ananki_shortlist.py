@@ -0,0 +1,205 @@
+"""
+Sub-vibe shortlist for TRUE Ananki prompts
+Instead of asking Claude to pick from all 114 sub-vibes, each context gets
+the top-k plausible candidates, scored from:
+  - the scrape's meta_vibe (the scraper that found the song)
+  - COMPLETE_KEYWORD_MAP hits (plus each sub-vibe's own name) in the post
+    title / comment text
+  - manifold neighbourhood (emotional_manifold_COMPLETE.json): sub-vibes
+    close to the meta-vibe centre or to a keyword hit, and sub-vibes whose
+    emotional composition leans toward the meta-vibe
+Claude may answer "OTHER" when none of the candidates fits; that song is
+re-asked with the full list. Contexts with no signal at all (no meta-vibe,
+no keyword hit) always get the full list.
+
+Check recall against answers Ananki already gave (full-list answers):
+    python ananki_shortlist.py eval <_CLAUDE_MAPPED.json | _CLAUDE_RESULTS.jsonl> ... [--k 30]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scrapers' / 'shared'))
+from vibe_config import load_keyword_map
+
+MANIFOLD_FILE = Path(__file__).parent.parent / 'emotional_manifold_COMPLETE.json'
+
+# Candidates per context (tune with `eval`)
+DEFAULT_K = int(os.getenv('ANANKI_SHORTLIST_K', 30))
+
+# Escape answer: "none of the candidates fits" -> re-ask with the full list
+OTHER = 'OTHER'
+
+# Score weights
+META_WEIGHT = 1.0          # sub-vibe belongs to the scrape's meta-vibe
+COMPOSITION_WEIGHT = 2.0   # x share of the meta-vibe in its emotional composition
+KEYWORD_WEIGHT = 2.0       # per distinct keyword hit
+PROXIMITY_WEIGHT = 3.0     # x closeness to the meta centre / a keyword hit
+# Manifold distance (0-1000 grid) at which closeness has dropped to 1/e
+PROXIMITY_RADIUS = 120.0
+
+
+def parent_of(sub_vibe):
+    return sub_vibe.split(' - ')[0]
+
+
+# Name words too generic to count as a keyword hit
+GENERIC_WORDS = {'songs', 'music', 'vibes', 'times', 'feel', 'mode', 'energy', 'night', 'party', 'drive'}
+
+
+def name_tokens(sub_vibe):
+    """'Sad - Nostalgic Simpler Times' -> ['nostalgic', 'simpler']"""
+    words = re.findall(r"[a-z0-9']+", sub_vibe.split(' - ', 1)[-1].lower())
+    return [w for w in words if len(w) > 2 and w not in GENERIC_WORDS]
+
+
+def stem(word):
+    """Crude prefix stem: drop up to 3 trailing letters, keep at least 4"""
+    return word[:max(4, len(word) - 3)] if len(word) > 5 else word
+
+
+def keyword_patterns(subvibes, keyword_map=None):
+    """
+    One regex per sub-vibe: mapped keywords (whole words) + stems of its own
+    name ('Nostalgic 90s' also matches 'nostalgia', 'Heartbreak' 'heartbroken').
+    Sub-vibes with no usable words get no pattern (an empty one matches everything).
+    """
+    keyword_map = load_keyword_map() if keyword_map is None else keyword_map
+    patterns = {}
+    for name in subvibes:
+        words = [re.escape(w.lower()) + r"\b" for w in keyword_map.get(name, [])]
+        words += [re.escape(stem(token)) + r"\w*" for token in name_tokens(name)]
+        if words:
+            patterns[name] = re.compile(rf"\b(?:{'|'.join(sorted(set(words), key=len, reverse=True))})")
+    return patterns
+
+
+def context_text(song):
+    return f"{song.get('post_title') or ''} {(song.get('comment_text') or '')[:500]}".lower()
+
+
+class SubVibeShortlist:
+    """Scores every sub-vibe for a context and keeps the top k"""
+
+    def __init__(self, subvibes, k=DEFAULT_K, manifold_file=MANIFOLD_FILE, keyword_map=None):
+        self.subvibes = sorted(subvibes)
+        self.k = k
+        self.metas = {parent_of(name) for name in self.subvibes}
+        self._memo = {}
+
+        manifold = {}
+        if Path(manifold_file).exists():
+            with open(manifold_file, 'r', encoding='utf-8') as f:
+                manifold = json.load(f)
+        self.centres = {name: (pos['x'], pos['y'])
+                        for name, pos in manifold.get('central_vibes', {}).get('positions', {}).items()}
+        self.coordinates = {}
+        self.composition = {}
+        for name, info in manifold.get('sub_vibes', {}).items():
+            if name in self.subvibes:
+                self.coordinates[name] = (info['coordinates']['x'], info['coordinates']['y'])
+                self.composition[name] = info.get('emotional_composition', {})
+
+        self.patterns = keyword_patterns(self.subvibes, keyword_map)
+
+    def normalise_meta(self, meta_vibe):
+        """'dark' / 'Dark' -> 'Dark'; unknown names -> None"""
+        if not meta_vibe:
+            return None
+        meta = str(meta_vibe).strip().capitalize()
+        return meta if meta in self.metas or meta in self.centres else None
+
+    def scores(self, song, meta_vibe=None):
+        """{sub_vibe: score} (only sub-vibes with some signal), and whether anything matched"""
+        meta = self.normalise_meta(meta_vibe)
+        text = context_text(song)
+        hits = {name: len(set(pattern.findall(text))) for name, pattern in self.patterns.items()}
+        hits = {name: count for name, count in hits.items() if count}
+
+        anchors = [self.coordinates[name] for name in hits if name in self.coordinates]
+        if meta in self.centres:
+            anchors.append(self.centres[meta])
+
+        scores = {}
+        for name in self.subvibes:
+            score = KEYWORD_WEIGHT * hits.get(name, 0)
+            if meta:
+                score += META_WEIGHT * (parent_of(name) == meta)
+                score += COMPOSITION_WEIGHT * self.composition.get(name, {}).get(meta, 0.0)
+            if anchors and name in self.coordinates:
+                x, y = self.coordinates[name]
+                nearest = min(math.hypot(x - ax, y - ay) for ax, ay in anchors)
+                score += PROXIMITY_WEIGHT * math.exp(-nearest / PROXIMITY_RADIUS)
+            if score > 0:
+                scores[name] = score
+        return scores, bool(meta or hits)
+
+    def candidates(self, song, meta_vibe=None):
+        """Sorted top-k sub-vibes for this song's context, or None (= use the full list)"""
+        key = (meta_vibe, song.get('source_url') or '', song.get('comment_text') or '', song.get('post_title') or '')
+        if key not in self._memo:
+            scores, signal = self.scores(song, meta_vibe)
+            if not signal or self.k >= len(self.subvibes):
+                self._memo[key] = None
+            else:
+                top = sorted(scores, key=lambda name: (-scores[name], name))[:self.k]
+                # Alphabetical, so the prompt doesn't leak the ranking
+                self._memo[key] = sorted(top)
+        return self._memo[key]
+
+
+# ---- offline evaluation ----
+
+def meta_from_filename(path):
+    """'night_smart_extraction_DEDUPED_CLAUDE_MAPPED.json' -> 'Night'"""
+    return Path(path).name.split('_')[0].capitalize()
+
+
+def evaluate(shortlist, path):
+    from ananki_results import load_mapped_songs
+    meta = meta_from_filename(path)
+    songs = [s for s in load_mapped_songs(path) if s.get('ananki_subvibe') in shortlist.subvibes]
+    covered = full = 0
+    sizes = []
+    for song in songs:
+        candidates = shortlist.candidates(song, meta)
+        if candidates is None:
+            full += 1
+            covered += 1
+            continue
+        sizes.append(len(candidates))
+        covered += song['ananki_subvibe'] in candidates
+    recall = covered / len(songs) if songs else 0
+    average = sum(sizes) / len(sizes) if sizes else len(shortlist.subvibes)
+    print(f"{Path(path).name}: {len(songs)} answers | meta {meta} | recall {recall:.1%} | "
+          f"avg candidates {average:.1f}/{len(shortlist.subvibes)} | full list {full}")
+    return len(songs), covered
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sub-vibe shortlist for Ananki prompts')
+    parser.add_argument('command', choices=['eval'])
+    parser.add_argument('files', nargs='+', help='_CLAUDE_MAPPED.json / _CLAUDE_RESULTS.jsonl files')
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    args = parser.parse_args()
+
+    with open(MANIFOLD_FILE, 'r', encoding='utf-8') as f:
+        subvibes = list(json.load(f)['sub_vibes'])
+    shortlist = SubVibeShortlist(subvibes, k=args.k)
+
+    total = covered = 0
+    for path in args.files:
+        n, c = evaluate(shortlist, path)
+        total += n
+        covered += c
+    print(f"\nOverall recall at k={args.k}: {covered / max(total, 1):.1%} "
+          f"(misses are re-asked with the full list when Claude answers {OTHER})")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,15 @@
 AUTOMATED TAPESTRY PIPELINE
 Monitors 1_raw_scrapes/ and automatically processes new files through the entire workflow:
 1. Dedupe (→ 2_deduped/)
-2. Ananki Analysis (→ 3_analyzed/mapped/)
+2. Ananki Analysis (→ 3_analyzed/*_CLAUDE_RESULTS.jsonl)
 3. Inject to Tapestry (→ 4_injected/)
+Steps 1-3 run in-process as overlapping stages (pipeline_runner.py).
 
 Run this after scraping completes!
 """
 
-import json
 import os
 import sys
-import subprocess
 from pathlib import Path
 import time
 import logging
@@ -40,50 +39,14 @@ sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='repla
 
 logger = logging.getLogger(__name__)
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pipeline_runner import TapestryPipeline, pending_files
+from tapestry_store import TapestryStore
+
 RAW_DIR = PROJECT_ROOT / '1_raw_scrapes'
 DEDUPED_DIR = PROJECT_ROOT / '2_deduped'
-ANALYZED_DIR = PROJECT_ROOT / '3_analyzed' / 'mapped'
+ANALYZED_DIR = PROJECT_ROOT / '3_analyzed'
 INJECTED_DIR = PROJECT_ROOT / '4_injected'
-SCRIPTS_DIR = PROJECT_ROOT / 'scripts'
-
-def run_command(cmd, desc):
-    """Run a command and show output with detailed error logging"""
-    logger.info(f"{'='*70}")
-    logger.info(f"{desc}")
-    logger.info(f"{'='*70}")
-    logger.debug(f"Command: {cmd}")
-
-    try:
-        # Use Popen for real-time output streaming (no timeout - let Ananki run as long as needed)
-        process = subprocess.Popen(
-            cmd,
-            shell=True,
-            cwd=SCRIPTS_DIR,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
-
-        # Stream output in real-time
-        for line in process.stdout:
-            print(line.rstrip())
-            logger.info(line.rstrip())
-
-        # Wait for completion
-        returncode = process.wait()
-
-        if returncode != 0:
-            logger.error(f"Command failed with exit code {returncode}")
-            return False
-
-        logger.info(f"✓ {desc} completed successfully")
-        return True
-
-    except Exception as e:
-        logger.error(f"Exception running command: {e}", exc_info=True)
-        return False
 
 def process_pipeline():
     logger.info("="*70)
@@ -105,111 +68,36 @@ def process_pipeline():
 
         logger.info("Starting automated processing...")
 
-        # STEP 1: BATCH DEDUPE
-        logger.info("\n" + "="*70)
-        logger.info("STEP 1: BATCH DEDUPLICATION")
-        logger.info("="*70)
-
-        file_args = ' '.join([f'"{f}"' for f in raw_files])
-        dedupe_cmd = f'python batch_dedupe_before_ananki.py {file_args}'
-
-        if not run_command(dedupe_cmd, "Running batch deduplication"):
-            logger.error("❌ Deduplication failed - STOPPING PIPELINE")
-            return
-
     except Exception as e:
         logger.error(f"FATAL ERROR in pipeline initialization: {e}", exc_info=True)
         return
-    
-    # STEP 2: RUN ANANKI ON ALL DEDUPED FILES
-    try:
-        logger.info("\n" + "="*70)
-        logger.info("STEP 2: TRUE ANANKI ANALYSIS")
-        logger.info("="*70)
-
-        deduped_files = list(DEDUPED_DIR.glob('*_DEDUPED.json'))
-        logger.info(f"Found {len(deduped_files)} deduped files")
-
-        # Filter to only files that need processing - check if NEWER than existing MAPPED versions
-        need_ananki = []
-        for f in deduped_files:
-            mapped_file = ANALYZED_DIR / f"{f.stem}_CLAUDE_MAPPED.json"
-            injected_file = INJECTED_DIR / f"{f.stem}_CLAUDE_MAPPED.json"
-
-            # Check if ANY mapped version exists
-            existing_mapped = None
-            if mapped_file.exists():
-                existing_mapped = mapped_file
-                logger.debug(f"{f.name} - found existing mapped file")
-            elif injected_file.exists():
-                existing_mapped = injected_file
-                logger.debug(f"{f.name} - found existing injected file")
-
-            # If no mapped version exists, OR deduped file is NEWER, process it
-            if existing_mapped is None:
-                need_ananki.append(f)
-                logger.info(f"  ✓ NEW: {f.name}")
-            elif f.stat().st_mtime > existing_mapped.stat().st_mtime:
-                # Deduped file is newer - this is fresh data!
-                need_ananki.append(f)
-                logger.info(f"  ✓ UPDATED (deduped file newer than mapped): {f.name}")
-            else:
-                logger.info(f"  ⊘ SKIP (already processed, mapped file is newer): {f.name}")
-
-        if not need_ananki:
-            logger.info("All deduped files already analyzed!")
-        else:
-            logger.info(f"\nRunning Ananki on {len(need_ananki)} files...")
-
-            for i, f in enumerate(need_ananki, 1):
-                logger.info(f"\n[{i}/{len(need_ananki)}] Processing {f.name}")
-                ananki_cmd = f'python true_ananki_claude_api.py "{f}"'
-                if not run_command(ananki_cmd, f"Analyzing {f.name}"):
-                    logger.error(f"❌ Skipping {f.name} due to error")
-                    continue
 
-    except Exception as e:
-        logger.error(f"FATAL ERROR in Ananki step: {e}", exc_info=True)
-        return
-    
-    # STEP 3: INJECT TO TAPESTRY
+    # STEPS 1-3: DEDUPE -> TRUE ANANKI -> INJECT, in one process
+    # (one file is injected while the next is with Claude - see pipeline_runner.py)
     try:
         logger.info("\n" + "="*70)
-        logger.info("STEP 3: INJECT TO TAPESTRY")
+        logger.info("STEPS 1-3: DEDUPE -> TRUE ANANKI -> INJECT")
         logger.info("="*70)
 
-        mapped_files = list(ANALYZED_DIR.glob('*_CLAUDE_MAPPED.json'))
-
-        if not mapped_files:
-            logger.warning("No mapped files found in 3_analyzed/mapped/")
-            logger.warning("This means either:")
-            logger.warning("  1. No files were successfully analyzed by Ananki")
-            logger.warning("  2. Files were already injected previously")
+        # Deduped files / complete results left over from an earlier run join mid-way
+        deduped_files, results_files = pending_files(raw_files)
+        for f in deduped_files:
+            logger.info(f"  + pending deduped file: {f.name}")
+        for f in results_files:
+            logger.info(f"  + pending results (not injected yet): {f.name}")
+
+        runner = TapestryPipeline(injected_dir=INJECTED_DIR, log=logger.info)
+        runner.run(raw_files, deduped_files, results_files)
+
+        for stage, job, error in runner.failed:
+            name = job.get('name', job) if isinstance(job, dict) else job
+            logger.error(f"❌ {stage} failed for {name}: {error}")
+        if any(stage == 'dedupe' for stage, _, _ in runner.failed):
+            logger.error("❌ Deduplication failed - STOPPING PIPELINE (raw files kept)")
             return
 
-        logger.info(f"Injecting {len(mapped_files)} files to tapestry...")
-
-        for i, f in enumerate(mapped_files, 1):
-            logger.info(f"\n[{i}/{len(mapped_files)}] Injecting {f.name}")
-            inject_cmd = f'python inject_to_tapestry.py "{f}"'
-            if not run_command(inject_cmd, f"Injecting {f.name}"):
-                logger.error(f"❌ Skipping {f.name} due to error")
-                continue
-
-            # Move to 4_injected/
-            dest = INJECTED_DIR / f.name
-            f.rename(dest)
-            logger.info(f"✓ Moved to: {dest}")
-
-            # Also move the ambiguous file if it exists
-            ambig_file = f.parent.parent / 'ambiguous' / f"{f.stem.replace('_MAPPED', '_AMBIGUOUS')}.json"
-            if ambig_file.exists():
-                ambig_dest = INJECTED_DIR / ambig_file.name
-                ambig_file.rename(ambig_dest)
-                logger.debug(f"Moved ambiguous file: {ambig_file.name}")
-
     except Exception as e:
-        logger.error(f"FATAL ERROR in injection step: {e}", exc_info=True)
+        logger.error(f"FATAL ERROR in pipeline stages: {e}", exc_info=True)
         return
 
     # STEP 4: CLEANUP - Move raw files to archive
@@ -243,11 +131,8 @@ def process_pipeline():
     logger.info("="*70)
 
     try:
-        tapestry_file = PROJECT_ROOT / 'core' / 'tapestry.json'
-        if tapestry_file.exists():
-            t = json.load(open(tapestry_file, encoding='utf-8'))
-            total = sum(len(v['songs']) for v in t['vibes'].values())
-            logger.info(f"\n✓ Tapestry now has: {total:,} songs!")
+        total = TapestryStore().total_songs()
+        logger.info(f"\n✓ Tapestry now has: {total:,} songs!")
         logger.info(f"✓ Log saved to: {log_file}")
     except Exception as e:
         logger.error(f"ERROR reading final stats: {e}", exc_info=True)
@@ -8,7 +8,89 @@ import json
 from pathlib import Path
 import sys
 
-def batch_dedupe(file_list):
+from tapestry_store import TapestryStore
+
+def dedupe_file(scraped_file, seen_ids, store=None, index=None):
+    """
+    Dedupe one scraped file against the tapestry and against seen_ids (Spotify
+    IDs already kept from other files in this batch; updated in place).
+    Pass a prebuilt TapestryIndex to share one index across files, otherwise
+    a batch-sized index is built from the store.
+    Writes 2_deduped/<stem>_DEDUPED.json and returns (output_file, stats).
+    """
+    scraped_path = Path(scraped_file)
+    
+    # Load scraped songs
+    with open(scraped_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    songs = data.get('songs', [])
+    
+    # Duplicate index of just what this file can collide with (shared with inject)
+    if index is None:
+        index = (store or TapestryStore()).index(songs)
+    
+    # Filter out duplicates
+    new_songs = []
+    dup_tapestry = 0
+    dup_crossfile = 0
+    
+    for song in songs:
+        spotify_id = song.get('spotify_id')
+        
+        if not spotify_id:
+            continue
+        
+        # Check against tapestry
+        if index.contains(spotify_id=spotify_id):
+            dup_tapestry += 1
+            continue
+        
+        # Check against other files being processed
+        if spotify_id in seen_ids:
+            dup_crossfile += 1
+            continue
+        
+        # It's new! Add it
+        new_songs.append(song)
+        seen_ids.add(spotify_id)
+    
+    # Save deduped file to 2_deduped/ directory (NOT back to same folder!)
+    project_root = Path(__file__).parent.parent
+    deduped_dir = project_root / '2_deduped'
+    deduped_dir.mkdir(parents=True, exist_ok=True)
+    output_file = deduped_dir / f"{scraped_path.stem}_DEDUPED.json"
+    
+    stats = {
+        'original_count': len(songs),
+        'new_count': len(new_songs),
+        'duplicates_in_tapestry': dup_tapestry,
+        'duplicates_in_batch': dup_crossfile
+    }
+    output_data = {
+        'meta_vibe': data.get('meta_vibe', 'Unknown'),
+        'songs': new_songs,
+        'deduplication_stats': stats
+    }
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    
+    # Stats (priced like ananki_preflight.py: run history, else the model's list price)
+    from ananki_preflight import cost_per_song
+    per_song = cost_per_song()
+    savings_tapestry = dup_tapestry * per_song
+    savings_crossfile = dup_crossfile * per_song
+    
+    print(f"{scraped_path.name}:")
+    print(f"  New songs: {len(new_songs)}")
+    print(f"  Duplicates (in tapestry): {dup_tapestry} (saved ${savings_tapestry:.2f})")
+    print(f"  Duplicates (cross-file): {dup_crossfile} (saved ${savings_crossfile:.2f})")
+    print(f"  Saved to: {output_file.name}\n")
+    return output_file, stats
+
+
+def batch_dedupe(file_list, store=None):
     """
     Dedupe multiple files at once, checking against tapestry AND against each other
     """
@@ -17,19 +99,8 @@ def batch_dedupe(file_list):
     print("BATCH PRE-ANANKI DEDUPLICATION")
     print("="*70)
     
-    # Load tapestry
-    tapestry_file = Path(__file__).parent.parent.parent / 'core' / 'tapestry.json'
-    with open(tapestry_file, 'r', encoding='utf-8') as f:
-        tapestry = json.load(f)
-    
-    # Build global Spotify ID index from tapestry
-    existing_ids = set()
-    for subvibe_data in tapestry['vibes'].values():
-        for song in subvibe_data.get('songs', []):
-            if 'spotify_id' in song:
-                existing_ids.add(song['spotify_id'])
-    
-    print(f"Existing songs in tapestry: {len(existing_ids):,}")
+    store = store or TapestryStore()
+    print(f"Existing songs in tapestry: {store.total_songs():,}")
     print(f"Files to process: {len(file_list)}\n")
     
     # Track IDs across all files being processed
@@ -40,75 +111,15 @@ def batch_dedupe(file_list):
     total_dup_crossfile = 0
     
     for scraped_file in file_list:
-        scraped_path = Path(scraped_file)
-        
-        # Load scraped songs
-        with open(scraped_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        songs = data.get('songs', [])
-        
-        # Filter out duplicates
-        new_songs = []
-        dup_tapestry = 0
-        dup_crossfile = 0
-        
-        for song in songs:
-            spotify_id = song.get('spotify_id')
-            
-            if not spotify_id:
-                continue
-            
-            # Check against tapestry
-            if spotify_id in existing_ids:
-                dup_tapestry += 1
-                continue
-            
-            # Check against other files being processed
-            if spotify_id in cross_file_ids:
-                dup_crossfile += 1
-                continue
-            
-            # It's new! Add it
-            new_songs.append(song)
-            cross_file_ids.add(spotify_id)
-        
-        # Save deduped file to 2_deduped/ directory (NOT back to same folder!)
-        project_root = Path(__file__).parent.parent
-        deduped_dir = project_root / '2_deduped'
-        deduped_dir.mkdir(parents=True, exist_ok=True)
-        output_file = deduped_dir / f"{scraped_path.stem}_DEDUPED.json"
-        
-        output_data = {
-            'meta_vibe': data.get('meta_vibe', 'Unknown'),
-            'songs': new_songs,
-            'deduplication_stats': {
-                'original_count': len(songs),
-                'new_count': len(new_songs),
-                'duplicates_in_tapestry': dup_tapestry,
-                'duplicates_in_batch': dup_crossfile
-            }
-        }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
-        
-        # Stats
-        savings_tapestry = dup_tapestry * 0.003
-        savings_crossfile = dup_crossfile * 0.003
-        
-        print(f"{scraped_path.name}:")
-        print(f"  New songs: {len(new_songs)}")
-        print(f"  Duplicates (in tapestry): {dup_tapestry} (saved ${savings_tapestry:.2f})")
-        print(f"  Duplicates (cross-file): {dup_crossfile} (saved ${savings_crossfile:.2f})")
-        print(f"  Saved to: {output_file.name}\n")
+        _, stats = dedupe_file(scraped_file, cross_file_ids, store)
         
-        total_new += len(new_songs)
-        total_dup_tapestry += dup_tapestry
-        total_dup_crossfile += dup_crossfile
+        total_new += stats['new_count']
+        total_dup_tapestry += stats['duplicates_in_tapestry']
+        total_dup_crossfile += stats['duplicates_in_batch']
     
     # Summary
-    total_savings = (total_dup_tapestry + total_dup_crossfile) * 0.003
+    from ananki_preflight import cost_per_song
+    total_savings = (total_dup_tapestry + total_dup_crossfile) * cost_per_song()
     
     print("="*70)
     print(f"BATCH SUMMARY:")
@@ -119,6 +130,7 @@ def batch_dedupe(file_list):
     print("="*70)
     
     print(f"\nNext: Run TRUE Ananki on each *_DEDUPED.json file")
+    print("  (expected cost / wall-clock first: python ananki_preflight.py)")
 
 if __name__ == '__main__':
     if len(sys.argv) > 1:
@@ -4,6 +4,8 @@ Batch inject all CLAUDE_MAPPED files to restore TRUE Ananki tapestry
 import subprocess
 from pathlib import Path
 
+from tapestry_store import TapestryStore
+
 youtube_files = sorted(Path('../youtube/test_results').glob('*CLAUDE_MAPPED.json'))
 reddit_files = sorted(Path('../reddit/test_results').glob('*CLAUDE_MAPPED.json'))
 
@@ -20,7 +22,7 @@ for i, file in enumerate(all_files, 1):
     print(f"\n[{i}/{len(all_files)}] {vibe_name}")
 
     result = subprocess.run(
-        ['python', 'inject_to_tapestry.py', str(file)],
+        ['python', 'inject_to_tapestry.py', str(file), '--no-export'],
         capture_output=True,
         text=True,
         encoding='utf-8',
@@ -35,6 +37,9 @@ for i, file in enumerate(all_files, 1):
             print(f"  +{count} songs")
             break
 
+# Refresh core/tapestry.json once for all files
+TapestryStore().export()
+
 print("\n" + "="*70)
 print(f"TOTAL INJECTED: {total_injected:,} songs")
 print("="*70)
@@ -8,7 +8,9 @@ import json
 from pathlib import Path
 import sys
 
-def dedupe_before_ananki(scraped_file, output_file=None):
+from tapestry_store import TapestryStore
+
+def dedupe_before_ananki(scraped_file, output_file=None, store=None):
     """
     Remove songs that already exist in tapestry by Spotify ID
     Returns only NEW songs that need Ananki analysis
@@ -18,19 +20,8 @@ def dedupe_before_ananki(scraped_file, output_file=None):
     print("PRE-ANANKI DEDUPLICATION")
     print("="*70)
     
-    # Load tapestry
-    tapestry_file = Path(__file__).parent.parent.parent / 'core' / 'tapestry.json'
-    with open(tapestry_file, 'r', encoding='utf-8') as f:
-        tapestry = json.load(f)
-    
-    # Build global Spotify ID index
-    existing_ids = set()
-    for subvibe_data in tapestry['vibes'].values():
-        for song in subvibe_data.get('songs', []):
-            if 'spotify_id' in song:
-                existing_ids.add(song['spotify_id'])
-    
-    print(f"Existing songs in tapestry: {len(existing_ids)}")
+    store = store or TapestryStore()
+    print(f"Existing songs in tapestry: {store.total_songs()}")
     
     # Load scraped songs
     with open(scraped_file, 'r', encoding='utf-8') as f:
@@ -39,23 +30,26 @@ def dedupe_before_ananki(scraped_file, output_file=None):
     songs = data.get('mapped_songs', data.get('songs', []))
     print(f"Scraped songs to check: {len(songs)}")
     
+    # Duplicate index of just what this file can collide with (shared with inject)
+    index = store.index(songs)
+    
     # Filter out duplicates
     new_songs = []
     duplicates = 0
     
     for song in songs:
         spotify_id = song.get('spotify_id')
-        if spotify_id and spotify_id in existing_ids:
+        if spotify_id and index.contains(spotify_id=spotify_id):
             duplicates += 1
         else:
             new_songs.append(song)
-            if spotify_id:
-                existing_ids.add(spotify_id)  # Track within this file too
+            index.add(None, song)  # Track within this file too
     
     print(f"\nResults:")
     print(f"  New songs (need Ananki): {len(new_songs)}")
     print(f"  Duplicates (skipped): {duplicates}")
-    print(f"  Savings: ${duplicates * 0.003:.2f} (avoided analyzing {duplicates} duplicates!)")
+    from ananki_preflight import cost_per_song
+    print(f"  Savings: ${duplicates * cost_per_song():.2f} (avoided analyzing {duplicates} duplicates!)")
     
     # Save deduplicated file to 2_deduped/ directory (NOT back to same folder!)
     if output_file is None:
@@ -75,6 +69,7 @@ def dedupe_before_ananki(scraped_file, output_file=None):
     
     print(f"\nSaved to: {output_file}")
     print(f"\nNext: python true_ananki_claude_api.py {output_file.name}")
+    print(f"  (expected cost / wall-clock first: python ananki_preflight.py {output_file})")
     print("="*70)
     
     return new_songs, duplicates
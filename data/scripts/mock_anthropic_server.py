@@ -0,0 +1,254 @@
+"""
+MOCK ANTHROPIC SERVER - exercise Ananki without spending credits
+Implements just enough of the Messages + Message Batches API for
+true_ananki_claude_api.py (live, batched and --bulk modes):
+
+    POST /v1/messages
+    POST /v1/messages/batches
+    GET  /v1/messages/batches/<id>
+    GET  /v1/messages/batches/<id>/results
+
+Answers are deterministic: each song gets the first sub-vibe (from the
+system prompt's list, or from its CANDIDATE SUB-VIBES line) whose words
+appear in its comment/post text, else AMBIGUOUS (OTHER for shortlisted songs). Prompt caching is simulated: the first request with a given
+system prefix reports cache_creation_input_tokens, later ones
+cache_read_input_tokens. Batches end --batch-delay seconds after submit.
+Requests with a forced tool (tool_choice) are answered with a tool_use
+block, others with JSON text. --sloppy makes that share of answers use a
+near-miss sub-vibe name (lowercase, en dash) and put braces in the reasoning,
+to exercise the lenient parsing and name correction.
+--fail-rate makes that share of live /v1/messages calls fail with
+--fail-status (529 "overloaded" by default, with Retry-After: 1) to exercise
+retries, the circuit breaker and the dead-letter file.
+
+Usage:
+    python mock_anthropic_server.py [--port 8765] [--batch-delay 5] [--fail-rate 0.3] [--fail-status 529] [--sloppy 0.2]
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock \\
+        python true_ananki_claude_api.py ../2_deduped/<file>.json --bulk --poll 2
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCHES = {}
+SEEN_PREFIXES = set()
+LOCK = threading.Lock()
+BATCH_DELAY = 5.0
+FAIL_RATE = 0.0
+FAIL_STATUS = 529
+SLOPPY = 0.0
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def system_text(params):
+    system = params.get('system') or ''
+    if isinstance(system, list):
+        return '\n'.join(block.get('text', '') for block in system)
+    return system
+
+
+def user_text(params):
+    content = params['messages'][-1]['content']
+    if isinstance(content, list):
+        return '\n'.join(block.get('text', '') for block in content if block.get('type') == 'text')
+    return content
+
+
+def pick_subvibe(subvibes, context):
+    # Shortlisted prompts carry their own candidates
+    shortlist = re.search(r'^CANDIDATE SUB-VIBES: (.+)$', context, re.MULTILINE)
+    if shortlist:
+        subvibes = shortlist.group(1).split(' | ')
+        context = context.replace(shortlist.group(0), '')
+    context = context.lower()
+    for sub_vibe in subvibes:
+        words = [w for w in re.split(r'\W+', sub_vibe.lower()) if len(w) > 3]
+        if any(w in context for w in words):
+            return sub_vibe, 0.8
+    return ('OTHER', 0.5) if shortlist else ('AMBIGUOUS', 0.3)
+
+
+def classification(number, sub_vibe, confidence):
+    item = {'song': number, 'sub_vibe': sub_vibe, 'reasoning': 'Mock keyword match', 'confidence': confidence}
+    if SLOPPY and random.random() < SLOPPY:
+        item['sub_vibe'] = sub_vibe.lower().replace(' - ', ' – ')
+        item['reasoning'] = 'Mock keyword match {matched the comment}'
+    return item
+
+
+def answer(params):
+    """Build a Messages API response for one request"""
+    system = system_text(params)
+    prompt = user_text(params)
+    subvibes = re.findall(r'^  - (.+)$', system + '\n' + prompt, re.MULTILINE)
+    tool = (params.get('tool_choice') or {}).get('name')
+    if tool and not subvibes:
+        # The sub-vibe list may only be in the tool's enum
+        for spec in params.get('tools', []):
+            enum = spec['input_schema']['properties']['classifications']['items']['properties']['sub_vibe']['enum']
+            subvibes = [name for name in enum if name not in ('AMBIGUOUS', 'OTHER')]
+
+    # Batched prompts: CONTEXT blocks, each listing "SONG n: Artist - Song" lines
+    contexts = re.split(r'^CONTEXT \d+:$', prompt, flags=re.MULTILINE)
+    if len(contexts) > 1:
+        items = []
+        for body in contexts[1:]:
+            for number, title in re.findall(r'^SONG (\d+): (.+)$', body, re.MULTILINE):
+                items.append(classification(int(number), *pick_subvibe(subvibes, body)))
+    else:
+        items = [classification(1, *pick_subvibe(subvibes, prompt))]
+
+    if tool:
+        content = [{'type': 'tool_use', 'id': f"toolu_{uuid.uuid4().hex[:24]}", 'name': tool,
+                    'input': {'classifications': items}}]
+        text = json.dumps(items)
+    else:
+        if len(contexts) > 1:
+            text = json.dumps(items)
+        else:
+            item = {k: v for k, v in items[0].items() if k != 'song'}
+            text = f"Here is my answer:\n```json\n{json.dumps(item)}\n```"
+        content = [{'type': 'text', 'text': text}]
+
+    # Simulated prompt cache on the system prefix
+    prefix_tokens = len(system) // 4
+    key = hashlib.sha256(system.encode('utf-8')).hexdigest()
+    with LOCK:
+        cached = key in SEEN_PREFIXES
+        SEEN_PREFIXES.add(key)
+
+    return {
+        'id': f"msg_{uuid.uuid4().hex[:24]}",
+        'type': 'message',
+        'role': 'assistant',
+        'model': params.get('model', 'mock'),
+        'content': content,
+        'stop_reason': 'tool_use' if tool else 'end_turn',
+        'stop_sequence': None,
+        'usage': {
+            'input_tokens': len(prompt) // 4,
+            'output_tokens': len(text) // 4,
+            'cache_creation_input_tokens': 0 if cached else prefix_tokens,
+            'cache_read_input_tokens': prefix_tokens if cached else 0,
+        }
+    }
+
+
+def batch_view(batch, host):
+    ended = time.time() >= batch['ends_at']
+    total = len(batch['requests'])
+    return {
+        'id': batch['id'],
+        'type': 'message_batch',
+        'processing_status': 'ended' if ended else 'in_progress',
+        'request_counts': {
+            'processing': 0 if ended else total,
+            'succeeded': total if ended else 0,
+            'errored': 0,
+            'canceled': 0,
+            'expired': 0,
+        },
+        'created_at': batch['created_at'],
+        'expires_at': batch['created_at'],
+        'ended_at': now_iso() if ended else None,
+        'cancel_initiated_at': None,
+        'archived_at': None,
+        'results_url': f"http://{host}/v1/messages/batches/{batch['id']}/results" if ended else None,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type='application/json', headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path == '/v1/messages':
+            body = self._body()
+            if random.random() < FAIL_RATE:
+                error_type = 'overloaded_error' if FAIL_STATUS == 529 else 'api_error'
+                self._send(FAIL_STATUS, {'type': 'error', 'error': {'type': error_type, 'message': 'Mock failure'}},
+                           headers={'retry-after': '1'})
+                return
+            self._send(200, answer(body))
+        elif path == '/v1/messages/batches':
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+            batch = {
+                'id': batch_id,
+                'requests': self._body()['requests'],
+                'created_at': now_iso(),
+                'ends_at': time.time() + BATCH_DELAY,
+            }
+            with LOCK:
+                BATCHES[batch_id] = batch
+            print(f"[MOCK] Batch {batch_id}: {len(batch['requests'])} requests")
+            self._send(200, batch_view(batch, self.headers.get('Host')))
+        else:
+            self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}})
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        match = re.match(r'^/v1/messages/batches/([^/]+)(/results)?$', path)
+        batch = BATCHES.get(match.group(1)) if match else None
+        if not batch:
+            self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}})
+        elif match.group(2):
+            lines = [
+                json.dumps({'custom_id': request['custom_id'],
+                            'result': {'type': 'succeeded', 'message': answer(request['params'])}})
+                for request in batch['requests']
+            ]
+            self._send(200, ('\n'.join(lines) + '\n').encode('utf-8'), 'application/binary')
+        else:
+            self._send(200, batch_view(batch, self.headers.get('Host')))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    global BATCH_DELAY, FAIL_RATE, FAIL_STATUS, SLOPPY
+    parser = argparse.ArgumentParser(description='Mock Anthropic API for Ananki')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--batch-delay', type=float, default=5.0, help='Seconds until a batch ends')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of live calls that fail')
+    parser.add_argument('--fail-status', type=int, default=529, help='HTTP status of injected failures')
+    parser.add_argument('--sloppy', type=float, default=0.0, help='Share of answers with near-miss names')
+    args = parser.parse_args()
+    BATCH_DELAY = args.batch_delay
+    SLOPPY = args.sloppy
+    FAIL_RATE = args.fail_rate
+    FAIL_STATUS = args.fail_status
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), Handler)
+    print(f"Mock Anthropic API on http://127.0.0.1:{args.port} (batches end after {BATCH_DELAY}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == '__main__':
+    main()
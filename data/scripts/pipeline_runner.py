@@ -0,0 +1,290 @@
+"""
+In-process pipeline runner: dedupe -> TRUE Ananki -> inject
+Every stage runs as worker threads in ONE process instead of a subprocess per
+step: libraries are imported once, the tapestry store / duplicate index and
+the Ananki client (rate limiter, caches, pre-classifier) are shared, and
+files move between stages through small bounded queues. As soon as one file
+is deduped it is analyzed, and while the next file is with Claude the
+previous one is already being injected - end-to-end time is roughly the
+slowest stage, not the sum of all of them.
+
+    dedupe  (1 worker: cross-file dedupe depends on file order)
+      |  bounded queue
+    ananki  (--ananki-workers, default 1; each worker has its own requests in flight)
+      |  bounded queue
+    inject  (--inject-workers, default 1; the store serializes writes anyway)
+
+Files can also enter mid-way: deduped files left over from an earlier run
+start at the Ananki stage, complete results that were never injected start
+at the inject stage. Injected results move to 4_injected/ and
+core/tapestry.json is exported once at the end.
+
+    python pipeline_runner.py 1_raw_scrapes/*.json [--ananki-workers 2] [--queue-size 2] [--bulk]
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from ananki_results import RESULTS_SUFFIX, AnankiResults, results_path
+from batch_dedupe_before_ananki import dedupe_file
+from inject_to_tapestry import inject_to_tapestry
+from tapestry_store import TapestryStore
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEDUPED_DIR = PROJECT_ROOT / '2_deduped'
+ANALYZED_DIR = PROJECT_ROOT / '3_analyzed'
+INJECTED_DIR = PROJECT_ROOT / '4_injected'
+
+# Files waiting between two stages (backpressure: dedupe never runs far ahead of Claude)
+QUEUE_SIZE = 2
+
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step: `workers` threads pulling items from a bounded input queue"""
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.processed = 0
+        self.failed = []
+        self.busy = 0.0
+
+
+class Pipeline:
+    """
+    Linear chain of stages connected by bounded queues
+    func(item) returns the item for the next stage, or None to stop it there;
+    an exception is logged and drops just that item.
+    """
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE, log=print):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.log = log
+        self.outputs = []
+        self.wall = 0.0
+
+    def run(self, feed):
+        """feed: [(stage name, item)] - items enter at the named stage. Returns the last stage's outputs."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+        positions = {stage.name: i for i, stage in enumerate(self.stages)}
+
+        def worker(i):
+            stage = self.stages[i]
+            while True:
+                item = queues[i].get()
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    result = None
+                    with lock:
+                        stage.failed.append((item, e))
+                    name = item.get('name', item) if isinstance(item, dict) else item
+                    self.log(f"[{stage.name.upper()} ERROR] {name}: {e}\n{traceback.format_exc()}")
+                with lock:
+                    stage.busy += time.perf_counter() - start
+                    stage.processed += 1
+                if result is None:
+                    continue
+                if i + 1 < len(self.stages):
+                    queues[i + 1].put(result)
+                else:
+                    with lock:
+                        self.outputs.append(result)
+
+            # The last worker out closes the next stage
+            with lock:
+                remaining[i] -= 1
+                last = remaining[i] == 0
+            if last and i + 1 < len(self.stages):
+                for _ in range(self.stages[i + 1].workers):
+                    queues[i + 1].put(_DONE)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+                   for i, stage in enumerate(self.stages) for n in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        # Later stages first, so a full dedupe queue never holds up their items
+        for name, item in sorted(feed, key=lambda entry: -positions[entry[0]]):
+            queues[positions[name]].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - start
+        return self.outputs
+
+    def summary(self):
+        lines = [f"[PIPELINE] {'stage':<8} {'workers':>7} {'files':>5} {'failed':>6} {'busy':>9}"]
+        for stage in self.stages:
+            lines.append(f"           {stage.name:<8} {stage.workers:>7} {stage.processed:>5} "
+                         f"{len(stage.failed):>6} {stage.busy:>8.1f}s")
+        serial = sum(stage.busy for stage in self.stages)
+        lines.append(f"           wall clock {self.wall:.1f}s (stages back to back: {serial:.1f}s)")
+        return "\n".join(lines)
+
+
+class TapestryPipeline:
+    """dedupe -> Ananki -> inject for scrape files, sharing one store, index and Ananki client"""
+
+    def __init__(self, ananki_workers=1, inject_workers=1, queue_size=QUEUE_SIZE, injected_dir=None,
+                 bulk=False, ananki_options=None, log=print):
+        self.injected_dir = Path(injected_dir) if injected_dir else None
+        self.bulk = bulk
+        self.ananki_options = ananki_options or {}
+        self.log = log
+
+        self.store = TapestryStore()
+        self.index = None
+        self.seen_ids = set()
+
+        # One Ananki client; extra workers get a fork (shared client, limiter, caches
+        # and pre-classifier; their own per-file state and usage counters)
+        self._ananki = None
+        self._ananki_lock = threading.Lock()
+        self._local = threading.local()
+
+        self.pipeline = Pipeline([
+            Stage('dedupe', self.dedupe),
+            Stage('ananki', self.analyze, ananki_workers),
+            Stage('inject', self.inject, inject_workers),
+        ], queue_size, log)
+
+    # ---- stages ----
+
+    def dedupe(self, job):
+        job['deduped'], job['dedupe_stats'] = dedupe_file(job['raw'], self.seen_ids, index=self.index)
+        return job
+
+    def ananki(self):
+        if getattr(self._local, 'ananki', None) is None:
+            with self._ananki_lock:
+                if self._ananki is None:
+                    from true_ananki_claude_api import TrueAnankiClaudeAPI
+                    self._ananki = TrueAnankiClaudeAPI(**self.ananki_options)
+                    self._local.ananki = self._ananki
+                else:
+                    self._local.ananki = self._ananki.fork()
+        return self._local.ananki
+
+    def analyze(self, job):
+        deduped = Path(job['deduped'])
+        results = results_path(deduped)
+        injected = self.injected_dir / results.name if self.injected_dir else None
+
+        existing = results if results.exists() else injected if injected and injected.exists() else None
+        if existing is not None and AnankiResults(existing).complete:
+            if deduped.stat().st_mtime <= existing.stat().st_mtime:
+                if existing == injected:
+                    self.log(f"[ANANKI] SKIP (already analyzed and injected): {deduped.name}")
+                    return None
+                self.log(f"[ANANKI] SKIP (results complete): {deduped.name}")
+                job['results'] = results
+                return job
+            # Deduped file is newer - fresh data
+            existing.unlink()
+            self.log(f"[ANANKI] UPDATED (deduped file newer than results): {deduped.name}")
+
+        ananki = self.ananki()
+        if self.bulk:
+            stream = ananki.map_songs_bulk(str(deduped))
+        else:
+            stream = ananki.map_songs(str(deduped))
+        if not stream.complete:
+            self.log(f"[ANANKI] {deduped.name} incomplete (failed songs in the dead-letter file) - not injected")
+            return None
+        job['results'] = stream.path
+        return job
+
+    def inject(self, job):
+        stats = inject_to_tapestry(job['results'], store=self.store, export=False)
+        job['injected'] = stats['injected']
+        if self.injected_dir:
+            # Ambiguous songs stay in the stream for review
+            self.injected_dir.mkdir(parents=True, exist_ok=True)
+            dest = self.injected_dir / Path(job['results']).name
+            Path(job['results']).rename(dest)
+            job['results'] = dest
+            self.log(f"[INJECT] Moved to: {dest}")
+        return job
+
+    # ---- entry point ----
+
+    def run(self, raw_files=(), deduped_files=(), results_files=()):
+        """Run files through the stages (each list enters at its own stage); returns the injected jobs"""
+        feed = [('dedupe', {'name': Path(f).stem, 'raw': f}) for f in raw_files]
+        feed += [('ananki', {'name': Path(f).stem, 'deduped': f}) for f in deduped_files]
+        feed += [('inject', {'name': Path(f).name, 'results': f}) for f in results_files]
+        if not feed:
+            self.log("Nothing to process")
+            return []
+        if raw_files:
+            # The whole tapestry once, before any injection starts, instead of an index per file
+            self.index = self.store.index()
+            self.log(f"[DEDUPE] Tapestry index: {len(self.index.spotify_ids):,} Spotify IDs")
+
+        jobs = self.pipeline.run(feed)
+        if jobs:
+            # core/tapestry.json once for the whole run
+            self.store.export()
+        self.log(self.pipeline.summary())
+        self.log(f"[PIPELINE] {len(jobs)} files injected, {sum(job['injected'] for job in jobs)} new songs")
+        return jobs
+
+    @property
+    def failed(self):
+        return [(stage.name, item, error) for stage in self.pipeline.stages for item, error in stage.failed]
+
+
+def pending_files(raw_files):
+    """
+    Work left over from earlier runs: deduped files that don't come from
+    raw_files (-> Ananki stage), complete results never injected (-> inject stage)
+    """
+    raw_stems = {f"{Path(f).stem}_DEDUPED" for f in raw_files}
+    deduped = sorted(f for f in DEDUPED_DIR.glob('*_DEDUPED.json') if f.stem not in raw_stems)
+    queued = raw_stems | {f.stem for f in deduped}
+    results = sorted(f for f in ANALYZED_DIR.glob(f'*{RESULTS_SUFFIX}')
+                     if f.name[:-len(RESULTS_SUFFIX)] not in queued and AnankiResults(f).complete)
+    return deduped, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='In-process dedupe -> Ananki -> inject pipeline')
+    parser.add_argument('files', nargs='*', help='raw scrape files (default: every 1_raw_scrapes/*.json)')
+    parser.add_argument('--ananki-workers', type=int, default=1)
+    parser.add_argument('--inject-workers', type=int, default=1)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--bulk', action='store_true', help='analyze each file as a Message Batch')
+    parser.add_argument('--no-pending', action='store_true',
+                        help="don't pick up deduped / analyzed files left over from earlier runs")
+    args = parser.parse_args()
+
+    raw_files = args.files or sorted(str(f) for f in (PROJECT_ROOT / '1_raw_scrapes').glob('*.json'))
+    deduped, results = ([], []) if args.no_pending else pending_files(raw_files)
+
+    runner = TapestryPipeline(args.ananki_workers, args.inject_workers, args.queue_size, INJECTED_DIR, args.bulk)
+    runner.run(raw_files, deduped, results)
+    if runner.failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
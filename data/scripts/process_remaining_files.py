@@ -8,7 +8,7 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DEDUPED_DIR = PROJECT_ROOT / '2_deduped'
-MAPPED_DIR = PROJECT_ROOT / '3_analyzed' / 'mapped'
+ANALYZED_DIR = PROJECT_ROOT / '3_analyzed'
 SCRIPTS_DIR = Path(__file__).parent
 
 # Files to process (excluding dark_smart which is done)
@@ -60,16 +60,16 @@ for i, filename in enumerate(files_to_process, 1):
         continue
 
     # Inject to tapestry
-    mapped_file = MAPPED_DIR / f"{deduped_file.stem}_CLAUDE_MAPPED.json"
+    mapped_file = ANALYZED_DIR / f"{deduped_file.stem}_CLAUDE_RESULTS.jsonl"
 
     if not mapped_file.exists():
-        print(f"  [SKIP] No mapped file created: {mapped_file.name}")
+        print(f"  [SKIP] No results file created: {mapped_file.name}")
         continue
 
     print(f"\nInjecting {mapped_file.name}...")
     try:
         result = subprocess.run(
-            [sys.executable, 'inject_to_tapestry.py', str(mapped_file)],
+            [sys.executable, 'inject_to_tapestry.py', str(mapped_file), '--no-export'],
             cwd=SCRIPTS_DIR,
             capture_output=True,
             text=True
@@ -98,11 +98,9 @@ print(" COMPLETE!")
 print("="*70)
 print(f"Total songs injected: {total_injected}")
 
-# Show final tapestry count
-import json
-tapestry_file = PROJECT_ROOT.parent / 'core' / 'tapestry.json'
-if tapestry_file.exists():
-    with open(tapestry_file, 'r', encoding='utf-8') as f:
-        t = json.load(f)
-    total = sum(len(v['songs']) for v in t['vibes'].values())
-    print(f"Tapestry now has: {total:,} songs!")
+# Refresh core/tapestry.json once and show final tapestry count
+sys.path.insert(0, str(SCRIPTS_DIR))
+from tapestry_store import TapestryStore
+store = TapestryStore()
+store.export()
+print(f"Tapestry now has: {store.total_songs():,} songs!")
@@ -1,91 +1,51 @@
 """
 AUTOMATED REDDIT SCRAPER RUNNER
-Runs Reddit smart scrapers and moves results to 1_raw_scrapes/
+Runs Reddit smart scrapers (all in this process) and writes results to 1_raw_scrapes/
 Then automatically runs the pipeline to process them!
 
+Usage: python run_reddit_scrapers.py [vibe1,vibe2,...] [--parallel N]
+
 SAFE TO RUN - Only scrapes data, doesn't spend Ananki credits until pipeline runs
 """
 
-import subprocess
 import sys
-from pathlib import Path
 import time
 from datetime import datetime
 
-# Project paths
-PROJECT_ROOT = Path(__file__).parent.parent
-REDDIT_SCRAPERS = PROJECT_ROOT / 'reddit' / 'smart_scrapers'
-REDDIT_RESULTS = PROJECT_ROOT / 'reddit' / 'test_results'
-RAW_SCRAPES_DIR = PROJECT_ROOT / '1_raw_scrapes'
-
-# Ensure output directory exists
-RAW_SCRAPES_DIR.mkdir(parents=True, exist_ok=True)
-
-# Define which Reddit scrapers to run and target counts
-SCRAPER_CONFIG = {
-    'angry': 500,
-    'chill': 500,
-    'dark': 500,
-    'drive': 500,
-    'happy': 500,
-    'night': 500,
-    'party': 500,
-    'romantic': 500,
-    'sad': 500,
-    # Add more as needed
-}
-
-def run_scraper(vibe, target):
-    """Run a single Reddit scraper"""
-    print(f"\n{'='*70}")
-    print(f"SCRAPING REDDIT: {vibe.upper()} ({target} songs)")
-    print(f"{'='*70}")
-
-    scraper_file = REDDIT_SCRAPERS / f'scrape_{vibe}.py'
-    if not scraper_file.exists():
-        print(f"  ERROR: Scraper not found: {scraper_file}")
-        return False
-
-    # Run scraper with target
-    cmd = [sys.executable, str(scraper_file), str(target)]
-    start_time = time.time()
+# Shared runner helpers (also puts scrapers/shared on sys.path)
+from run_scrapers import RAW_SCRAPES_DIR, SCRAPER_CONFIG, parse_parallel, run_pipeline, print_summary
 
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=str(REDDIT_SCRAPERS),
-            capture_output=False,  # Show output in real-time
-            text=True,
-            timeout=600  # 10 minute timeout per scraper
-        )
-
-        elapsed = time.time() - start_time
-
-        if result.returncode == 0:
-            print(f"\n  SUCCESS! Completed in {elapsed/60:.1f} minutes")
-
-            # Move result file to 1_raw_scrapes
-            result_file = REDDIT_RESULTS / f'{vibe}_smart_extraction.json'
-            if result_file.exists():
-                dest_file = RAW_SCRAPES_DIR / result_file.name
-                # Copy instead of move to preserve original
-                import shutil
-                shutil.copy2(result_file, dest_file)
-                print(f"  Moved to: {dest_file}")
-                return True
-            else:
-                print(f"  WARNING: Result file not found: {result_file}")
-                return False
+
+def scrape(vibes_to_run, parallel=1, clients=None):
+    """
+    Scrape Reddit vibes in-process, results written straight to 1_raw_scrapes/
+    Returns {'success': [...], 'failed': [...], 'skipped': [...]}
+    """
+    from vibe_scrapers import run_vibes
+
+    results = {
+        'success': [],
+        'failed': [],
+        'skipped': []
+    }
+
+    vibes = []
+    for vibe in vibes_to_run:
+        if vibe not in SCRAPER_CONFIG['reddit']:
+            print(f"\nSkipping unknown vibe: {vibe}")
+            results['skipped'].append(vibe)
         else:
-            print(f"  FAILED with return code {result.returncode}")
-            return False
+            vibes.append(vibe)
+
+    # Reddit requests from every vibe share one rate limiter, so running
+    # vibes in parallel never exceeds the API quota
+    counts = run_vibes(['reddit'], vibes, SCRAPER_CONFIG, parallel=parallel,
+                       output_dir=RAW_SCRAPES_DIR, clients=clients, skip_known=True)
+
+    for (_, vibe), count in counts.items():
+        results['success' if count is not None else 'failed'].append(vibe)
+    return results
 
-    except subprocess.TimeoutExpired:
-        print(f"  TIMEOUT after 10 minutes")
-        return False
-    except Exception as e:
-        print(f"  ERROR: {e}")
-        return False
 
 def main():
     print("\n" + "="*70)
@@ -96,101 +56,25 @@ def main():
     print("Results will be saved to 1_raw_scrapes/ for pipeline processing.")
     print("\nNOTE: This only scrapes data - no API credits spent until Ananki runs!")
 
+    parallel = parse_parallel(sys.argv)
+
     # Allow running specific vibes
     if len(sys.argv) > 1:
         vibes_to_run = sys.argv[1].split(',')
         print(f"\nRunning specific vibes: {', '.join(vibes_to_run)}")
     else:
-        vibes_to_run = list(SCRAPER_CONFIG.keys())
+        vibes_to_run = list(SCRAPER_CONFIG['reddit'].keys())
         print(f"\nRunning all {len(vibes_to_run)} Reddit scrapers")
 
     print("\n" + "="*70)
-    print("Starting scrapers...")
+    print(f"Starting scrapers ({parallel} at a time, one process)...")
     print("="*70)
 
-    # Track results
-    results = {
-        'success': [],
-        'failed': [],
-        'skipped': []
-    }
-
     start_time = time.time()
+    results = scrape(vibes_to_run, parallel)
 
-    # Run Reddit scrapers
-    for vibe in vibes_to_run:
-        if vibe not in SCRAPER_CONFIG:
-            print(f"\nSkipping unknown vibe: {vibe}")
-            results['skipped'].append(vibe)
-            continue
-
-        target = SCRAPER_CONFIG[vibe]
-        success = run_scraper(vibe, target)
-
-        if success:
-            results['success'].append(vibe)
-        else:
-            results['failed'].append(vibe)
-
-        # Small delay between scrapers to be nice to Reddit API
-        if vibe != vibes_to_run[-1]:
-            print("\nWaiting 5 seconds before next scraper...")
-            time.sleep(5)
-
-    # Summary
-    total_time = time.time() - start_time
-    print("\n" + "="*70)
-    print(" SCRAPING COMPLETE!")
-    print("="*70)
-    print(f"\nTotal time: {total_time/60:.1f} minutes")
-    print(f"\nResults:")
-    print(f"  Success: {len(results['success'])}")
-    print(f"  Failed: {len(results['failed'])}")
-    print(f"  Skipped: {len(results['skipped'])}")
-
-    if results['success']:
-        print(f"\nSuccessful vibes: {', '.join(results['success'])}")
-
-    if results['failed']:
-        print(f"\nFailed vibes: {', '.join(results['failed'])}")
-
-    # Automatically run pipeline if we got successful scrapes
-    if results['success']:
-        print("\n" + "="*70)
-        print(" STARTING AUTOMATED PIPELINE")
-        print("="*70)
-        print(f"\nEstimated Ananki cost: ~${len(results['success']) * 300 * 0.003:.2f}")
-        print("\nPipeline will: dedupe → Ananki ($) → inject to tapestry")
-        print("="*70)
-
-        # Run the automated pipeline
-        pipeline_script = Path(__file__).parent / 'automated_pipeline.py'
-
-        try:
-            print("\nStarting pipeline...\n")
-            result = subprocess.run(
-                [sys.executable, str(pipeline_script)],
-                cwd=str(Path(__file__).parent),
-                capture_output=False,  # Show output in real-time
-                text=True
-            )
-
-            if result.returncode == 0:
-                print("\n" + "="*70)
-                print(" COMPLETE! Songs added to tapestry!")
-                print("="*70)
-            else:
-                print("\n" + "="*70)
-                print(" Pipeline had errors - check output above")
-                print("="*70)
-
-        except Exception as e:
-            print(f"\nERROR running pipeline: {e}")
-            print(f"\nYou can run manually: python {pipeline_script}")
-    else:
-        print("\n" + "="*70)
-        print(" No successful scrapes - skipping pipeline")
-        print("="*70)
+    print_summary(results, time.time() - start_time)
+    run_pipeline(results, 300)
 
 if __name__ == '__main__':
     try:
@@ -3,13 +3,20 @@ MASTER SCRAPER - Run YouTube AND Reddit scrapers together!
 Then automatically process everything through the pipeline.
 
 ONE COMMAND TO RULE THEM ALL!
+
+Both sources run in THIS process on one scraper engine, sharing the
+Spotify client/cache and rate limiters; the pipeline runs once at the end.
+
+Usage: python scrape_all.py [--youtube v1,v2] [--reddit v1,v2] [--parallel N]
 """
 
-import subprocess
 import sys
-from pathlib import Path
+import time
 from datetime import datetime
 
+import run_scrapers
+import run_reddit_scrapers
+
 def main():
     print("\n" + "="*70)
     print(" MASTER SCRAPER - YOUTUBE + REDDIT")
@@ -23,67 +30,53 @@ def main():
     print("  5. Inject to tapestry")
     print("\n" + "="*70)
 
+    parallel = run_scrapers.parse_parallel(sys.argv)
+
     # Get vibe arguments if provided
-    youtube_vibes = None
-    reddit_vibes = None
+    youtube_vibes = list(run_scrapers.SCRAPER_CONFIG['youtube'])
+    reddit_vibes = list(run_scrapers.SCRAPER_CONFIG['reddit'])
 
     if len(sys.argv) > 1:
         if '--youtube' in sys.argv:
             idx = sys.argv.index('--youtube')
             if idx + 1 < len(sys.argv):
-                youtube_vibes = sys.argv[idx + 1]
+                youtube_vibes = sys.argv[idx + 1].split(',')
         if '--reddit' in sys.argv:
             idx = sys.argv.index('--reddit')
             if idx + 1 < len(sys.argv):
-                reddit_vibes = sys.argv[idx + 1]
+                reddit_vibes = sys.argv[idx + 1].split(',')
 
-    scripts_dir = Path(__file__).parent
+    from vibe_scrapers import ScraperClients
+    clients = ScraperClients()  # one set of clients/caches for both sources
+    start_time = time.time()
 
-    # Run YouTube scrapers
-    print("\n" + "="*70)
-    print(" STEP 1: YOUTUBE SCRAPING")
-    print("="*70)
+    try:
+        # Run YouTube scrapers
+        print("\n" + "="*70)
+        print(" STEP 1: YOUTUBE SCRAPING")
+        print("="*70)
+        print(f"\nRunning YouTube for: {', '.join(youtube_vibes)}")
 
-    youtube_cmd = [sys.executable, str(scripts_dir / 'run_scrapers.py')]
-    if youtube_vibes:
-        youtube_cmd.append(youtube_vibes)
-        print(f"\nRunning YouTube for: {youtube_vibes}")
-    else:
-        print("\nRunning ALL YouTube scrapers")
+        youtube_results = run_scrapers.scrape(youtube_vibes, parallel, clients)
+        run_scrapers.print_summary(youtube_results, time.time() - start_time)
 
-    try:
-        youtube_result = subprocess.run(
-            youtube_cmd,
-            cwd=str(scripts_dir),
-            capture_output=False,
-            text=True
-        )
-        print(f"\nYouTube scraping completed with code: {youtube_result.returncode}")
-    except Exception as e:
-        print(f"\nERROR in YouTube scraping: {e}")
-
-    # Run Reddit scrapers
-    print("\n" + "="*70)
-    print(" STEP 2: REDDIT SCRAPING")
-    print("="*70)
+        # Run Reddit scrapers
+        print("\n" + "="*70)
+        print(" STEP 2: REDDIT SCRAPING")
+        print("="*70)
+        print(f"\nRunning Reddit for: {', '.join(reddit_vibes)}")
 
-    reddit_cmd = [sys.executable, str(scripts_dir / 'run_reddit_scrapers.py')]
-    if reddit_vibes:
-        reddit_cmd.append(reddit_vibes)
-        print(f"\nRunning Reddit for: {reddit_vibes}")
-    else:
-        print("\nRunning ALL Reddit scrapers")
+        reddit_results = run_reddit_scrapers.scrape(reddit_vibes, parallel, clients)
+        run_scrapers.print_summary(reddit_results, time.time() - start_time)
+    finally:
+        clients.close()  # registry / learned tracks are persisted once, for both sources
 
-    try:
-        reddit_result = subprocess.run(
-            reddit_cmd,
-            cwd=str(scripts_dir),
-            capture_output=False,
-            text=True
-        )
-        print(f"\nReddit scraping completed with code: {reddit_result.returncode}")
-    except Exception as e:
-        print(f"\nERROR in Reddit scraping: {e}")
+    # One pipeline run for everything scraped
+    combined = {
+        key: youtube_results[key] + reddit_results[key]
+        for key in ('success', 'failed', 'skipped')
+    }
+    run_scrapers.run_pipeline(combined, 300)
 
     # Final summary
     print("\n" + "="*70)
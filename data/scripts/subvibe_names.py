@@ -0,0 +1,61 @@
+"""
+Sub-vibe name matching
+Claude answers (and older mapping files) sometimes carry a near-miss
+sub-vibe name - different case, an en dash instead of " - ", a missing
+meta prefix, a typo. SubVibeMatcher maps those back to the exact tapestry
+name instead of dropping the song as "not in tapestry".
+
+    matcher = SubVibeMatcher(store.subvibes())
+    matcher.match("sad – heartbreak")   # ('Sad - Heartbreak', 'normalised')
+    matcher.match("Heartbreak")         # ('Sad - Heartbreak', 'suffix')
+    matcher.match("Sad - Heartbrake")   # ('Sad - Heartbreak', 'fuzzy')
+    matcher.match("Made Up")            # (None, None)
+"""
+
+import difflib
+import re
+from collections import defaultdict
+
+# difflib similarity a near-miss needs (after normalising) to be accepted
+FUZZY_CUTOFF = 0.88
+
+
+def normalise(name):
+    """Case, dash style, quotes and spacing don't matter"""
+    name = str(name).casefold().strip()
+    name = re.sub(r"[\"'`*]", "", name)
+    name = re.sub(r"\s*[-–—:]+\s*", " - ", name)
+    return re.sub(r"\s+", " ", name).strip(" -")
+
+
+class SubVibeMatcher:
+    """Exact tapestry name for a (possibly slightly wrong) sub-vibe name"""
+
+    def __init__(self, subvibes):
+        self.exact = set(subvibes)
+        self.normalised = {normalise(name): name for name in subvibes}
+
+        # 'heartbreak' -> 'Sad - Heartbreak' (only where the part after the meta is unique)
+        tails = defaultdict(list)
+        for name in subvibes:
+            tails[normalise(name.split(' - ', 1)[-1])].append(name)
+        self.tails = {tail: names[0] for tail, names in tails.items() if len(names) == 1}
+
+    def match(self, name):
+        """(tapestry name, how) with how in exact / normalised / suffix / fuzzy, or (None, None)"""
+        if name in self.exact:
+            return name, 'exact'
+        if not name or not isinstance(name, str):
+            return None, None
+
+        key = normalise(name)
+        if key in self.normalised:
+            return self.normalised[key], 'normalised'
+        if key in self.tails:
+            return self.tails[key], 'suffix'
+
+        close = difflib.get_close_matches(key, list(self.normalised), n=1, cutoff=FUZZY_CUTOFF)
+        # Never turn 'Nostalgic 70s' into 'Nostalgic 90s'
+        if close and re.findall(r"\d+", key) == re.findall(r"\d+", close[0]):
+            return self.normalised[close[0]], 'fuzzy'
+        return None, None
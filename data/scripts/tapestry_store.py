@@ -0,0 +1,374 @@
+"""
+Indexed tapestry store
+SQLite replacement for loading/rewriting the whole core/tapestry.json on
+every injection or dedupe. Songs live in one table indexed by spotify_id,
+normalized (artist, song) and sub-vibe, so dedupe/inject cost is per batch,
+not per tapestry, and several processes can inject at once (WAL + one
+IMMEDIATE transaction per add_songs call).
+
+core/tapestry.json stays the compatibility format (web server, old scripts):
+  - first open imports it automatically
+  - export() writes it back in the same shape (atomic replace)
+  - if the JSON was edited elsewhere (e.g. the web server boosting a song)
+    and the store has nothing un-exported, it is re-imported on open
+
+Usage:
+    from tapestry_store import TapestryStore
+    store = TapestryStore()
+    store.contains(spotify_id='6PNvv1dmDbOWrAYwEcuKBX')
+    index = store.index(songs)      # in-memory duplicate index for a batch
+    added, duplicates = store.add_songs('Sad - Heartbreak', songs)
+    store.export()
+
+CLI:
+    python tapestry_store.py stats
+    python tapestry_store.py import [tapestry.json]
+    python tapestry_store.py export [tapestry.json]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+TAPESTRY_JSON = PROJECT_ROOT / 'core' / 'tapestry.json'
+DEFAULT_DB_PATH = PROJECT_ROOT / 'core' / 'tapestry.sqlite'
+
+# SQLite's default limit on host parameters is 999
+LOOKUP_CHUNK = 500
+
+
+def normalize(text):
+    return (text or '').lower().strip()
+
+
+def song_key(song):
+    return (normalize(song.get('artist')), normalize(song.get('song')))
+
+
+class TapestryIndex:
+    """
+    In-memory duplicate index: Spotify IDs + normalized (artist, song) -> sub-vibes.
+    Built once (whole tapestry, or just the keys a batch can hit) and updated
+    in place as songs are added, so every check is a set lookup.
+    """
+
+    def __init__(self, rows=()):
+        self.spotify_ids = set()
+        self.names = {}
+        for subvibe, spotify_id, artist_key, song_key_ in rows:
+            self._add(subvibe, spotify_id, (artist_key, song_key_))
+
+    def _add(self, subvibe, spotify_id, key):
+        if spotify_id:
+            self.spotify_ids.add(spotify_id)
+        self.names.setdefault(key, set()).add(subvibe)
+
+    def add(self, subvibe, song):
+        self._add(subvibe, song.get('spotify_id'), song_key(song))
+
+    def contains(self, spotify_id=None, artist=None, song=None, subvibe=None):
+        """Same rules as TapestryStore.contains"""
+        if spotify_id and spotify_id in self.spotify_ids:
+            return True
+        if artist is None or song is None:
+            return False
+        subvibes = self.names.get((normalize(artist), normalize(song)))
+        return bool(subvibes) and (subvibe is None or subvibe in subvibes)
+
+    def __len__(self):
+        return sum(len(subvibes) for subvibes in self.names.values())
+
+
+class TapestryStore:
+    """SQLite-backed tapestry: sub-vibes, their metadata and their songs"""
+
+    def __init__(self, path=None, json_path=None, sync=True):
+        self.path = Path(path or os.getenv('TAPESTRY_DB_PATH') or DEFAULT_DB_PATH)
+        self.json_path = Path(json_path or TAPESTRY_JSON)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=60, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS subvibes (
+                name TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                meta TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS songs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subvibe TEXT NOT NULL,
+                spotify_id TEXT,
+                artist_key TEXT NOT NULL,
+                song_key TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_songs_spotify_id ON songs(spotify_id);
+            CREATE INDEX IF NOT EXISTS idx_songs_name ON songs(artist_key, song_key);
+            CREATE INDEX IF NOT EXISTS idx_songs_subvibe ON songs(subvibe);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+        if sync:
+            self._sync_from_json()
+
+    # ---- meta ----
+
+    def _get_meta(self, key, default=None):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key, value):
+        self._db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    def _json_mtime(self):
+        return self.json_path.stat().st_mtime if self.json_path.exists() else None
+
+    def _sync_from_json(self):
+        """Import core/tapestry.json if it is new or was changed outside the store"""
+        mtime = self._json_mtime()
+        if mtime is None or mtime == self._get_meta('json_mtime'):
+            return
+        if self._get_meta('dirty', False):
+            print(f"WARNING: {self.json_path.name} changed outside the store, but the store has "
+                  f"un-exported songs. Run 'python tapestry_store.py export' (keep the store) "
+                  f"or 'python tapestry_store.py import' (keep the JSON).")
+            return
+        print(f"[TAPESTRY] Importing {self.json_path}...")
+        self.import_json()
+
+    # ---- import / export ----
+
+    def import_json(self, json_path=None):
+        """Replace the store's contents with a tapestry.json file"""
+        json_path = Path(json_path or self.json_path)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            tapestry = json.load(f)
+
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.execute('DELETE FROM songs')
+                self._db.execute('DELETE FROM subvibes')
+                for position, (name, data) in enumerate(tapestry.get('vibes', {}).items()):
+                    # Keep the key order of the original entry; songs are stored separately
+                    meta = {k: (None if k == 'songs' else v) for k, v in data.items()}
+                    meta.setdefault('songs', None)
+                    self._db.execute('INSERT INTO subvibes (name, position, meta) VALUES (?, ?, ?)',
+                                     (name, position, json.dumps(meta, ensure_ascii=False)))
+                    self._db.executemany(
+                        'INSERT INTO songs (subvibe, spotify_id, artist_key, song_key, data) VALUES (?, ?, ?, ?, ?)',
+                        [self._row(name, song) for song in data.get('songs', [])]
+                    )
+                self._set_meta('stats', tapestry.get('stats', {}))
+                self._set_meta('dirty', False)
+                if json_path == self.json_path:
+                    self._set_meta('json_mtime', self._json_mtime())
+                else:
+                    self._set_meta('dirty', True)
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+        print(f"[TAPESTRY] Imported {self.total_songs():,} songs in {len(self.subvibes())} sub-vibes")
+
+    def to_dict(self):
+        """The whole tapestry in the tapestry.json shape"""
+        vibes = {}
+        for name, meta in self._db.execute('SELECT name, meta FROM subvibes ORDER BY position'):
+            vibes[name] = json.loads(meta)
+            vibes[name]['songs'] = []
+        for subvibe, data in self._db.execute('SELECT subvibe, data FROM songs ORDER BY id'):
+            vibes[subvibe]['songs'].append(json.loads(data))
+
+        return {'vibes': vibes, 'stats': self._get_meta('stats', {})}
+
+    def export(self, json_path=None):
+        """Write the store back to tapestry.json (atomic replace)"""
+        json_path = Path(json_path or self.json_path)
+        tmp = json_path.with_name(json_path.name + '.tmp')
+        with self._lock:
+            tapestry = self.to_dict()
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(tapestry, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, json_path)
+            if json_path == self.json_path:
+                self._set_meta('json_mtime', self._json_mtime())
+                self._set_meta('dirty', False)
+
+        print(f"[TAPESTRY] Exported {sum(len(v['songs']) for v in tapestry['vibes'].values()):,} songs to {json_path}")
+        return json_path
+
+    # ---- queries ----
+
+    @staticmethod
+    def _row(subvibe, song):
+        return (subvibe, song.get('spotify_id') or None, normalize(song.get('artist')),
+                normalize(song.get('song')), json.dumps(song, ensure_ascii=False))
+
+    def subvibes(self):
+        return [name for (name,) in self._db.execute('SELECT name FROM subvibes ORDER BY position')]
+
+    def has_subvibe(self, subvibe):
+        return self._db.execute('SELECT 1 FROM subvibes WHERE name = ?', (subvibe,)).fetchone() is not None
+
+    def contains(self, spotify_id=None, artist=None, song=None, subvibe=None):
+        """
+        Is this song already in the tapestry?
+        By spotify_id (anywhere), else by normalized artist + song (optionally within one sub-vibe)
+        """
+        if spotify_id:
+            if self._db.execute('SELECT 1 FROM songs WHERE spotify_id = ? LIMIT 1', (spotify_id,)).fetchone():
+                return True
+        if artist is None or song is None:
+            return False
+
+        sql = 'SELECT 1 FROM songs WHERE artist_key = ? AND song_key = ?'
+        params = [normalize(artist), normalize(song)]
+        if subvibe:
+            sql += ' AND subvibe = ?'
+            params.append(subvibe)
+        return self._db.execute(sql + ' LIMIT 1', params).fetchone() is not None
+
+    def known_ids(self, spotify_ids):
+        """The subset of spotify_ids already in the tapestry (one indexed query per chunk)"""
+        spotify_ids = list({i for i in spotify_ids if i})
+        known = set()
+        for start in range(0, len(spotify_ids), LOOKUP_CHUNK):
+            chunk = spotify_ids[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            known.update(row[0] for row in self._db.execute(
+                f'SELECT DISTINCT spotify_id FROM songs WHERE spotify_id IN ({placeholders})', chunk))
+        return known
+
+    def all_spotify_ids(self):
+        return {row[0] for row in self._db.execute('SELECT DISTINCT spotify_id FROM songs WHERE spotify_id IS NOT NULL')}
+
+    def index(self, songs=None):
+        """
+        TapestryIndex of the whole tapestry, or - given a batch of songs - of just
+        the entries sharing their Spotify IDs or artists (a few indexed queries)
+        """
+        columns = 'SELECT subvibe, spotify_id, artist_key, song_key FROM songs'
+        if songs is None:
+            return TapestryIndex(self._db.execute(columns))
+
+        songs = list(songs)
+        wanted_names = {song_key(song) for song in songs}
+        rows = []
+        for column, values in (('spotify_id', {song.get('spotify_id') for song in songs if song.get('spotify_id')}),
+                               ('artist_key', {artist for artist, _ in wanted_names})):
+            values = list(values)
+            for start in range(0, len(values), LOOKUP_CHUNK):
+                chunk = values[start:start + LOOKUP_CHUNK]
+                rows.extend(self._db.execute(f"{columns} WHERE {column} IN ({','.join('?' * len(chunk))})", chunk))
+
+        index = TapestryIndex()
+        for subvibe, spotify_id, artist_key, song_key_ in rows:
+            if spotify_id:
+                index.spotify_ids.add(spotify_id)
+            if (artist_key, song_key_) in wanted_names:
+                index.names.setdefault((artist_key, song_key_), set()).add(subvibe)
+        return index
+
+    def songs_for(self, subvibe):
+        return [json.loads(data) for (data,) in
+                self._db.execute('SELECT data FROM songs WHERE subvibe = ? ORDER BY id', (subvibe,))]
+
+    def total_songs(self):
+        return self._db.execute('SELECT COUNT(*) FROM songs').fetchone()[0]
+
+    def stats(self):
+        by_subvibe = {name: 0 for name in self.subvibes()}
+        by_subvibe.update(self._db.execute('SELECT subvibe, COUNT(*) FROM songs GROUP BY subvibe').fetchall())
+        return {
+            'total_subvibes': len(by_subvibe),
+            'populated_subvibes': sum(1 for count in by_subvibe.values() if count),
+            'total_songs': sum(by_subvibe.values()),
+            'total_artists': self._db.execute('SELECT COUNT(DISTINCT artist_key) FROM songs').fetchone()[0],
+            'by_subvibe': by_subvibe,
+        }
+
+    # ---- writes ----
+
+    def add_songs(self, subvibe, songs):
+        """
+        Add songs to a sub-vibe, skipping any already in the tapestry
+        (same spotify_id anywhere, or same artist + song in this sub-vibe).
+        Returns (added_songs, duplicate_count).
+        """
+        songs = list(songs)
+        added = []
+        duplicates = 0
+        with self._lock:
+            # IMMEDIATE: the duplicate check and the insert see the same snapshot,
+            # even with another process injecting at the same time
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                if self._db.execute('SELECT 1 FROM subvibes WHERE name = ?', (subvibe,)).fetchone() is None:
+                    raise KeyError(f"Sub-vibe '{subvibe}' not in tapestry")
+
+                # Index only what this batch can collide with, then check in memory
+                index = self.index(songs)
+                for song in songs:
+                    if index.contains(song.get('spotify_id'), song.get('artist'), song.get('song'), subvibe):
+                        duplicates += 1
+                        continue
+                    index.add(subvibe, song)
+                    added.append(song)
+
+                self._db.executemany(
+                    'INSERT INTO songs (subvibe, spotify_id, artist_key, song_key, data) VALUES (?, ?, ?, ?, ?)',
+                    [self._row(subvibe, song) for song in added]
+                )
+
+                if added:
+                    self._set_meta('dirty', True)
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return added, duplicates
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('stats', 'import', 'export'):
+        print(__doc__)
+        return
+
+    command = args[0]
+    store = TapestryStore(sync=(command == 'stats'))
+    if command == 'import':
+        store.import_json(args[1] if len(args) > 1 else None)
+    elif command == 'export':
+        store.export(args[1] if len(args) > 1 else None)
+    else:
+        stats = store.stats()
+        print(f"Sub-vibes: {stats['total_subvibes']} ({stats['populated_subvibes']} populated)")
+        print(f"Songs: {stats['total_songs']:,} | Artists: {stats['total_artists']:,}")
+        print("\nTop sub-vibes:")
+        for subvibe, count in sorted(stats['by_subvibe'].items(), key=lambda x: x[1], reverse=True)[:15]:
+            print(f"  {count:6}  {subvibe}")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark: duplicate detection during injection at 10k / 100k songs
+
+Duplicate checks for one mapped batch against a synthetic tapestry:
+  legacy  - old inject_to_tapestry loop: rebuild the sub-vibe's (artist, song)
+            set for EVERY incoming song
+  per-row - one SQL lookup per song against the store
+  index   - one TapestryIndex for the batch (what add_songs uses), set lookups
+plus the end-to-end inject: legacy load + check + rewrite of tapestry.json
+vs TapestryStore.add_songs (check + insert + commit).
+
+Usage: python benchmark_tapestry_index.py [--sizes 10000,100000] [--batch 500]
+Nothing touches core/ - everything runs in a temp directory.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from tapestry_store import TapestryStore
+
+SUBVIBES = [f"Vibe {i // 12} - Sub {i % 12}" for i in range(114)]
+
+
+def make_song(n):
+    return {
+        'artist': f"Artist {n % 40000}",
+        'song': f"Song {n}",
+        'spotify_id': f"sp{n:012d}",
+        'spotify_uri': f"spotify:track:sp{n:012d}",
+        'comment_score': n % 50,
+        'source_url': f"https://reddit.com/r/music/comments/{n}",
+        'data_source': 'reddit_smart_v2',
+        'extraction_confidence': 1.0,
+        'mapping_confidence': 0.8,
+    }
+
+
+def make_tapestry(size):
+    vibes = {name: {'parent_vibe': name.split(' - ')[0], 'node_type': 'sub_vibe', 'songs': []} for name in SUBVIBES}
+    for n in range(size):
+        vibes[SUBVIBES[n % len(SUBVIBES)]]['songs'].append(make_song(n))
+    return {'vibes': vibes, 'stats': {'total_songs': size}}
+
+
+def make_batch(size, batch_size):
+    """Half new songs, a quarter ID duplicates, a quarter name duplicates"""
+    rng = random.Random(size)
+    batch = []
+    for i in range(batch_size):
+        kind = i % 4
+        if kind in (0, 1):
+            song = make_song(size + i)
+        elif kind == 2:
+            song = make_song(rng.randrange(size))
+        else:
+            song = dict(make_song(rng.randrange(size)), spotify_id=f"new{i}")
+        batch.append((SUBVIBES[int(song['song'].split()[1]) % len(SUBVIBES)], song))
+    return batch
+
+
+def legacy_check(tapestry, batch):
+    """The pre-store algorithm (O(songs in sub-vibe) per incoming song)"""
+    global_spotify_ids = set()
+    for subvibe_data in tapestry['vibes'].values():
+        for song in subvibe_data.get('songs', []):
+            if 'spotify_id' in song:
+                global_spotify_ids.add(song['spotify_id'])
+
+    injected = 0
+    for subvibe, song in batch:
+        if song['spotify_id'] in global_spotify_ids:
+            continue
+        existing_songs = tapestry['vibes'][subvibe]['songs']
+        key = (song['artist'].lower(), song['song'].lower())
+        existing_keys = {(s.get('artist', '').lower(), s.get('song', '').lower()) for s in existing_songs}
+        if key in existing_keys:
+            continue
+        existing_songs.append(song)
+        global_spotify_ids.add(song['spotify_id'])
+        injected += 1
+    return injected
+
+
+def legacy_inject(tapestry_file, batch):
+    with open(tapestry_file, 'r', encoding='utf-8') as f:
+        tapestry = json.load(f)
+    injected = legacy_check(tapestry, batch)
+    with open(tapestry_file, 'w', encoding='utf-8') as f:
+        json.dump(tapestry, f, indent=2, ensure_ascii=False)
+    return injected
+
+
+def per_row_check(store, batch):
+    """Store lookups without the batch index (one query per song)"""
+    return sum(1 for subvibe, song in batch
+               if not store.contains(song['spotify_id'], song['artist'], song['song'], subvibe))
+
+
+def index_check(store, batch):
+    index = store.index(song for _, song in batch)
+    new = 0
+    for subvibe, song in batch:
+        if not index.contains(song['spotify_id'], song['artist'], song['song'], subvibe):
+            index.add(subvibe, song)
+            new += 1
+    return new
+
+
+def indexed_inject(store, batch):
+    by_subvibe = {}
+    for subvibe, song in batch:
+        by_subvibe.setdefault(subvibe, []).append(song)
+    return sum(len(store.add_songs(subvibe, songs)[0]) for subvibe, songs in by_subvibe.items())
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(size, batch_size):
+    batch = make_batch(size, batch_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        tapestry_file = Path(tmp) / 'tapestry.json'
+        with open(tapestry_file, 'w', encoding='utf-8') as f:
+            json.dump(make_tapestry(size), f, indent=2)
+
+        store, import_time = timed(TapestryStore, Path(tmp) / 'tapestry.sqlite', tapestry_file)
+        _, full_index_time = timed(store.index)
+
+        legacy_count, legacy_time = timed(legacy_check, make_tapestry(size), batch)
+        per_row_count, per_row_time = timed(per_row_check, store, batch)
+        index_count, index_time = timed(index_check, store, batch)
+
+        _, legacy_inject_time = timed(legacy_inject, tapestry_file, batch)
+        inserted, inject_time = timed(indexed_inject, store, batch)
+        store.close()
+
+    assert legacy_count == per_row_count == index_count == inserted, \
+        (legacy_count, per_row_count, index_count, inserted)
+
+    print(f"\n{size:,} songs, batch of {batch_size} ({inserted} new)")
+    print("  duplicate check")
+    print(f"    legacy per-song set rebuild: {legacy_time * 1000:9.1f} ms")
+    print(f"    store per-row lookups:       {per_row_time * 1000:9.1f} ms")
+    print(f"    batch TapestryIndex:         {index_time * 1000:9.1f} ms  "
+          f"({legacy_time / index_time:.0f}x faster than legacy)")
+    print("  end-to-end inject")
+    print(f"    legacy JSON load/rewrite:    {legacy_inject_time * 1000:9.1f} ms")
+    print(f"    TapestryStore.add_songs:     {inject_time * 1000:9.1f} ms")
+    print(f"  one-off: import {import_time:.2f}s | full in-memory index {full_index_time * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tapestry duplicate detection')
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    print("TAPESTRY DUPLICATE-DETECTION BENCHMARK")
+    print("=" * 70)
+    for size in (int(s) for s in args.sizes.split(',')):
+        run(size, args.batch)
+
+
+if __name__ == '__main__':
+    main()
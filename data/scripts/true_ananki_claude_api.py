@@ -2,296 +2,1195 @@
 TRUE ANANKI - Claude API Analysis
 Uses actual Claude reasoning to map songs to sub-vibes
 NO KEYWORD MATCHING - Real human-level understanding
+
+Batched mode (default): many songs per request (JSON array answer) and
+several requests in flight, under a tokens-per-minute budget.
+    python true_ananki_claude_api.py <songs_file.json> [--batch-size 20] [--concurrency 4] [--tpm 80000]
+Songs that share a comment are always sent together, so the comment's context
+is paid for once: a request holds --batch-size songs, or up to
+MAX_SONGS_PER_CONTEXT (25) when a single comment has more songs than that.
+--batch-size 1 therefore still groups each comment's songs; only comments with
+one song get one request each.
+
+The static instructions + sub-vibe list are a cached system prefix
+(cache_control: ephemeral), so each request only pays full price for its songs.
+
+Answers come back as a forced tool call whose schema restricts sub_vibe to
+the tapestry names (--no-tools: JSON in free text, parsed leniently). Near-miss
+names are corrected locally (subvibe_names.py) instead of being dropped.
+
+Songs the local pre-classifier (ananki_preclassifier.py) is confident about
+are labelled without a Claude call.
+
+A local context-quality gate (ananki_context_gate.py) sends records whose
+context has nothing to go on (bare lists, links, no mood words) to the fast
+model only (--gate-fast-below, default 0.2), or with --gate-ambiguous-below X
+straight to the ambiguous bin; --no-gate turns it off.
+
+--cascade asks a fast model first and escalates only AMBIGUOUS or
+low-confidence answers (--escalate-below, default 0.8) to the strong model;
+per-model latency / cost / escalation stats are printed at the end.
+
+--shortlist K replaces the full sub-vibe list with K candidates per context
+(ananki_shortlist.py); "OTHER" answers are re-asked with the full list.
+
+Results are streamed to 3_analyzed/<stem>_CLAUDE_RESULTS.jsonl as requests
+complete; re-running the same file resumes from it (see ananki_results.py).
+Each run's per-model usage is appended to 3_analyzed/ananki_runs.jsonl, which
+ananki_preflight.py uses to estimate cost / wall-clock before the next run.
+
+Transient API errors (429 / 529 overloaded / 5xx / timeouts) are retried with
+jittered backoff honouring Retry-After; a run of failures opens a circuit
+breaker that pauses every worker. Songs that still fail are written to
+3_analyzed/<stem>_CLAUDE_DEADLETTER.jsonl (never labelled AMBIGUOUS) and can be
+replayed on their own:
+    python true_ananki_claude_api.py 3_analyzed/<stem>_CLAUDE_DEADLETTER.jsonl
+
+Bulk mode submits the whole file as one Message Batch (half price, async):
+    python true_ananki_claude_api.py <songs_file.json> --bulk [--poll 60]
+
+Local testing without credits: run mock_anthropic_server.py and point the
+client at it with ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock
 """
 
+import copy
 import json
 import os
+import re
+import sys
+import threading
+import time
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
+# Shared token bucket / 429 backoff (same limiter the scrapers use)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'scrapers' / 'shared'))
+from rate_limit import AdaptiveRateLimiter, TokenBucket, is_transient_error
+from ananki_cache import AnankiResultCache
+from ananki_results import (DEADLETTER_SUFFIX, AnankiResults, DeadLetters, ResultStream, deadletter_path,
+                            legacy_checkpoint_path, log_run, results_path, run_log_path)
+from ananki_preclassifier import DEFAULT_THRESHOLD as PRECLASSIFY_THRESHOLD, PreClassifier
+from ananki_context_gate import AMBIGUOUS_BELOW as GATE_AMBIGUOUS_BELOW, FAST_BELOW as GATE_FAST_BELOW, ContextGate
+from ananki_shortlist import OTHER, SubVibeShortlist
+from tapestry_store import TapestryStore
+from subvibe_names import SubVibeMatcher
+
 # Load .env from the reddit directory (where API keys are stored)
 env_path = Path(__file__).parent.parent / 'reddit' / '.env'
 load_dotenv(dotenv_path=env_path)
 
+MODEL = "claude-sonnet-4-5"  # Claude Sonnet 4.5 (latest)
+
+# Cascade mode: the fast model answers first, the strong MODEL only sees songs
+# it called AMBIGUOUS or answered below ESCALATE_BELOW confidence
+FAST_MODEL = os.getenv('ANANKI_FAST_MODEL', "claude-haiku-4-5")
+ESCALATE_BELOW = float(os.getenv('ANANKI_ESCALATE_BELOW', 0.8))
+
+# $ per million (input, output) tokens, for the per-tier cost report.
+# Cache writes bill at 1.25x input, cache reads at 0.1x, Message Batches at 0.5x
+MODEL_PRICES = {
+    "claude-sonnet-4-5": (3.00, 15.00),
+    "claude-haiku-4-5": (1.00, 5.00),
+}
+
+# Batched mode defaults (override per run with CLI flags)
+BATCH_SIZE = int(os.getenv('ANANKI_BATCH_SIZE', 20))
+CONCURRENCY = int(os.getenv('ANANKI_CONCURRENCY', 4))
+TOKENS_PER_MINUTE = int(os.getenv('ANANKI_TOKENS_PER_MINUTE', 80000))
+REQUESTS_PER_MINUTE = int(os.getenv('ANANKI_REQUESTS_PER_MINUTE', 50))
+
+# 429 / 529 / 5xx / timeouts are retried with jittered backoff (Retry-After wins);
+# this many failures in a row opens the circuit and pauses every worker
+BREAKER_AFTER = int(os.getenv('ANANKI_BREAKER_AFTER', 5))
+BREAKER_COOLDOWN = float(os.getenv('ANANKI_BREAKER_COOLDOWN', 60))
+
+# Output budget per song in a batch (short reasoning keeps this small)
+OUTPUT_TOKENS_PER_SONG = 120
+
+# Structured output: answers come back as a call to this tool, whose schema
+# holds the sub-vibe enum (part of the cached prefix, like the system block)
+TOOL_NAME = "record_classifications"
+
+# A comment listing more songs than this is split across requests
+MAX_SONGS_PER_CONTEXT = 25
+
+# Pre-classifier needs this many labelled tapestry songs before it is trusted
+MIN_PRECLASSIFIER_SONGS = 500
+
+
+def context_key(song):
+    """Songs recommended in the same post/comment share this key"""
+    return (song.get('source_url') or '', song.get('comment_text') or '', song.get('post_title') or '')
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 chars per token)"""
+    return len(text) // 4 + 1
+
+
 class TrueAnankiClaudeAPI:
-    def __init__(self):
+    def __init__(self, batch_size=BATCH_SIZE, concurrency=CONCURRENCY, tokens_per_minute=TOKENS_PER_MINUTE,
+                 use_cache=True, preclassify_threshold=PRECLASSIFY_THRESHOLD, shortlist_k=None,
+                 escalate_below=None, structured=True, gate_fast_below=GATE_FAST_BELOW,
+                 gate_ambiguous_below=GATE_AMBIGUOUS_BELOW, use_gate=True, offline=False):
+        """offline=True builds prompts / request plans only (ananki_preflight.py): no API key or client"""
         # Initialize Claude API
         api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
+        if not api_key and not offline:
             raise ValueError("ANTHROPIC_API_KEY not found in environment!")
 
-        self.client = Anthropic(api_key=api_key)
-
-        # Load tapestry to get all available sub-vibes
-        tapestry_path = Path(__file__).parent.parent.parent / 'core' / 'tapestry.json'
-        with open(tapestry_path, 'r', encoding='utf-8') as f:
-            tapestry = json.load(f)
+        # Retries are left to the shared limiter (one backoff for all workers)
+        self.client = None if offline else Anthropic(api_key=api_key, max_retries=0)
 
-        self.available_subvibes = list(tapestry['vibes'].keys())
+        # All available sub-vibes (from the indexed tapestry store - no full JSON load)
+        self.available_subvibes = TapestryStore().subvibes()
         print(f"Loaded {len(self.available_subvibes)} sub-vibes from tapestry")
 
-    def analyze_song_placement(self, song_data):
-        """
-        Use Claude to analyze WHERE this song belongs
-        Like a real human would!
-        """
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        # Requests/min + 429 backoff, and a separate tokens/min budget
+        self.limiter = AdaptiveRateLimiter('Claude', REQUESTS_PER_MINUTE / 60.0, capacity=self.concurrency,
+                                           retryable=is_transient_error, breaker_after=BREAKER_AFTER,
+                                           breaker_cooldown=BREAKER_COOLDOWN)
+        self.token_budget = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute)
+        self._usage_lock = threading.Lock()
 
-        # Build complete list of available sub-vibes
-        subvibes_formatted = "\n".join([f"  - {sv}" for sv in sorted(self.available_subvibes)])
+        # Model cascade (None = strong model only); per-model request/latency/cost stats
+        self.escalate_below = escalate_below
+        self.first_model = FAST_MODEL if escalate_below is not None else MODEL
+        if escalate_below is not None:
+            print(f"Cascade: {FAST_MODEL} first, escalating AMBIGUOUS / confidence < {escalate_below} to {MODEL}")
 
-        # Build the prompt for Claude
-        prompt = f"""You are Ananki, a human-in-the-loop AI that reads human emotional expressions about music and maps songs to specific emotional sub-vibes.
+        # Tool-use answers (schema + sub-vibe enum) instead of JSON scraped from free text;
+        # near-miss names are corrected locally either way
+        self.structured = structured
+        self.matcher = SubVibeMatcher(self.available_subvibes)
+        self.output_stats = {'responses': 0, 'tool_calls': 0, 'parse_recovered': 0,
+                             'names_corrected': 0, 'names_unknown': 0}
 
-A human on Reddit/YouTube recommended this song with the following context:
+        self._system_blocks = {}
+        self.system_tokens = estimate_tokens(self.system_blocks()[0]['text'] + json.dumps(self.tools()))
 
-POST TITLE: {song_data.get('post_title', 'N/A')}
+        # Optional per-context sub-vibe shortlist (see ananki_shortlist.py)
+        self.shortlist = SubVibeShortlist(self.available_subvibes, k=shortlist_k) if shortlist_k else None
+        self.meta_vibe = None
+        self.start_run('live')
+        self.widened = 0
+        if self.shortlist:
+            print(f"Sub-vibe shortlist: top {shortlist_k} candidates per context, '{OTHER}' widens to the full list")
 
-COMMENT TEXT: {song_data.get('comment_text', 'N/A')[:500]}
+        # Local context-quality gate: thin contexts go to the fast model only
+        # (or straight to the ambiguous bin), see ananki_context_gate.py
+        self.gate = None
+        self.thin = 0
+        if use_gate:
+            self.gate = ContextGate(self.available_subvibes, gate_fast_below, gate_ambiguous_below)
+            print(f"Context gate: score < {gate_fast_below} -> {FAST_MODEL} only"
+                  + (f", < {gate_ambiguous_below} -> ambiguous bin" if gate_ambiguous_below > 0 else ""))
 
-SONG VALIDATED BY SPOTIFY:
-- Artist: {song_data['artist']}
-- Song: {song_data['song']}
-- Spotify ID: {song_data['spotify_id']}
+        # Persistent (song, context) -> answer cache; never pay twice for the same call
+        # (accepted fast-tier answers are cached under their own model)
+        self.cache = AnankiResultCache(self.available_subvibes, MODEL) if use_cache else None
+        self.fast_cache = None
+        if use_cache and (self.first_model != MODEL or self.gate):
+            self.fast_cache = AnankiResultCache(self.available_subvibes, FAST_MODEL)
+
+        # Local kNN over already-labelled tapestry songs; confident predictions skip Claude
+        self.preclassifier = None
+        self.preclassified = 0
+        if preclassify_threshold is not None:
+            model = PreClassifier.from_tapestry(threshold=preclassify_threshold)
+            if len(model) >= MIN_PRECLASSIFIER_SONGS:
+                self.preclassifier = model
+                print(f"Pre-classifier: {len(model):,} labelled songs, threshold {preclassify_threshold}")
+            else:
+                print(f"Pre-classifier off: only {len(model)} labelled tapestry songs (need {MIN_PRECLASSIFIER_SONGS})")
+
+    def system_blocks(self, shortlisted=False):
+        """
+        Static prompt prefix: instructions + the sorted sub-vibe list
+        Identical for every request, so it's sent as a system block marked
+        cache_control=ephemeral: after the first call it's read from the
+        prompt cache (~10% of the input price, much lower latency).
+        Same trick as the web server's claude-service.ts.
+        Shortlisted requests get a variant without the list: their candidates
+        are in the request itself.
+        """
+        if shortlisted not in self._system_blocks:
+            if shortlisted:
+                choices = f"""CANDIDATE SUB-VIBES: every song comes with a shortlist of the most plausible sub-vibes.
+If NONE of its candidates fits, answer "{OTHER}" and the song will be re-asked with the full list."""
+                rule = "1. You MUST select EXACTLY one sub-vibe from each song's CANDIDATE SUB-VIBES (or \"OTHER\")"
+            else:
+                choices = f"""AVAILABLE SUB-VIBES (you MUST choose from this exact list):
+{self.format_subvibes()}"""
+                rule = "1. You MUST select EXACTLY one sub-vibe from the list above for each song"
+            self._system_blocks[shortlisted] = [{
+                "type": "text",
+                "text": f"""You are Ananki, a human-in-the-loop AI that reads human emotional expressions about music and maps songs to specific emotional sub-vibes.
+
+Humans on Reddit/YouTube recommend songs (validated by Spotify) together with the context they recommended them in.
 
-AVAILABLE SUB-VIBES (you MUST choose from this exact list):
-{subvibes_formatted}
+{choices}
 
 CRITICAL RULES:
-1. You MUST select EXACTLY one sub-vibe from the list above
+{rule}
 2. DO NOT create new sub-vibe names or variations
 3. Copy the sub-vibe name EXACTLY as shown (including capitalization and hyphens)
 4. If the context is NOT about music or is ambiguous/off-topic, use "AMBIGUOUS"
+5. Judge every song on its OWN context only
 
 YOUR TASK:
 1. Read the human's emotional context carefully
-2. Determine which ONE sub-vibe from the list best fits this song's emotional intent
+2. Determine which ONE sub-vibe from the list best fits each song's emotional intent
 3. Provide clear reasoning for your choice
 
-Respond in JSON format:
-{{"sub_vibe": "Exact - Sub Vibe Name", "reasoning": "Clear explanation", "confidence": 0.9}}
-
 Confidence scale:
 - 0.9-1.0: Very clear emotional context
 - 0.7-0.8: Clear but some interpretation needed
 - 0.5-0.6: Ambiguous, best guess
 - 0.0-0.4: Not enough context or off-topic (use "AMBIGUOUS")
+""",
+                "cache_control": {"type": "ephemeral"}
+            }]
+        return self._system_blocks[shortlisted]
+
+    def tools(self, shortlisted=False):
+        """The answer tool: one classification per song, sub_vibe restricted to the tapestry names"""
+        names = sorted(self.available_subvibes) + ["AMBIGUOUS"] + ([OTHER] if shortlisted else [])
+        return [{
+            "name": TOOL_NAME,
+            "description": "Record the sub-vibe chosen for every song in the request.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "classifications": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "song": {"type": "integer", "description": "SONG number (1 for a single song)"},
+                                "sub_vibe": {"type": "string", "enum": names},
+                                "reasoning": {"type": "string"},
+                                "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+                            },
+                            "required": ["song", "sub_vibe", "reasoning", "confidence"]
+                        }
+                    }
+                },
+                "required": ["classifications"]
+            }
+        }]
+
+    def request_params(self, prompt, max_tokens, shortlisted=False, model=MODEL):
+        """messages.create kwargs (also used as Message Batch request params)"""
+        params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": self.system_blocks(shortlisted),
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+        if self.structured:
+            params["tools"] = self.tools(shortlisted)
+            params["tool_choice"] = {"type": "tool", "name": TOOL_NAME}
+        return params
+
+    def fork(self):
+        """Client for another worker thread: shares the API client, limiters and caches, own counters"""
+        worker = copy.copy(self)
+        worker.output_stats = dict.fromkeys(self.output_stats, 0)
+        worker.start_run(self.run['mode'])
+        return worker
+
+    def start_run(self, mode):
+        """Start the per-file usage / per-model counters that finish() logs to ananki_runs.jsonl"""
+        with self._usage_lock:
+            self.run = {'mode': mode, 'started': time.time()}
+            self.usage = {'requests': 0, 'input_tokens': 0, 'output_tokens': 0,
+                          'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0}
+            self.tiers = {}
+
+    def _tier(self, model):
+        return self.tiers.setdefault(model, {'requests': 0, 'songs': 0, 'timed': 0, 'seconds': 0.0,
+                                             'cost': 0.0, 'escalated': 0, 'output_tokens': 0,
+                                             'timed_output_tokens': 0})
+
+    def record_usage(self, usage, model=MODEL, seconds=None, songs=0, discount=1.0):
+        with self._usage_lock:
+            self.usage['requests'] += 1
+            tier = self._tier(model)
+            tier['requests'] += 1
+            tier['songs'] += songs
+            if seconds is not None:
+                tier['timed'] += 1
+                tier['seconds'] += seconds
+            counts = {}
+            for key in ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens'):
+                counts[key] = getattr(usage, key, 0) or 0
+                self.usage[key] += counts[key]
+            tier['output_tokens'] += counts['output_tokens']
+            if seconds is not None:
+                tier['timed_output_tokens'] += counts['output_tokens']
+            input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES[MODEL])
+            tier['cost'] += discount * (counts['input_tokens'] * input_price
+                                        + counts['cache_creation_input_tokens'] * input_price * 1.25
+                                        + counts['cache_read_input_tokens'] * input_price * 0.1
+                                        + counts['output_tokens'] * output_price) / 1e6
+
+    def _call_claude(self, prompt, max_tokens, shortlisted=False, model=MODEL, songs=1):
+        """One messages.create call under the request + token budgets"""
+        # Cached prefix reads still count here, so the estimate stays conservative.
+        # Never ask for more than the bucket holds, or acquire() would wait forever
+        budget = min(estimate_tokens(prompt) + self.system_tokens + max_tokens, self.token_budget.capacity)
+        self.token_budget.acquire(budget)
+
+        def create(**params):
+            # Latency of the API call itself (not the time spent waiting for the limiter)
+            start = time.perf_counter()
+            return self.client.messages.create(**params), time.perf_counter() - start
+
+        message, seconds = self.limiter.call(create, **self.request_params(prompt, max_tokens, shortlisted, model))
+        self.record_usage(getattr(message, 'usage', None), model, seconds, songs)
+        return message
+
+    def format_subvibes(self):
+        return "\n".join([f"  - {sv}" for sv in sorted(self.available_subvibes)])
+
+    def candidates_for(self, song):
+        """Shortlisted sub-vibes for this song's context, or None for the full list"""
+        return self.shortlist.candidates(song, self.meta_vibe) if self.shortlist else None
+
+    def is_shortlisted(self, songs):
+        return all(self.candidates_for(song) is not None for song in songs)
+
+    # ---- per-request prompts (the variable part after the cached prefix) ----
+
+    def song_prompt(self, song_data, candidates=None):
+        shortlist = f"\nCANDIDATE SUB-VIBES: {' | '.join(candidates)}\n" if candidates else ""
+        return f"""A human on Reddit/YouTube recommended this song with the following context:
+
+POST TITLE: {song_data.get('post_title', 'N/A')}
+
+COMMENT TEXT: {(song_data.get('comment_text') or 'N/A')[:500]}
+
+SONG VALIDATED BY SPOTIFY:
+- Artist: {song_data['artist']}
+- Song: {song_data['song']}
+- Spotify ID: {song_data['spotify_id']}
+{shortlist}
+{self.answer_format(1)}
 """
 
-        try:
-            # Call Claude API
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",  # Claude Sonnet 4.5 (latest)
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+    def batch_prompt(self, songs, shortlisted=False):
+        # Songs recommended in the same comment share ONE context block;
+        # SONG numbers stay global so the answer array lines up with `songs`
+        groups = {}
+        for i, song in enumerate(songs, 1):
+            groups.setdefault(context_key(song), []).append((i, song))
+
+        blocks = []
+        for n, members in enumerate(groups.values(), 1):
+            first = members[0][1]
+            listed = "\n".join(f"SONG {i}: {song['artist']} - {song['song']}" for i, song in members)
+            shortlist = f"CANDIDATE SUB-VIBES: {' | '.join(self.candidates_for(first))}\n" if shortlisted else ""
+            blocks.append(
+                f"CONTEXT {n}:\n"
+                f"POST TITLE: {first.get('post_title', 'N/A')}\n"
+                f"COMMENT TEXT: {(first.get('comment_text') or 'N/A')[:500]}\n"
+                f"{shortlist}{listed}"
             )
+        songs_formatted = "\n\n".join(blocks)
+        return f"""Classify each of these {len(songs)} songs. Songs listed under the same CONTEXT were recommended together in that one post/comment, but may still fit different sub-vibes:
+
+{songs_formatted}
+
+{self.answer_format(len(songs))}
+"""
+
+    def answer_format(self, count):
+        if self.structured:
+            if count == 1:
+                return f"Record your answer with the {TOOL_NAME} tool (song 1)."
+            return f"Record one classification per song with the {TOOL_NAME} tool (one short sentence of reasoning each)."
+        if count == 1:
+            return """Respond in JSON format:
+{"sub_vibe": "Exact - Sub Vibe Name", "reasoning": "Clear explanation", "confidence": 0.9}"""
+        return """Respond with ONLY a JSON array, one object per song, in order:
+[{"song": 1, "sub_vibe": "Exact - Sub Vibe Name", "reasoning": "One short sentence", "confidence": 0.9}, ...]"""
+
+    def plan_requests(self, songs, indices):
+        """
+        Split song indices into requests, keeping each comment's songs together
+        Songs sharing (source_url, comment_text) are sent in one request so the
+        context is paid for once. Different contexts are packed together up to
+        batch_size songs, but one context is only split once it has more than
+        max(batch_size, MAX_SONGS_PER_CONTEXT) songs - so a request can exceed
+        batch_size. Shortlisted and full-list contexts never share a request,
+        nor do thin (fast-model) and normal ones.
+        """
+        groups = {}
+        for i in indices:
+            groups.setdefault(context_key(songs[i]), []).append(i)
+
+        max_songs = max(self.batch_size, MAX_SONGS_PER_CONTEXT)
+        requests = []
+        for shortlisted, thin in ((True, False), (True, True), (False, False), (False, True)):
+            current = []
+            for members in groups.values():
+                first = songs[members[0]]
+                if (self.candidates_for(first) is not None) != shortlisted or self.is_thin(first) != thin:
+                    continue
+                for k in range(0, len(members), max_songs):
+                    part = members[k:k + max_songs]
+                    if current and len(current) + len(part) > self.batch_size:
+                        requests.append(current)
+                        current = []
+                    current.extend(part)
+            if current:
+                requests.append(current)
+
+        print(f"Request plan: {len(indices)} songs in {len(groups)} contexts -> {len(requests)} requests")
+        return requests
 
-            # Parse Claude's response
-            response_text = message.content[0].text
+    def prompt_for(self, songs, widen=False):
+        """(prompt, max_tokens, shortlisted) for one song or a batch of songs"""
+        shortlisted = not widen and self.is_shortlisted(songs)
+        if len(songs) == 1:
+            candidates = self.candidates_for(songs[0]) if shortlisted else None
+            return self.song_prompt(songs[0], candidates), 1024, shortlisted
+        return self.batch_prompt(songs, shortlisted), OUTPUT_TOKENS_PER_SONG * len(songs) + 256, shortlisted
 
-            # Extract JSON from response
-            import re
+    @staticmethod
+    def legacy_parse(response_text, count):
+        """
+        The old regex extraction, kept only to measure what the new parsing recovers
+        (braces inside the reasoning or an oddly wrapped answer made it give up)
+        """
+        if count == 1:
             json_match = re.search(r'\{[^}]+\}', response_text)
-            if json_match:
-                result = json.loads(json_match.group())
-                return result
-            else:
-                # Fallback if JSON not found
-                return {
-                    "sub_vibe": "AMBIGUOUS",
-                    "reasoning": f"Could not parse response: {response_text[:200]}",
-                    "confidence": 0.0
-                }
+            try:
+                return [json.loads(json_match.group())] if json_match else [None]
+            except ValueError:
+                return [None]
+        try:
+            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+            items = json.loads(json_match.group()) if json_match else []
+        except ValueError:
+            items = []
+        return TrueAnankiClaudeAPI.by_song(items, count)
+
+    @staticmethod
+    def extract_json(text, kind):
+        """First JSON value of the given type (dict / list) embedded in free text"""
+        decoder = json.JSONDecoder()
+        for match in re.finditer(r'\{' if kind is dict else r'\[', text or ''):
+            try:
+                value, _ = decoder.raw_decode(text, match.start())
+            except ValueError:
+                continue
+            if isinstance(value, kind):
+                return value
+        return None
+
+    @staticmethod
+    def by_song(items, count):
+        """Answers ordered by SONG number (None where missing)"""
+        by_index = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and isinstance(item.get('song'), int):
+                by_index[item['song']] = item
+        return [by_index.get(i) for i in range(1, count + 1)]
+
+    @staticmethod
+    def message_text(message):
+        return "".join(getattr(block, 'text', '') for block in message.content if block.type == 'text')
+
+    def answers(self, message, count):
+        """
+        One analysis per song (None where unusable) from a tool call or a text answer
+        Sub-vibe names are mapped to exact tapestry names; outcomes are counted
+        against the old regex parsing for the [OUTPUT] report.
+        """
+        tool_input = next((block.input for block in message.content if block.type == 'tool_use'), None)
+        text = self.message_text(message)
+
+        if tool_input is not None:
+            items = tool_input.get('classifications') if isinstance(tool_input, dict) else None
+            # Tolerate a bare object for a single song
+            if items is None and count == 1 and isinstance(tool_input, dict) and 'sub_vibe' in tool_input:
+                items = [dict(tool_input, song=1)]
+            legacy_text = json.dumps(items)
+        else:
+            items = self.extract_json(text, list)
+            if items is None and count == 1:
+                single = self.extract_json(text, dict)
+                items = [dict(single, song=1)] if single else None
+            legacy_text = text
+
+        if count == 1 and isinstance(items, list) and len(items) == 1 and isinstance(items[0], dict):
+            items = [dict(items[0], song=1)]
+        results = [self.canonical(result) if result else None for result in self.by_song(items, count)]
+        legacy = self.legacy_parse(legacy_text, count)
 
+        with self._usage_lock:
+            self.output_stats['responses'] += 1
+            self.output_stats['tool_calls'] += tool_input is not None
+            self.output_stats['parse_recovered'] += sum(1 for new, old in zip(results, legacy)
+                                                        if new is not None and old is None)
+        return results
+
+    def canonical(self, result):
+        """Exact tapestry sub-vibe name (near misses corrected, unknown names -> AMBIGUOUS)"""
+        name = result.get('sub_vibe')
+        if name in ('AMBIGUOUS', OTHER):
+            return result
+        if isinstance(name, str) and name.strip().upper() in ('AMBIGUOUS', OTHER):
+            return dict(result, sub_vibe=name.strip().upper())
+        match, how = self.matcher.match(name)
+        with self._usage_lock:
+            if match is None:
+                self.output_stats['names_unknown'] += 1
+            elif how != 'exact':
+                self.output_stats['names_corrected'] += 1
+        if match is None:
+            return dict(result, sub_vibe='AMBIGUOUS', confidence=0.0,
+                        reasoning=f"Unknown sub-vibe '{name}': {result.get('reasoning', '')}")
+        return dict(result, sub_vibe=match) if how != 'exact' else result
+
+    @staticmethod
+    def unparsed(response_text):
+        # Fallback if JSON not found
+        return {
+            "sub_vibe": "AMBIGUOUS",
+            "reasoning": f"Could not parse response: {response_text[:200]}",
+            "confidence": 0.0
+        }
+
+    @staticmethod
+    def api_error(e):
+        # Marked as a failure: goes to the dead-letter file, never into the results
+        return {
+            "sub_vibe": "AMBIGUOUS",
+            "reasoning": f"API error: {str(e)}",
+            "confidence": 0.0,
+            "api_error": f"{type(e).__name__}: {e}"
+        }
+
+    # ---- result cache (only real answers are cached, never errors) ----
+
+    def cached_analysis(self, song):
+        cached = self.cache.get(song) if self.cache else None
+        if cached is None and self.fast_cache:
+            cached = self.fast_cache.get(song)
+            if cached is not None and self.needs_escalation(cached) and not self.is_thin(song):
+                cached = None
+        return cached
+
+    def is_thin(self, song):
+        """Context gate: too little context for the strong model to add anything"""
+        return self.gate is not None and self.gate.route(song) == 'fast'
+
+    def local_analysis(self, song):
+        """Answer without Claude: result cache, then the context gate, then a confident local prediction"""
+        cached = self.cached_analysis(song)
+        if cached is None and self.gate is not None:
+            with self._usage_lock:
+                cached = self.gate.check(song)
+        if cached is not None or self.preclassifier is None:
+            return cached
+        predicted = self.preclassifier.classify(song)
+        if predicted is not None:
+            with self._usage_lock:
+                self.preclassified += 1
+        return predicted
+
+    def remember(self, song, analysis, model=MODEL):
+        if model != MODEL:
+            # Fast-tier answers are only kept once accepted (escalated ones are replaced)
+            if self.fast_cache and (self.is_thin(song) or not self.needs_escalation(analysis)):
+                self.fast_cache.put(song, analysis)
+        elif self.cache:
+            self.cache.put(song, analysis)
+        return analysis
+
+    def needs_escalation(self, analysis):
+        """Cascade: fast-tier answers that go to the strong model"""
+        if self.escalate_below is None:
+            return False
+        try:
+            confidence = float(analysis.get('confidence', 0.0))
+        except (TypeError, ValueError):
+            confidence = 0.0
+        return analysis.get('sub_vibe', 'AMBIGUOUS') == 'AMBIGUOUS' or confidence < self.escalate_below
+
+    def _classify_song(self, song_data, widen=False, model=MODEL):
+        """One API call for one song (no cache lookup)"""
+        prompt, max_tokens, shortlisted = self.prompt_for([song_data], widen)
+        try:
+            # Call Claude API
+            message = self._call_claude(prompt, max_tokens, shortlisted, model)
         except Exception as e:
-            return {
-                "sub_vibe": "AMBIGUOUS",
-                "reasoning": f"API error: {str(e)}",
-                "confidence": 0.0
-            }
+            return self.api_error(e)
+
+        result = self.answers(message, 1)[0]
+        if result is None:
+            return self.unparsed(self.message_text(message) or str(message.content))
+        return self.resolve([song_data], [result], shortlisted, model)[0]
+
+    def _classify_batch(self, songs, widen=False, model=MODEL):
+        """One API call for many songs (no cache lookup)"""
+        if len(songs) == 1:
+            return [self._classify_song(songs[0], widen, model)]
+
+        prompt, max_tokens, shortlisted = self.prompt_for(songs, widen)
+        try:
+            message = self._call_claude(prompt, max_tokens, shortlisted, model, len(songs))
+        except Exception as e:
+            return [self.api_error(e) for _ in songs]
+
+        return self.resolve(songs, self.answers(message, len(songs)), shortlisted, model)
+
+    def resolve(self, songs, results, shortlisted, model=MODEL):
+        """
+        Final analyses for one request's parsed answers
+        Missing/garbled entries fall back to a single-song call; OTHER answers
+        to a shortlist are re-asked together with the full list.
+        """
+        analyses = []
+        other = []
+        for n, (song, result) in enumerate(zip(songs, results)):
+            if result is None:
+                analyses.append(self._classify_song(song, model=model))
+            elif shortlisted and result.get('sub_vibe') == OTHER:
+                other.append(n)
+                analyses.append(None)
+            else:
+                analyses.append(self.remember(song, result, model))
+
+        if other:
+            with self._usage_lock:
+                self.widened += len(other)
+            for n, analysis in zip(other, self._classify_batch([songs[n] for n in other], True, model)):
+                analyses[n] = analysis
+        return analyses
+
+    def escalate(self, songs, analyses):
+        """Cascade: re-ask the strong model for the songs the fast tier wasn't sure about"""
+        todo = [i for i, analysis in enumerate(analyses) if self.needs_escalation(analysis)]
+        if todo:
+            with self._usage_lock:
+                self._tier(FAST_MODEL)['escalated'] += len(todo)
+            for i, analysis in zip(todo, self._classify_batch([songs[i] for i in todo])):
+                analyses[i] = analysis
+        return analyses
+
+    def classify(self, songs):
+        """
+        API answers for songs the caches/pre-classifier couldn't answer (cascade-aware)
+        Thin-context songs (context gate) get the fast model only, never escalated.
+        """
+        analyses = [None] * len(songs)
+        thin = [i for i, song in enumerate(songs) if self.is_thin(song)]
+        if thin:
+            with self._usage_lock:
+                self.thin += len(thin)
+            for i, analysis in zip(thin, self._classify_batch([songs[i] for i in thin], model=FAST_MODEL)):
+                analyses[i] = analysis
+
+        rest = [i for i in range(len(songs)) if analyses[i] is None]
+        if rest:
+            rest_songs = [songs[i] for i in rest]
+            answers = self._classify_batch(rest_songs, model=self.first_model)
+            if self.first_model != MODEL:
+                answers = self.escalate(rest_songs, answers)
+            for i, analysis in zip(rest, answers):
+                analyses[i] = analysis
+        return analyses
+
+    def analyze_song_placement(self, song_data):
+        """
+        Use Claude to analyze WHERE this song belongs
+        Like a real human would!
+        """
+        local = self.local_analysis(song_data)
+        if local is not None:
+            return local
+        return self.classify([song_data])[0]
+
+    def analyze_song_batch(self, songs):
+        """
+        Analyze many songs in ONE request
+        The cached prefix is shared and the songs are listed after it;
+        Claude answers with a JSON array (one object per song).
+        Songs already in the result cache (or confidently pre-classified) are not sent at all.
+        Returns one analysis dict per input song, in order.
+        """
+        results = [self.local_analysis(song) for song in songs]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if todo:
+            for i, analysis in zip(todo, self.classify([songs[i] for i in todo])):
+                results[i] = analysis
+        return results
+
+    def tier_summary(self):
+        """Per-model requests, latency, estimated cost and escalation rate"""
+        lines = [f"[TIERS] {'model':<20} {'requests':>8} {'songs':>6} {'avg latency':>11} {'est. cost':>9}  escalated"]
+        for model, tier in self.tiers.items():
+            latency = f"{tier['seconds'] / tier['timed']:.2f}s" if tier['timed'] else "-"
+            escalated = (f"{tier['escalated']} ({tier['escalated'] / max(tier['songs'], 1):.0%})"
+                         if model != MODEL else "-")
+            lines.append(f"        {model:<20} {tier['requests']:>8} {tier['songs']:>6} {latency:>11} "
+                         f"${tier['cost']:>8.4f}  {escalated}")
+        lines.append(f"        total est. cost ${sum(tier['cost'] for tier in self.tiers.values()):.4f}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def annotate(song, analysis):
+        """Attach Claude's answer to the song"""
+        # Add analysis to song data (with safe defaults)
+        song['ananki_subvibe'] = analysis.get('sub_vibe', 'AMBIGUOUS')
+        song['ananki_reasoning'] = analysis.get('reasoning', 'No reasoning provided')
+        song['ananki_confidence'] = analysis.get('confidence', 0.0)
+        return song
+
+    def record(self, stream, deadletters, items):
+        """Append answered (index, song, analysis) items to the stream; API failures go to the dead-letter file"""
+        answered = []
+        failed = []
+        for i, song, analysis in items:
+            if 'api_error' in analysis:
+                failed.append((i, song, analysis['api_error']))
+            else:
+                answered.append((i, self.annotate(song, analysis)))
+        stream.append(answered)
+        deadletters.add(failed)
+
+    def finish(self, songs_file, stream, output_file=None, deadletters=None):
+        """Print stats from the results stream; write a legacy JSON view only if output_file is given"""
+        total = stream.total
+        # Statistics
+        print("\n" + "="*70)
+        print("ANALYSIS COMPLETE" if stream.complete else "ANALYSIS INCOMPLETE")
+        print("="*70)
+        print(f"Total processed: {len(stream.done)}/{total}")
+        print(f"Mapped with confidence: {stream.mapped} ({stream.mapped/max(total, 1)*100:.1f}%)")
+        print(f"Ambiguous/Low confidence: {stream.ambiguous} ({stream.ambiguous/max(total, 1)*100:.1f}%)")
+        print(f"Claude usage: {self.usage['requests']} requests | "
+              f"{self.usage['input_tokens']:,} input tokens | {self.usage['output_tokens']:,} output tokens | "
+              f"cache: {self.usage['cache_read_input_tokens']:,} read, "
+              f"{self.usage['cache_creation_input_tokens']:,} written")
+        if self.cache:
+            print(self.cache.summary())
+        if self.preclassifier:
+            print(f"[PRE-CLASSIFIER] {self.preclassified} songs answered locally (skipped Claude)")
+        if self.gate:
+            print(f"[GATE] thin context: {self.thin} songs sent to {FAST_MODEL} only | "
+                  f"{self.gate.gated} sent straight to the ambiguous bin")
+        if self.shortlist:
+            print(f"[SHORTLIST] {self.widened} songs answered {OTHER} and were re-asked with the full list")
+        if self.tiers:
+            print(self.tier_summary())
+        if self.output_stats['responses']:
+            stats = self.output_stats
+            print(f"[OUTPUT] {stats['responses']} responses ({stats['tool_calls']} tool calls) | "
+                  f"songs the old regex parser would have lost: {stats['parse_recovered']} | "
+                  f"sub-vibe names corrected: {stats['names_corrected']} (inject would have dropped them) | "
+                  f"unknown names: {stats['names_unknown']}")
+        if self.limiter.retried:
+            print(f"[RETRIES] {self.limiter.retried} retried calls ({self.limiter.rate_limited} rate limits), "
+                  f"circuit opened {self.limiter.breaker_trips}x")
+        if deadletters is not None:
+            # Songs answered since they failed (resumed run / replay) leave the dead-letter file
+            deadletters.discard([i for i in list(deadletters.failed) if i in stream])
+            if len(deadletters):
+                print(f"[DEAD LETTER] {len(deadletters)} songs failed after retries: {deadletters.path}")
+                print(f"  Replay them on their own: python true_ananki_claude_api.py \"{deadletters.path}\"")
+        if self.usage['requests']:
+            # Calibration data for ananki_preflight.py
+            log_run(run_log_path(songs_file), {
+                'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'songs_file': str(songs_file),
+                'mode': self.run['mode'],
+                'batch_size': self.batch_size,
+                'concurrency': self.concurrency,
+                'wall_seconds': round(time.time() - self.run['started'], 1),
+                'usage': self.usage,
+                'tiers': self.tiers
+            })
+
+        results = AnankiResults(stream.path)
+
+        # Show example reasoning
+        example = next(results.mapped(), None)
+        if example:
+            print("\n" + "="*70)
+            print("EXAMPLE CLAUDE REASONING:")
+            print("="*70)
+            print(f"Song: {example['artist']} - {example['song']}")
+            print(f"Sub-vibe: {example['ananki_subvibe']}")
+            print(f"Reasoning: {example['ananki_reasoning']}")
+            print(f"Confidence: {example['ananki_confidence']}")
+
+        print(f"\nResults: {stream.path}")
+        if output_file:
+            print(f"Saved to: {results.materialize('mapped', output_file)}")
+        if stream.ambiguous:
+            print(f"Review ambiguous: python ananki_results.py \"{stream.path}\" ambiguous")
+        return results
+
+    def open_results(self, songs_file, songs):
+        """Results stream + dead letters for a songs file (stale ones rotated, old checkpoint folded in)"""
+        stream = ResultStream(results_path(songs_file), songs_file, songs)
+        folded = stream.fold_legacy(legacy_checkpoint_path(songs_file))
+        if folded:
+            print(f"[RESUME] {folded} songs taken over from {legacy_checkpoint_path(songs_file).name}")
+        deadletters = DeadLetters(deadletter_path(songs_file), songs_file, len(songs), self.meta_vibe,
+                                  stream.fingerprint)
+        return stream, deadletters
 
     def map_songs(self, songs_file, output_file=None):
         """
         Process all songs with TRUE Claude analysis
-        WITH CHECKPOINTING & STATUS UPDATES
+        Every answered request is appended to the results stream right away,
+        which doubles as the resume cursor (see ananki_results.py)
         """
-        import time
-        from datetime import datetime
-
         # Load songs
         with open(songs_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
         songs = data.get('mapped_songs', data.get('songs', []))
+        self.meta_vibe = data.get('meta_vibe')
+        self.start_run('live')
 
-        # Setup checkpoint file
-        checkpoint_file = Path(songs_file).parent / f"{Path(songs_file).stem}_ANANKI_CHECKPOINT.json"
-        
-        # Try to resume from checkpoint
-        start_index = 0
-        mapped_songs = []
-        ambiguous_songs = []
-        
-        if checkpoint_file.exists():
-            print("[CHECKPOINT FOUND] Resuming from previous run...")
-            with open(checkpoint_file, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-                mapped_songs = checkpoint.get('mapped_songs', [])
-                ambiguous_songs = checkpoint.get('ambiguous_songs', [])
-                start_index = checkpoint.get('processed_count', 0)
-            print(f"   Resuming from song {start_index}/{len(songs)}")
+        # Results stream = checkpoint: songs already in it are skipped
+        stream, deadletters = self.open_results(songs_file, songs)
+        start_count = len(stream.done)
+        if start_count:
+            print(f"[RESUME] {start_count}/{len(songs)} songs already answered in {stream.path.name}")
 
         print("="*70)
         print("TRUE ANANKI - CLAUDE API ANALYSIS")
         print("="*70)
         print(f"Total songs: {len(songs)}")
-        print(f"Already processed: {start_index}")
-        print(f"Remaining: {len(songs) - start_index}")
-        print("This will take time - Claude reads each context carefully!")
+        print(f"Already processed: {start_count}")
+        print(f"Remaining: {len(songs) - start_count}")
+        print(f"Batch size: {self.batch_size} songs/request | Concurrency: {self.concurrency} requests")
         print("="*70)
         print("STATUS UPDATES EVERY 10 SONGS")
-        print("AUTO-CHECKPOINT EVERY 25 SONGS")
+        print("EVERY ANSWER SAVED AS IT ARRIVES")
         print("="*70)
 
+        todo = [i for i in range(len(songs)) if i not in stream]
+        self._run(songs, todo, stream, deadletters)
+        stream.close()
+        return self.finish(songs_file, stream, output_file, deadletters)
+
+    def replay(self, deadletter_file, output_file=None):
+        """
+        Re-run ONLY the songs in a dead-letter file
+        Answers are appended to the original results stream (same indices);
+        songs that fail again stay in the dead-letter file.
+        """
+        deadletters = DeadLetters(deadletter_file)
+        songs_file = deadletters.header.get('songs_file')
+        total = deadletters.header.get('total')
+        if not songs_file or total is None:
+            raise ValueError(f"{deadletter_file} has no header - not a dead-letter file?")
+        self.meta_vibe = deadletters.header.get('meta_vibe')
+        self.start_run('replay')
+
+        # Only the failed indices are filled in; the rest are never touched
+        songs = [None] * total
+        for index, record in deadletters.failed.items():
+            songs[index] = record['song']
+
+        # Refuses (ValueError) if the songs file was regenerated after these songs failed
+        stream = ResultStream(results_path(songs_file), songs_file, songs,
+                              deadletters.header.get('fingerprint'), rotate=False)
+        todo = sorted(i for i in deadletters.failed if i not in stream)
+
+        print("="*70)
+        print("TRUE ANANKI - DEAD-LETTER REPLAY")
+        print("="*70)
+        print(f"Songs file: {songs_file}")
+        print(f"Failed songs to replay: {len(todo)}")
+        print("="*70)
+
+        self._run(songs, todo, stream, deadletters)
+        stream.close()
+        return self.finish(songs_file, stream, output_file, deadletters)
+
+    def _run(self, songs, todo, stream, deadletters):
+        """Classify songs[todo] with the worker pool, saving every request as it completes"""
+        from datetime import datetime
+
         last_status_time = time.time()
         start_time = time.time()
+        start_count = len(stream.done)
+        total = stream.total
 
-        for i in range(start_index, len(songs)):
-            song = songs[i]
-            current = i + 1
-            
-            # Get Claude's analysis
-            analysis = self.analyze_song_placement(song)
-
-            # Add analysis to song data (with safe defaults)
-            song['ananki_subvibe'] = analysis.get('sub_vibe', 'AMBIGUOUS')
-            song['ananki_reasoning'] = analysis.get('reasoning', 'No reasoning provided')
-            song['ananki_confidence'] = analysis.get('confidence', 0.0)
-
-            # Categorize
-            if analysis['sub_vibe'] == 'AMBIGUOUS' or analysis['confidence'] < 0.5:
-                ambiguous_songs.append(song)
-            else:
-                mapped_songs.append(song)
-            
-            # STATUS UPDATE every 10 songs OR every 30 seconds
-            current_time = time.time()
-            if current % 10 == 0 or (current_time - last_status_time) >= 30:
-                elapsed = current_time - start_time
-                rate = current / elapsed if elapsed > 0 else 0
-                remaining = (len(songs) - current) / rate if rate > 0 else 0
-                
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] "
-                      f"Progress: {current}/{len(songs)} ({current/len(songs)*100:.1f}%) | "
-                      f"Mapped: {len(mapped_songs)} | Ambiguous: {len(ambiguous_songs)} | "
-                      f"ETA: {remaining/60:.1f} min")
-                last_status_time = current_time
-            
-            # CHECKPOINT every 25 songs
-            if current % 25 == 0:
-                with open(checkpoint_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'processed_count': current,
-                        'mapped_songs': mapped_songs,
-                        'ambiguous_songs': ambiguous_songs,
-                        'last_updated': datetime.now().isoformat()
-                    }, f, indent=2, ensure_ascii=False)
-                print(f"[CHECKPOINT] Saved at {current}/{len(songs)}")
-        
-        # FINAL CHECKPOINT
-        print(f"\n[FINAL CHECKPOINT] Saving...")
-        with open(checkpoint_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'processed_count': len(songs),
-                'mapped_songs': mapped_songs,
-                'ambiguous_songs': ambiguous_songs,
-                'last_updated': datetime.now().isoformat(),
-                'status': 'COMPLETE'
-            }, f, indent=2, ensure_ascii=False)
+        batches = self.plan_requests(songs, todo)
+
+        # Batches are saved in completion order - a crash loses only requests still in flight
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {}
+            for n, batch in enumerate(batches):
+                future = pool.submit(self.analyze_song_batch, [songs[i] for i in batch])
+                futures[future] = batch
+                if n == 0:
+                    # Let the first request write the prompt cache before the rest read it
+                    wait([future])
+
+            for future in as_completed(futures):
+                batch = futures[future]
+                # Get Claude's analysis
+                analyses = future.result()
+                self.record(stream, deadletters, [(i, songs[i], analysis) for i, analysis in zip(batch, analyses)])
+
+                # STATUS UPDATE every 10 songs OR every 30 seconds
+                current = len(stream.done)
+                current_time = time.time()
+                if current % 10 < len(batch) or (current_time - last_status_time) >= 30:
+                    elapsed = current_time - start_time
+                    rate = (current - start_count) / elapsed if elapsed > 0 else 0
+                    remaining = (total - current) / rate if rate > 0 else 0
+
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                          f"Progress: {current}/{total} ({current/max(total, 1)*100:.1f}%) | "
+                          f"Mapped: {stream.mapped} | Ambiguous: {stream.ambiguous} | "
+                          f"Failed: {len(deadletters)} | ETA: {remaining/60:.1f} min")
+                    last_status_time = current_time
+
+
+    def map_songs_bulk(self, songs_file, output_file=None, poll_seconds=60):
+        """
+        Offline bulk mode: submit a whole 2_deduped file as ONE Message Batch,
+        poll until it has ended, then collect the results
+        Batches are billed at half price and don't count against the live
+        rate limits; the cached system prefix applies here too.
+        The batch id is saved next to the songs file, so an interrupted run
+        re-attaches to the same batch instead of submitting (and paying) twice.
+        """
+        from datetime import datetime
+
+        # Load songs
+        with open(songs_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        songs = data.get('mapped_songs', data.get('songs', []))
+        self.meta_vibe = data.get('meta_vibe')
+        self.start_run('bulk')
+        state_file = Path(songs_file).parent / f"{Path(songs_file).stem}_ANANKI_BATCH.json"
 
-        # Statistics
-        print("\n" + "="*70)
-        print("ANALYSIS COMPLETE")
         print("="*70)
-        print(f"Total processed: {len(songs)}")
-        print(f"Mapped with confidence: {len(mapped_songs)} ({len(mapped_songs)/len(songs)*100:.1f}%)")
-        print(f"Ambiguous/Low confidence: {len(ambiguous_songs)} ({len(ambiguous_songs)/len(songs)*100:.1f}%)")
+        print("TRUE ANANKI - CLAUDE MESSAGE BATCH (BULK)")
+        print("="*70)
 
-        # Show example reasoning
-        if mapped_songs:
-            print("\n" + "="*70)
-            print("EXAMPLE CLAUDE REASONING:")
-            print("="*70)
-            example = mapped_songs[0]
-            print(f"Song: {example['artist']} - {example['song']}")
-            print(f"Sub-vibe: {example['ananki_subvibe']}")
-            print(f"Reasoning: {example['ananki_reasoning']}")
-            print(f"Confidence: {example['ananki_confidence']}")
+        # Songs already in the results stream (earlier live / bulk run) are never submitted again
+        stream, deadletters = self.open_results(songs_file, songs)
+        analyses = [None] * len(songs)
+
+        state = None
+        if state_file.exists():
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('fingerprint', stream.fingerprint) != stream.fingerprint:
+                # Submitted for an older version of the songs file: its chunk indices don't fit
+                print(f"[STALE] {state_file.name} belongs to an older songs file - ignoring {state['batch_id']}")
+                state = None
+            else:
+                print(f"[BATCH FOUND] Re-attaching to {state['batch_id']}")
+        if state is None:
+            # Only songs the result cache / pre-classifier can't answer are submitted
+            analyses = [None if i in stream else self.local_analysis(song) for i, song in enumerate(songs)]
+            todo = [i for i, analysis in enumerate(analyses) if analysis is None and i not in stream]
+            chunks = self.plan_requests(songs, todo)
+            print(f"Already answered: {len(stream.done)} | Answered locally: {len(songs) - len(stream.done) - len(todo)} | "
+                  f"To submit: {len(todo)}")
+
+            # Thin-context chunks (context gate) go to the fast model, everything else to the first tier
+            thin = [self.is_thin(songs[chunk[0]]) for chunk in chunks]
+            state = {'batch_id': None, 'chunks': chunks, 'model': self.first_model, 'thin': thin}
+            if chunks:
+                requests = []
+                for n, chunk in enumerate(chunks):
+                    prompt, max_tokens, shortlisted = self.prompt_for([songs[i] for i in chunk])
+                    requests.append({
+                        'custom_id': f"chunk-{n}",
+                        'params': self.request_params(prompt, max_tokens, shortlisted,
+                                                     FAST_MODEL if thin[n] else self.first_model)
+                    })
+
+                batch = self.limiter.call(self.client.messages.batches.create, requests=requests)
+                state = {
+                    'batch_id': batch.id,
+                    'chunks': chunks,
+                    'model': self.first_model,
+                    'thin': thin,
+                    'fingerprint': stream.fingerprint,
+                    'submitted_at': datetime.now().isoformat()
+                }
+                with open(state_file, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, indent=2)
+                print(f"Submitted {len(todo)} songs as {len(requests)} requests: {batch.id}")
+
+        batch_id = state['batch_id']
+        chunks = state['chunks']
+        # Batches submitted before the cascade existed were always the strong model
+        batch_model = state.get('model', MODEL)
+        # ...and before the context gate, no chunk was sent to the fast model on its own
+        thin = state.get('thin', [False] * len(chunks))
+        chunk_models = [FAST_MODEL if thin[n] else batch_model for n in range(len(chunks))]
+        responses = {}
+
+        if batch_id:
+            # Poll until the batch has ended
+            while True:
+                batch = self.limiter.call(self.client.messages.batches.retrieve, batch_id)
+                counts = batch.request_counts
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {batch.processing_status} | "
+                      f"processing: {counts.processing} | succeeded: {counts.succeeded} | "
+                      f"errored: {counts.errored} | expired: {counts.expired}")
+                if batch.processing_status == 'ended':
+                    break
+                time.sleep(poll_seconds)
+
+            # Collect
+            for entry in self.client.messages.batches.results(batch_id):
+                if entry.result.type == 'succeeded':
+                    n = int(entry.custom_id.split('-')[1])
+                    self.record_usage(entry.result.message.usage, chunk_models[n], songs=len(chunks[n]), discount=0.5)
+                    responses[entry.custom_id] = entry.result.message
+
+        retried = 0
+        for n, chunk in enumerate(chunks):
+            chunk_songs = [songs[i] for i in chunk]
+            message = responses.get(f"chunk-{n}")
+
+            if message is None:
+                # Errored/expired request: redo it live
+                retried += 1
+                chunk_analyses = self.classify(chunk_songs)
+            else:
+                chunk_analyses = self.resolve(chunk_songs, self.answers(message, len(chunk)),
+                                              self.is_shortlisted(chunk_songs), chunk_models[n])
+                if thin[n]:
+                    self.thin += len(chunk)
+                elif chunk_models[n] != MODEL:
+                    # Cascade escalations run live, right after collection
+                    chunk_analyses = self.escalate(chunk_songs, chunk_analyses)
 
-        # Save results to 3_analyzed/mapped/ directory
-        if output_file is None:
-            # Get project root and save to correct workflow directory
-            project_root = Path(songs_file).parent.parent
-            mapped_dir = project_root / '3_analyzed' / 'mapped'
-            mapped_dir.mkdir(parents=True, exist_ok=True)
-            
-            output_file = mapped_dir / f"{Path(songs_file).stem}_CLAUDE_MAPPED.json"
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'total': len(songs),
-                'mapped': len(mapped_songs),
-                'ambiguous': len(ambiguous_songs),
-                'mapped_songs': mapped_songs,
-                'ambiguous_songs': ambiguous_songs
-            }, f, indent=2, ensure_ascii=False)
-
-        print(f"\nSaved to: {output_file}")
-
-        # Save ambiguous separately to 3_analyzed/ambiguous/
-        if ambiguous_songs:
-            ambig_dir = project_root / '3_analyzed' / 'ambiguous'
-            ambig_dir.mkdir(parents=True, exist_ok=True)
-            ambig_file = ambig_dir / f"{Path(songs_file).stem}_CLAUDE_AMBIGUOUS.json"
-            
-            with open(ambig_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'total': len(ambiguous_songs),
-                    'note': 'These need human review or are not music recommendations',
-                    'songs': ambiguous_songs
-                }, f, indent=2, ensure_ascii=False)
-            print(f"Ambiguous saved to: {ambig_file}")
-        
-        # Clean up checkpoint file (success!)
-        if checkpoint_file.exists():
-            checkpoint_file.unlink()
-            print(f"[SUCCESS] Checkpoint cleaned up")
-
-        return mapped_songs, ambiguous_songs
+            for i, analysis in zip(chunk, chunk_analyses):
+                analyses[i] = analysis
+
+        if retried:
+            print(f"Re-ran {retried} failed batch requests live")
+
+        pending = []
+        for i, (song, analysis) in enumerate(zip(songs, analyses)):
+            if i in stream:
+                continue
+            if analysis is None:
+                # Re-attached run: these were answered from the cache at submit time
+                analysis = self.analyze_song_placement(song)
+            pending.append((i, song, analysis))
+            if len(pending) >= self.batch_size:
+                self.record(stream, deadletters, pending)
+                pending = []
+        self.record(stream, deadletters, pending)
+        stream.close()
+
+        # Batch fully collected - forget it
+        if state_file.exists():
+            state_file.unlink()
+        return self.finish(songs_file, stream, output_file, deadletters)
+
+
+def pop_option(args, name, default, cast=int):
+    """Remove '--name value' from args, return cast(value) or default"""
+    if name in args:
+        idx = args.index(name)
+        value = cast(args[idx + 1])
+        del args[idx:idx + 2]
+        return value
+    return default
 
 
 def main():
-    import sys
+    args = sys.argv[1:]
+    batch_size = pop_option(args, '--batch-size', BATCH_SIZE)
+    concurrency = pop_option(args, '--concurrency', CONCURRENCY)
+    tokens_per_minute = pop_option(args, '--tpm', TOKENS_PER_MINUTE)
+    poll_seconds = pop_option(args, '--poll', 60)
+    preclassify_threshold = pop_option(args, '--preclassify-threshold', PRECLASSIFY_THRESHOLD, float)
+    shortlist_k = pop_option(args, '--shortlist', None)
+    escalate_below = pop_option(args, '--escalate-below', None, float)
+    gate_fast_below = pop_option(args, '--gate-fast-below', GATE_FAST_BELOW, float)
+    gate_ambiguous_below = pop_option(args, '--gate-ambiguous-below', GATE_AMBIGUOUS_BELOW, float)
+    use_gate = '--no-gate' not in args
+    if not use_gate:
+        args.remove('--no-gate')
+    structured = '--no-tools' not in args
+    if not structured:
+        args.remove('--no-tools')
+    if '--cascade' in args:
+        args.remove('--cascade')
+        escalate_below = ESCALATE_BELOW if escalate_below is None else escalate_below
+    if '--no-preclassify' in args:
+        args.remove('--no-preclassify')
+        preclassify_threshold = None
+    bulk = '--bulk' in args
+    if bulk:
+        args.remove('--bulk')
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
 
-    if len(sys.argv) < 2:
-        print("Usage: python true_ananki_claude_api.py <songs_file.json>")
+    if len(args) < 1:
+        print("Usage: python true_ananki_claude_api.py <songs_file.json> [--batch-size N] [--concurrency N] [--tpm N]")
+        print("       python true_ananki_claude_api.py <songs_file.json> --bulk [--batch-size N] [--poll SECONDS]")
+        print("       python true_ananki_claude_api.py <..._CLAUDE_DEADLETTER.jsonl>   (replay failed songs only)")
+        print("       add --no-cache to ignore the result cache (see ananki_cache.py)")
+        print("       --preclassify-threshold X / --no-preclassify tune or disable the local pre-classifier")
+        print("       (python ananki_preclassifier.py eval shows the trade-off)")
+        print("       --shortlist K sends each context its top-K candidate sub-vibes instead of the full list")
+        print("       (python ananki_shortlist.py eval <mapped files> --k K shows how often the answer is kept)")
+        print(f"       --cascade [--escalate-below X] asks {FAST_MODEL} first, {MODEL} only for unsure answers")
+        print("       --no-tools asks for JSON in plain text instead of a tool call")
+        print("       --gate-fast-below X / --gate-ambiguous-below X / --no-gate tune the context gate")
+        print("       (python ananki_context_gate.py report 2_deduped/*_DEDUPED.json shows projected savings)")
         print("\nExample:")
         print("  python true_ananki_claude_api.py test_results/happy_smart_extraction_500.json")
+        print("  python true_ananki_claude_api.py test_results/happy_smart_extraction_500.json --batch-size 1 --concurrency 1")
+        print("  python true_ananki_claude_api.py 2_deduped/happy_DEDUPED.json --bulk")
         return
 
-    songs_file = sys.argv[1]
+    songs_file = args[0]
 
     # Initialize TRUE Ananki
-    ananki = TrueAnankiClaudeAPI()
+    ananki = TrueAnankiClaudeAPI(batch_size, concurrency, tokens_per_minute, use_cache, preclassify_threshold,
+                                 shortlist_k, escalate_below, structured, gate_fast_below,
+                                 gate_ambiguous_below, use_gate)
 
     # Process songs
-    mapped, ambiguous = ananki.map_songs(songs_file)
+    if songs_file.endswith(DEADLETTER_SUFFIX):
+        results = ananki.replay(songs_file)
+    elif bulk:
+        results = ananki.map_songs_bulk(songs_file, poll_seconds=poll_seconds)
+    else:
+        results = ananki.map_songs(songs_file)
+
+    if not results.complete:
+        # Same rule as the pipeline: an incomplete stream is not injected
+        sys.exit(1)
 
     print("\n" + "="*70)
     print("READY FOR INJECTION!")
-    print(f"Use: python inject_to_tapestry.py {Path(songs_file).stem}_CLAUDE_MAPPED.json")
+    print(f"Use: python inject_to_tapestry.py \"{results.path}\"")
 
 
 if __name__ == '__main__':
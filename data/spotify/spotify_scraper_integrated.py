@@ -10,9 +10,14 @@ import pandas as pd
 import json
 from datetime import datetime
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 import time
 
+sys.path.append(str(Path(__file__).parent.parent.parent / 'scrapers' / 'shared'))
+from spotify_cache import CachedSpotify
+
 load_dotenv()
 
 
@@ -28,7 +33,7 @@ class SpotifyScraperIntegrated:
             client_id=client_id,
             client_secret=client_secret
         )
-        self.sp = spotipy.Spotify(auth_manager=auth_manager)
+        self.sp = CachedSpotify(spotipy.Spotify(auth_manager=auth_manager))
         
         # Vibe-specific playlist searches
         self.playlist_searches = {
@@ -314,6 +319,7 @@ def main():
     
     # Scrape
     data = scraper.run_scrape(playlists_per_query=2)
+    print(scraper.sp.cache_summary())
     
     if data:
         filename = scraper.save_for_ananki(data)
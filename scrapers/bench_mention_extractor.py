@@ -0,0 +1,198 @@
+"""
+Benchmark: compiled mention extractor vs the old inline extraction
+Corpus: every comment (plus post title/body) saved by the Reddit test runs
+in data/reddit/test_runs, optionally the comment_text of the raw scrape files.
+Reports comments/sec for both and how closely the compiled extractor
+reproduces the old candidates (precision/recall per comment, should be 100%).
+
+Usage:
+    python scrapers/bench_mention_extractor.py
+    python scrapers/bench_mention_extractor.py --raw-scrapes --repeat 10
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'shared'))
+import mention_extractor
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_RUNS_DIR = PROJECT_ROOT / 'data' / 'reddit' / 'test_runs'
+RAW_DIR = PROJECT_ROOT / 'data' / '1_raw_scrapes'
+
+
+# ---- the old implementations, verbatim (the reference) ----
+
+def legacy_is_music_comment(text):
+    text_lower = text.lower()
+    music_indicators = [
+        'song', 'track', 'album', 'artist', 'band',
+        'listen', 'music', 'playlist'
+    ]
+    return any(word in text_lower for word in music_indicators)
+
+
+def legacy_find_music_mentions(text):
+    if not legacy_is_music_comment(text):
+        return []
+
+    candidates = []
+
+    by_pattern = r'["\']([^"\']{3,60})["\']?\s+by\s+([A-Za-z][^\n,;]{2,40})(?:\.|,|\n|;|$)'
+    by_matches = re.findall(by_pattern, text, re.IGNORECASE)
+    candidates.extend([(f"{m[0].strip()} {m[1].strip()}", 'by_pattern') for m in by_matches])
+
+    dash_pattern = r'([A-Z][A-Za-z\s&\',]{2,40})\s*[-–—]\s*([A-Z][^\n]{3,60}?)(?:\.|,|\n|;|$)'
+    dash_matches = re.findall(dash_pattern, text)
+    candidates.extend([(f"{m[1].strip()} {m[0].strip()}", 'dash') for m in dash_matches])
+
+    quoted = re.findall(r'"([A-Z][^"]{3,60})"', text)
+    candidates.extend([(q.strip(), 'quoted') for q in quoted])
+
+    return candidates
+
+
+def legacy_is_valid_artist_name(artist):
+    if not artist or len(artist) < 2 or len(artist) > 100:
+        return False
+    if 'http' in artist.lower() or 'www.' in artist.lower():
+        return False
+    if re.search(r'[A-Za-z0-9]{15,}', artist):
+        return False
+    sentence_words = ['is', 'the', 'was', 'from', 'does', 'has', 'movie', 'song', 'album', 'similar', 'like']
+    words = artist.lower().split()
+    if len(words) > 4:
+        if sum(1 for w in words if w in sentence_words) > 2:
+            return False
+    if '[' in artist or ']' in artist:
+        return False
+    return True
+
+
+def legacy_is_likely_artist_name(text):
+    if not legacy_is_valid_artist_name(text):
+        return False
+    text_lower = text.lower()
+    non_musical_phrases = [
+        'giving me a hug', 'bob ross', 'mr rogers', 'mr. rogers', 'feels like', 'sounds like', 'reminds me',
+        'makes me feel', 'welcome to the', 'ed to listen', 'couldn\'t sleep', 'late teens', 'old classics', 'check out',
+    ]
+    for phrase in non_musical_phrases:
+        if phrase in text_lower:
+            return False
+    sentence_indicators = [
+        r'\b(giving|makes|feels|couldn|want to|need to|have to|used to)\b',
+        r'\b(listen|sleep|feel|love|hate|prefer)\b',
+        r'\b(welcome|check|suggest|recommend|think)\b',
+    ]
+    if any(re.search(pattern, text_lower) for pattern in sentence_indicators):
+        return False
+    common_words = ['the', 'to', 'of', 'a', 'in', 'is', 'or', 'and', 'me', 'my', 'you', 'your']
+    words = text_lower.split()
+    common_count = sum(1 for w in words if w in common_words)
+    if len(words) > 3 and common_count / len(words) > 0.4:
+        return False
+    return True
+
+
+# ---- corpus ----
+
+def load_corpus(raw_scrapes=False):
+    texts = []
+    for path in sorted(TEST_RUNS_DIR.rglob('*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(data, list):
+            continue
+        for post in data:
+            if not isinstance(post, dict):
+                continue
+            texts.extend(t for t in (post.get('title'), post.get('selftext')) if t)
+            texts.extend(c['body'] for c in post.get('comments', []) if isinstance(c, dict) and c.get('body'))
+    if raw_scrapes:
+        for path in sorted(RAW_DIR.glob('*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.extend(s['comment_text'] for s in json.load(f).get('songs', []) if s.get('comment_text'))
+    return list(dict.fromkeys(texts))
+
+
+def artist_strings(texts):
+    """Artist-like strings to validate: list lines and the pieces around dashes / 'by'"""
+    pieces = []
+    for text in texts:
+        for line in text.splitlines():
+            for piece in re.split(r'\s+(?:[-–—]|by)\s+|,', line):
+                piece = piece.strip(' *"\'')
+                if 2 <= len(piece) <= 100:
+                    pieces.append(piece)
+    return pieces
+
+
+# ---- measurements ----
+
+def rate(func, items, repeat):
+    """Best-of-repeat items/sec"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def agreement(old_func, new_func, texts):
+    """(precision, recall, comments with identical output) of new vs old candidates"""
+    matched = old_total = new_total = identical = 0
+    for text in texts:
+        old, new = old_func(text), new_func(text)
+        identical += old == new
+        common = Counter(old) & Counter(new)
+        matched += sum(common.values())
+        old_total += len(old)
+        new_total += len(new)
+    return matched / max(new_total, 1), matched / max(old_total, 1), identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compiled mention extractor')
+    parser.add_argument('--raw-scrapes', action='store_true', help='Also use comment_text from data/1_raw_scrapes')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.raw_scrapes)
+    if not texts:
+        print(f"No comments found under {TEST_RUNS_DIR}")
+        return
+    print(f"Corpus: {len(texts):,} texts ({sum(map(len, texts)) / 1000:,.0f} KB)\n")
+
+    print(f"{'':24} {'old':>12} {'compiled':>12} {'speedup':>8} | {'precision':>9} {'recall':>7} {'identical':>11}")
+    rows = [
+        ('is_music_comment', texts, legacy_is_music_comment, mention_extractor.is_music_comment, 'texts'),
+        ('find_music_mentions', texts, legacy_find_music_mentions, mention_extractor.find_music_mentions, 'texts'),
+        ('is_likely_artist_name', artist_strings(texts), legacy_is_likely_artist_name,
+         mention_extractor.is_likely_artist_name, 'strings'),
+    ]
+    for name, items, old, new, unit in rows:
+        old_rate, new_rate = rate(old, items, args.repeat), rate(new, items, args.repeat)
+        if name == 'find_music_mentions':
+            precision, recall, identical = agreement(old, new, items)
+        else:
+            identical = sum(old(item) == bool(new(item)) for item in items)
+            precision = recall = identical / len(items)
+        print(f"{name:24} {old_rate:>10,.0f}/s {new_rate:>10,.0f}/s {new_rate / old_rate:>7.2f}x | "
+              f"{precision:>9.1%} {recall:>7.1%} {identical:>5}/{len(items):<5}")
+    print(f"\n(rates in {', '.join(sorted({row[4] for row in rows}))}/sec, best of {args.repeat}; "
+          "precision/recall of the compiled candidates against the old ones)")
+
+
+if __name__ == '__main__':
+    main()
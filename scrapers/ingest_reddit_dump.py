@@ -0,0 +1,68 @@
+"""
+Mine Reddit data dumps offline with the smart-scraper extractor
+No API rate limit on the Reddit side: streams zstd NDJSON dumps (submissions
++ comments) and writes <vibe>_reddit_dump_extraction.json files in the
+standard 1_raw_scrapes format. See shared/reddit_dump.py for how it works.
+
+Usage:
+    python scrapers/ingest_reddit_dump.py --submissions RS_2023-*.zst --comments RC_2023-*.zst
+    python scrapers/ingest_reddit_dump.py --submissions ifyoulikeblank_submissions.zst \\
+        --comments ifyoulikeblank_comments.zst --subreddits ifyoulikeblank --vibes dark,night --workers 6
+    python scrapers/ingest_reddit_dump.py --submissions sample_rs.ndjson --comments sample_rc.ndjson --dry-run
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'shared'))
+from vibe_config import VIBES, VIBE_QUERIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline Reddit dump ingestion')
+    parser.add_argument('--submissions', nargs='+', required=True, help='Submission dumps (.zst / .gz / .ndjson)')
+    parser.add_argument('--comments', nargs='+', required=True, help='Comment dumps (.zst / .gz / .ndjson)')
+    parser.add_argument('--vibes', help='Comma-separated vibes (default: all)')
+    parser.add_argument('--subreddits', help='Comma-separated subreddits (default: the live scraper\'s)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPUs - 1)')
+    parser.add_argument('--target', type=int, help='Stop a vibe at this many songs')
+    parser.add_argument('--min-score', type=int, default=1, help='Minimum comment score')
+    parser.add_argument('--output-dir', help='Where to write the files (default: data/1_raw_scrapes)')
+    parser.add_argument('--post-index', help='Keep the SQLite post index here (default: temporary)')
+    parser.add_argument('--limit-lines', type=int, help='Only read the first N lines of each dump (sampling)')
+    parser.add_argument('--skip-known', action='store_true', help='Skip songs already in the tapestry')
+    parser.add_argument('--keywords', action='store_true', help='Also match queries from COMPLETE_KEYWORD_MAP')
+    parser.add_argument('--rescan', action='store_true', help="Don't skip comments already scraped")
+    parser.add_argument('--all-candidates', action='store_true',
+                        help="Search every mention on Spotify (don't drop the ones the candidate scorer rejects)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count matching posts / music mentions only (no Spotify calls, nothing written)')
+    args = parser.parse_args()
+
+    vibes = args.vibes.split(',') if args.vibes else VIBES
+    unknown = [v for v in vibes if v not in VIBE_QUERIES]
+    if unknown:
+        parser.error(f"unknown vibes: {', '.join(unknown)}")
+
+    from reddit_dump import RedditDumpIngester
+    ingester = RedditDumpIngester(
+        vibes, subreddits=args.subreddits.split(',') if args.subreddits else None, workers=args.workers,
+        output_dir=args.output_dir, target_songs=args.target, min_score=args.min_score,
+        skip_known=args.skip_known, with_keywords=args.keywords, use_registry=not args.rescan,
+        dry_run=args.dry_run, limit_lines=args.limit_lines, post_index=args.post_index,
+        score_candidates=not args.all_candidates
+    )
+    counts = ingester.run(args.submissions, args.comments)
+
+    if counts:
+        print(f"\n{'='*70}")
+        print(" DUMP INGESTION COMPLETE")
+        print(f"{'='*70}")
+        for vibe, count in counts.items():
+            print(f"  {vibe:15} {count}")
+        print("\nNext step: python data/scripts/automated_pipeline.py")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Run any number of vibe scrapers in ONE process
+Clients, Spotify cache and rate limiters are shared by every vibe.
+
+Usage:
+    python scrapers/run_vibes.py                                  # every vibe, Reddit + YouTube
+    python scrapers/run_vibes.py --source reddit --vibes dark,night --target 500
+    python scrapers/run_vibes.py --source youtube --parallel 4 --diversify --skip-known
+    python scrapers/run_vibes.py --source reddit --vibes dark --rescan  # ignore the cross-vibe registry
+    python scrapers/run_vibes.py --list
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'shared'))
+from vibe_config import VIBES, SOURCES, VIBE_QUERIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run vibe scrapers in one process')
+    parser.add_argument('--source', choices=SOURCES + ('all',), default='all')
+    parser.add_argument('--vibes', help='Comma-separated vibes (default: all)')
+    parser.add_argument('--target', type=int, help='Songs per vibe (default: per-vibe default)')
+    parser.add_argument('--parallel', type=int, default=1, help='Vibes scraped at once')
+    parser.add_argument('--output-dir', help='Where to write <vibe>_*_extraction.json')
+    parser.add_argument('--diversify', action='store_true', help='Randomized YouTube search params/queries')
+    parser.add_argument('--skip-known', action='store_true', help='Skip songs already in the tapestry')
+    parser.add_argument('--keywords', action='store_true', help='Add queries from COMPLETE_KEYWORD_MAP')
+    parser.add_argument('--rescan', action='store_true',
+                        help="Don't skip posts/playlists already scraped for other vibes or in earlier runs")
+    parser.add_argument('--all-candidates', action='store_true',
+                        help="Reddit: search every mention on Spotify (don't drop the ones the candidate scorer rejects)")
+    parser.add_argument('--list', action='store_true', help='List configured vibes and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for vibe in VIBES:
+            counts = ', '.join(f"{s}: {len(VIBE_QUERIES[vibe][s])}" for s in SOURCES)
+            print(f"  {vibe:15} ({counts} queries)")
+        return
+
+    vibes = args.vibes.split(',') if args.vibes else VIBES
+    unknown = [v for v in vibes if v not in VIBE_QUERIES]
+    if unknown:
+        parser.error(f"unknown vibes: {', '.join(unknown)}")
+    sources = list(SOURCES) if args.source == 'all' else [args.source]
+
+    from vibe_scrapers import run_vibes
+    results = run_vibes(
+        sources, vibes, targets=args.target, parallel=args.parallel, output_dir=args.output_dir,
+        diversify=args.diversify, skip_known=args.skip_known, with_keywords=args.keywords,
+        use_registry=not args.rescan, score_candidates=not args.all_candidates
+    )
+
+    print(f"\n{'='*70}")
+    print(" ALL VIBES COMPLETE")
+    print(f"{'='*70}")
+    for (source, vibe), count in results.items():
+        print(f"  {source:8} {vibe:15} {'FAILED' if count is None else count}")
+
+
+if __name__ == '__main__':
+    main()
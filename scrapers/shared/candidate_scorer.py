@@ -0,0 +1,323 @@
+"""
+Cheap local scoring of song-mention candidates before any Spotify call
+find_music_mentions is deliberately loose: sentence fragments, quoted
+phrases that aren't titles and 90-character run-ons all come out as
+candidates, and every one used to cost a Spotify search. The scorer drops
+the obvious junk first:
+
+- hard rules: reddit_scraper_v5's is_valid_song_name / is_valid_artist_name
+  (random strings, sentence fragments...) on the song/artist with link and
+  markdown remnants cleaned off - "Song](https://open" by Artist is a real
+  mention and Spotify resolves it fine
+- a small logistic regression over cheap text features (length, word
+  counts, capitalization, common/sentence words, markup, step0's swap and
+  multiple-artist signs...), trained on past scrapes: every stored comment
+  is re-extracted, and a candidate is a positive if it is the query_used
+  of a song from that comment AND that song matches it (calculate_confidence
+  >= GOOD - Spotify answers almost any text with some track)
+- the acceptance threshold keeps TARGET_RECALL of the resolvable
+  candidates, so few real songs are lost (train prints the holdout numbers)
+
+The trained weights live in candidate_model.json next to this file;
+retrain after a big batch of new scrapes:
+
+    python candidate_scorer.py train
+    python candidate_scorer.py score 'I love "Creep" by Radiohead, the song is great'
+
+    scorer = CandidateScorer()
+    if scorer.accept(mention):           # mention_extractor.Mention
+        result = search_spotify(mention.text)
+        scorer.record(result is not None)
+    print(scorer.summary())              # Spotify calls saved per accepted song
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import mention_extractor
+from mention_extractor import COMMON_WORDS, MUSIC_WORDS, NOT_AN_ARTIST, find_mentions
+from track_resolver import calculate_confidence
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_MODEL_PATH = Path(__file__).parent / 'candidate_model.json'
+TRAINING_GLOB = 'data/**/*.json'
+
+TARGET_RECALL = 0.95    # share of resolvable candidates the threshold must keep
+MATCH_CONFIDENCE = 0.6  # calculate_confidence's GOOD: the search found the song that was mentioned
+HOLDOUT_SHARE = 0.2     # comments held out to measure the scorer
+EPOCHS = 40
+LEARNING_RATE = 0.05
+L2 = 0.0005
+
+PATTERNS = ('by_pattern', 'dash', 'quoted')
+MULTIPLE_ARTISTS = (' and ', ' & ', ' feat', ' ft.', ' featuring')
+# step0_preprocess_songs.detect_artist_song_swap: titles start with these, artists rarely do
+SONG_START_WORDS = frozenset(['the', 'a', 'an', 'my', 'your', 'our', 'their', 'his', 'her', 'i', 'me', 'you'])
+# Link remnants: "Song](https://open" is a real mention in markdown, and Spotify copes with it
+LINK = re.compile(r'\]?\s*\(?\[?`?(?:https?://|www\.)\S*|\]\(')
+MARKDOWN = re.compile(r'[\[\]*\\`]')
+
+
+# ---- features ----
+
+def _capitalized(words):
+    return sum(1 for w in words if w[:1].isupper()) / len(words) if words else 0.0
+
+
+def _common(words):
+    return sum(1 for w in words if w.lower() in COMMON_WORDS) / len(words) if words else 0.0
+
+
+def clean_part(text):
+    """Song/artist without link and markdown remnants, whitespace normalized (step0's clean_whitespace)"""
+    return ' '.join(MARKDOWN.sub(' ', LINK.sub(' ', text)).split())
+
+
+def passes_rules(mention):
+    """reddit_scraper_v5's strict name validation, on the cleaned parts"""
+    if not mention_extractor.is_valid_song_name(clean_part(mention.song)):
+        return False
+    return not mention.artist or mention_extractor.is_valid_artist_name(clean_part(mention.artist))
+
+
+def features(mention):
+    """{feature: value} for one candidate (all cheap string checks)"""
+    song, artist, text = mention.song, mention.artist, mention.text
+    song_words, artist_words = song.split(), artist.split()
+    lower = text.lower()
+    values = {
+        'bias': 1.0,
+        'song_chars': len(song) / 50,
+        'artist_chars': len(artist) / 50,
+        'song_words': len(song_words) / 10,
+        'artist_words': len(artist_words) / 10,
+        'long': float(len(text) > 60),
+        'song_capitalized': _capitalized(song_words),
+        'artist_capitalized': _capitalized(artist_words),
+        'song_common_words': _common(song_words),
+        'artist_common_words': _common(artist_words),
+        'sentence_words': float(bool(NOT_AN_ARTIST.search(lower))),
+        'music_words': float(MUSIC_WORDS.search(lower, lowered=True)),
+        'artist_likely': float(bool(artist) and mention_extractor.is_likely_artist_name(artist)),
+        'markup': float('](' in text or 'http' in lower or '*' in text or '[' in text),
+        'newline': float('\n' in text),
+        'punctuation': float(any(c in song for c in '?!:;')),
+        'digits': sum(c.isdigit() for c in text) / len(text) if text else 0.0,
+        'lowercase_artist': float(bool(artist) and artist.islower()),
+        'song_start_word': float(bool(song_words) and song_words[0].lower() in SONG_START_WORDS),
+        'artist_start_word': float(bool(artist_words) and artist_words[0].lower() in SONG_START_WORDS),
+        'multiple_artists': float(any(sep in artist.lower() for sep in MULTIPLE_ARTISTS)),
+    }
+    for pattern in PATTERNS:
+        values[pattern] = float(mention.pattern == pattern)
+    return values
+
+
+def _sigmoid(z):
+    return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def predict(weights, values):
+    return _sigmoid(sum(weights.get(name, 0.0) * value for name, value in values.items()))
+
+
+# ---- training data ----
+
+def match_confidence(mention, artist, song):
+    """calculate_confidence of the candidate against the song Spotify gave for it"""
+    return calculate_confidence(mention.artist, mention.song, artist, song)[0]
+
+
+def training_examples(root=PROJECT_ROOT):
+    """
+    [(comment text, Mention, resolved?)] from every stored scrape that kept comment_text + query_used
+    Spotify answers almost any text with *some* track, so a candidate only
+    counts as resolved if that track matches it (calculate_confidence >= GOOD).
+    """
+    queries = {}
+    for path in sorted(root.glob(TRAINING_GLOB)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        songs = data.get('songs') if isinstance(data, dict) else data
+        for song in songs if isinstance(songs, list) else []:
+            if isinstance(song, dict) and song.get('comment_text') and song.get('query_used'):
+                queries.setdefault(song['comment_text'], {})[song['query_used']] = (song['artist'], song['song'])
+
+    examples = []
+    for comment, used in queries.items():
+        for mention in find_mentions(comment):
+            if len(mention.text) <= 100:
+                found = used.get(mention.text[:100])
+                resolved = found is not None and match_confidence(mention, *found) >= MATCH_CONFIDENCE
+                examples.append((comment, mention, resolved))
+    return examples
+
+
+def split(examples, holdout_share=HOLDOUT_SHARE):
+    """Deterministic train/holdout split by comment (a comment's candidates stay together)"""
+    train, holdout = [], []
+    for example in examples:
+        bucket = zlib.crc32(example[0].encode('utf-8')) % 1000 / 1000
+        (holdout if bucket < holdout_share else train).append(example)
+    return train, holdout
+
+
+def fit(examples, epochs=EPOCHS, learning_rate=LEARNING_RATE, l2=L2):
+    """Logistic regression by SGD over the candidates that pass the hard rules"""
+    rows = [(features(mention), float(label)) for _, mention, label in examples if passes_rules(mention)]
+    weights = dict.fromkeys(rows[0][0], 0.0) if rows else {}
+    rng = random.Random(0)
+    for epoch in range(epochs):
+        rng.shuffle(rows)
+        rate = learning_rate / (1 + epoch * 0.1)
+        for values, label in rows:
+            error = predict(weights, values) - label
+            for name, value in values.items():
+                weights[name] -= rate * (error * value + l2 * weights[name])
+    return weights
+
+
+def pick_threshold(weights, examples, target_recall=TARGET_RECALL):
+    """Highest threshold that still accepts target_recall of the resolvable candidates"""
+    scores = sorted((predict(weights, features(m)) for _, m, label in examples if label and passes_rules(m)),
+                    reverse=True)
+    positives = sum(1 for _, _, label in examples if label)
+    if not scores:
+        return 0.5
+    keep = max(1, math.ceil(target_recall * positives))
+    return scores[min(keep, len(scores)) - 1]
+
+
+def evaluate(weights, threshold, examples):
+    """What the scorer would have done on these candidates"""
+    counts = Counter()
+    for _, mention, label in examples:
+        accepted = passes_rules(mention) and predict(weights, features(mention)) >= threshold
+        counts['candidates'] += 1
+        counts['resolvable'] += label
+        counts['rejected'] += not accepted
+        counts['rejected_resolvable'] += label and not accepted
+        counts['accepted_songs'] += label and accepted
+    return counts
+
+
+# ---- scoring during a scrape ----
+
+def summary(counts):
+    """One-line report from scored/rejected/searched/resolved counts"""
+    saved, songs = counts['candidates_rejected'], counts['candidates_resolved']
+    per_song = f"{saved / songs:.2f}" if songs else "n/a"
+    return (f"[SCORER] {saved}/{counts['candidates_scored']} candidates dropped before Spotify "
+            f"({saved} calls saved) | {counts['candidates_searched']} searched -> {songs} songs | "
+            f"{per_song} calls saved per accepted song")
+
+
+class CandidateScorer:
+    """Accept/reject candidates with the trained model (thread-safe counters)"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or os.getenv('CANDIDATE_MODEL_PATH') or DEFAULT_MODEL_PATH)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                model = json.load(f)
+            self.weights, self.threshold = model['weights'], model['threshold']
+        except (OSError, ValueError, KeyError):
+            # Hard rules only until a model is trained
+            print(f"[SCORER] No model at {self.path} - run: python scrapers/shared/candidate_scorer.py train")
+            self.weights, self.threshold = None, 0.0
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def probability(self, mention):
+        """Estimated chance that a Spotify search finds the song this candidate mentions"""
+        if not passes_rules(mention):
+            return 0.0
+        return predict(self.weights, features(mention)) if self.weights else 1.0
+
+    def accept(self, mention):
+        """True if the candidate is worth a Spotify search"""
+        probability = self.probability(mention)
+        accepted = probability > 0 and probability >= self.threshold
+        with self._lock:
+            self.counts['candidates_scored'] += 1
+            self.counts['candidates_rejected'] += not accepted
+        return accepted
+
+    def record(self, resolved):
+        """Outcome of the Spotify search for an accepted candidate"""
+        with self._lock:
+            self.counts['candidates_searched'] += 1
+            self.counts['candidates_resolved'] += bool(resolved)
+
+    def take_counts(self):
+        """Counts since the last call (worker processes hand them to the main process)"""
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def summary(self):
+        return summary(self.counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Song-mention candidate scorer')
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help='Train on past scrapes (holdout report, then fit on everything)')
+    train.add_argument('--recall', type=float, default=TARGET_RECALL, help='Resolvable candidates to keep')
+    train.add_argument('--model', help=f'Where to write the model (default: {DEFAULT_MODEL_PATH.name})')
+    score = sub.add_parser('score', help='Show the candidates of a comment with their scores')
+    score.add_argument('text')
+    args = parser.parse_args()
+
+    if args.command == 'score':
+        scorer = CandidateScorer()
+        for mention in find_mentions(args.text):
+            verdict = 'search' if scorer.accept(mention) else 'drop'
+            print(f"  {scorer.probability(mention):.2f} {verdict:6} [{mention.pattern}] {mention.text!r}")
+        return
+
+    examples = training_examples()
+    train_set, holdout = split(examples)
+    print(f"{len(examples):,} candidates from past scrapes ({sum(e[2] for e in examples):,} resolved), "
+          f"{len(holdout):,} held out")
+    if not train_set or not holdout:
+        print("Not enough stored scrapes with comment_text + query_used to train")
+        return
+
+    weights = fit(train_set)
+    threshold = pick_threshold(weights, train_set, args.recall)
+    for name, subset in (('train', train_set), ('holdout', holdout)):
+        c = evaluate(weights, threshold, subset)
+        print(f"  {name:8} {c['rejected']}/{c['candidates']} candidates dropped "
+              f"({c['rejected'] / c['candidates']:.1%} of Spotify calls) | "
+              f"{c['rejected_resolvable']}/{c['resolvable']} resolvable lost | "
+              f"{c['rejected'] / max(c['accepted_songs'], 1):.2f} calls saved per accepted song")
+
+    # Final model: every example, threshold re-picked on all of them
+    weights = fit(examples)
+    threshold = pick_threshold(weights, examples, args.recall)
+    path = Path(args.model or DEFAULT_MODEL_PATH)
+    model = {
+        'threshold': round(threshold, 6),
+        'target_recall': args.recall,
+        'trained_on': len(examples),
+        'weights': {name: round(w, 6) for name, w in sorted(weights.items())},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=2)
+    print(f"Model written to {path} (threshold {threshold:.3f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,85 +1,259 @@
 """
-Checkpointing utilities for YouTube scrapers
+Checkpointing utilities for all scrapers
 Import and use checkpoint_manager to get automatic progress saves
+
+Checkpoints are an append-only JSONL journal: every new song, URL, post
+and playlist is written ONCE as its own line, and the buffer is fsynced in
+batches. A kill mid-write can at worst leave a torn last line, which is
+dropped on resume. finalize() writes the deduped output atomically and
+removes the journal.
+
+Old single-document checkpoints are folded into the journal on resume:
+<vibe>_<source>_checkpoint.json, and the unsuffixed <vibe>_checkpoint.json
+written by the old per-vibe copies (to test_results/ here, shared by the
+Reddit and YouTube scrapers, and to data/<source>/test_results/).
 """
 
 import json
+import os
 import time
 from pathlib import Path
-from datetime import datetime
+
+# fsync the journal after this many records or seconds, whichever comes first
+FLUSH_EVERY_RECORDS = 50
+FLUSH_EVERY_SECONDS = 5.0
+
+
+class _JournaledSet(set):
+    """A set whose add() also appends the new item to the checkpoint journal"""
+
+    def __init__(self, items, on_add):
+        super().__init__(items)
+        self._on_add = on_add
+
+    def add(self, item):
+        if item not in self:
+            super().add(item)
+            self._on_add(item)
+
+
+def song_key(song):
+    return (song['artist'].lower(), song['song'].lower())
+
+
+def checkpoint_source(checkpoint):
+    """'reddit' / 'youtube' for an old unsuffixed checkpoint (both sources wrote the same name)"""
+    urls = checkpoint.get('scraped_urls', []) + [song.get('source_url', '') for song in checkpoint.get('songs', [])]
+    for url in urls:
+        if 'reddit.com' in url:
+            return 'reddit'
+        if 'youtube.com' in url:
+            return 'youtube'
+    return 'reddit' if checkpoint.get('processed_posts') else None
+
 
 class CheckpointManager:
-    def __init__(self, meta_vibe_name):
+    def __init__(self, meta_vibe_name, source=None):
         self.meta_vibe_name = meta_vibe_name
-        self.checkpoint_file = Path(__file__).parent.parent / 'test_results' / f'{meta_vibe_name.lower()}_checkpoint.json'
+        self.source = source
+        # Per-source checkpoint so a Reddit and a YouTube run of the same vibe don't collide
+        name = f'{meta_vibe_name.lower()}_{source}' if source else meta_vibe_name.lower()
+        checkpoint_dir = Path(__file__).parent.parent / 'test_results'
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_file = checkpoint_dir / f'{name}_checkpoint.jsonl'
+        self.legacy_checkpoint_files = [checkpoint_dir / f'{name}_checkpoint.json']
+        if source in ('reddit', 'youtube'):
+            vibe = meta_vibe_name.lower()
+            data_dir = Path(__file__).parent.parent.parent / 'data' / source / 'test_results'
+            self.legacy_checkpoint_files += [checkpoint_dir / f'{vibe}_checkpoint.json',
+                                             data_dir / f'{vibe}_checkpoint.json']
         self.start_time = time.time()
         self.last_status_time = time.time()
-        
+
+        self._pending = []  # journal lines not yet written
+        self._last_flush = time.time()
+        self._journal = None
+
         # Load existing checkpoint if resuming
         self.all_results = []
-        self.scraped_urls = set()
-        
-        if self.checkpoint_file.exists():
+        self.unique_keys = set()  # (artist, song) keys, maintained incrementally
+        self.scraped_urls = _JournaledSet((), lambda url: self._record('url', url))
+        self.processed_posts = set()  # Reddit posts we've fully processed
+        self.processed_playlists = set()  # YouTube playlists we've fully processed
+
+        if self.checkpoint_file.exists() or any(f.exists() for f in self.legacy_checkpoint_files):
             print(f"[RESUME] Found checkpoint! Loading previous progress...")
+            self._load()
+            print(f"[RESUME] Continuing from {len(self.all_results)} songs!")
+
+        self._journal = open(self.checkpoint_file, 'a', encoding='utf-8')
+
+    # ---- journal ----
+
+    def _load(self):
+        torn = False
+        if self.checkpoint_file.exists():
             with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        torn = True  # killed mid-write: keep everything before it
+                        break
+                    self._apply(record['t'], record['d'])
+
+        folded = []
+        for legacy_file in self.legacy_checkpoint_files:
+            if not legacy_file.exists():
+                continue
+            # Old single-document checkpoint: fold it into the journal
+            with open(legacy_file, 'r', encoding='utf-8') as f:
                 checkpoint = json.load(f)
-                self.all_results = checkpoint.get('songs', [])
-                self.scraped_urls = set(checkpoint.get('scraped_urls', []))
-            print(f"[RESUME] Continuing from {len(self.all_results)} songs!")
-    
+            if self.source and not legacy_file.name.startswith(f'{self.meta_vibe_name.lower()}_{self.source}_') \
+                    and checkpoint_source(checkpoint) not in (self.source, None):
+                continue  # the other source's progress under the shared unsuffixed name
+            print(f"[RESUME] Folding in {legacy_file}")
+            for song in checkpoint.get('songs', []):
+                self._apply('song', song)
+            for kind, key in (('url', 'scraped_urls'), ('post', 'processed_posts'),
+                              ('playlist', 'processed_playlists')):
+                for value in checkpoint.get(key, []):
+                    self._apply(kind, value)
+            folded.append(legacy_file)
+            torn = True
+
+        if torn:
+            self.compact()
+            for legacy_file in folded:
+                legacy_file.unlink()
+
+    def _apply(self, kind, value):
+        """Replay one journal record into memory"""
+        if kind == 'song':
+            self.all_results.append(value)
+            self.unique_keys.add(song_key(value))
+        elif kind == 'url':
+            set.add(self.scraped_urls, value)
+        elif kind == 'post':
+            self.processed_posts.add(value)
+        elif kind == 'playlist':
+            self.processed_playlists.add(value)
+
+    def _lines(self):
+        """The whole in-memory state as journal lines"""
+        for song in self.all_results:
+            yield {'t': 'song', 'd': song}
+        for kind, values in (('url', self.scraped_urls), ('post', self.processed_posts),
+                             ('playlist', self.processed_playlists)):
+            for value in values:
+                yield {'t': kind, 'd': value}
+
+    def _record(self, kind, value):
+        self._pending.append(json.dumps({'t': kind, 'd': value}, ensure_ascii=False) + '\n')
+        if (len(self._pending) >= FLUSH_EVERY_RECORDS
+                or time.time() - self._last_flush >= FLUSH_EVERY_SECONDS):
+            self.save_checkpoint()
+
+    def compact(self):
+        """Rewrite the journal from memory (atomic replace)"""
+        tmp = self.checkpoint_file.with_suffix('.jsonl.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for record in self._lines():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        if self._journal:
+            self._journal.close()
+        os.replace(tmp, self.checkpoint_file)
+        if self._journal:
+            self._journal = open(self.checkpoint_file, 'a', encoding='utf-8')
+        self._pending = []
+
     def save_checkpoint(self):
-        """Save progress"""
-        with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'meta_vibe': self.meta_vibe_name,
-                'songs': self.all_results,
-                'scraped_urls': list(self.scraped_urls),
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2, ensure_ascii=False)
-    
+        """Append pending records and fsync (cost is per new record, not per total)"""
+        if self._pending and self._journal:
+            self._journal.write(''.join(self._pending))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending = []
+        self._last_flush = time.time()
+
+    # ---- progress ----
+
+    def mark_post_processed(self, post_id):
+        """Mark a Reddit post as fully processed"""
+        if post_id not in self.processed_posts:
+            self.processed_posts.add(post_id)
+            self._record('post', post_id)
+
+    def is_post_processed(self, post_id):
+        """Check if we've already processed this Reddit post"""
+        return post_id in self.processed_posts
+
+    def mark_playlist_processed(self, playlist_id):
+        """Mark a playlist as fully processed"""
+        if playlist_id not in self.processed_playlists:
+            self.processed_playlists.add(playlist_id)
+            self._record('playlist', playlist_id)
+
+    def is_playlist_processed(self, playlist_id):
+        """Check if we've already processed this playlist"""
+        return playlist_id in self.processed_playlists
+
     def update_progress(self, new_songs):
         """Add songs and auto-checkpoint"""
         self.all_results.extend(new_songs)
-        
-        # Checkpoint every 100 songs
-        if len(self.all_results) % 100 == 0:
+        for song in new_songs:
+            self.unique_keys.add(song_key(song))
+            self._record('song', song)
+
+        # Checkpoint every 100 songs (but not at 0!)
+        if new_songs and len(self.all_results) % 100 == 0:
             self.save_checkpoint()
             print(f"  [CHECKPOINT] {len(self.all_results)} songs saved")
-        
+
         # Status every 60 seconds
         current_time = time.time()
         if (current_time - self.last_status_time) >= 60:
             elapsed = int(current_time - self.start_time)
-            unique = len(set((s['artist'].lower(), s['song'].lower()) for s in self.all_results))
-            print(f"  [STATUS] {elapsed//60}m{elapsed%60}s | {len(self.all_results)} total ({unique} unique) | {len(self.scraped_urls)} URLs")
+            print(f"  [STATUS] {self.meta_vibe_name} {elapsed//60}m{elapsed%60}s | {len(self.all_results)} total ({len(self.unique_keys)} unique) | {len(self.scraped_urls)} URLs")
             self.last_status_time = current_time
-    
+
     def finalize(self, output_file, target_songs=None):
         """Save final and cleanup checkpoint"""
+        self.save_checkpoint()
+
         # Deduplicate
         seen = set()
         unique = []
         for r in self.all_results:
-            key = (r['artist'].lower(), r['song'].lower())
+            key = song_key(r)
             if key not in seen:
                 seen.add(key)
                 unique.append(r)
-        
+
         if target_songs and len(unique) > target_songs:
             unique = unique[:target_songs]
-        
-        # Save
-        with open(output_file, 'w', encoding='utf-8') as f:
+
+        # Save (atomically - the journal is only removed once this is on disk)
+        output_file = Path(output_file)
+        tmp = output_file.with_name(output_file.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
             json.dump({
                 'meta_vibe': self.meta_vibe_name,
-                'source': 'youtube',
+                'source': self.source or 'youtube',
                 'total': len(unique),
                 'note': 'Ready for TRUE Ananki',
                 'songs': unique
             }, f, indent=2, ensure_ascii=False)
-        
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, output_file)
+
         # Delete checkpoint
+        self._journal.close()
+        self._journal = None
         if self.checkpoint_file.exists():
             self.checkpoint_file.unlink()
-        
+
         return unique
@@ -0,0 +1,185 @@
+"""
+Song-mention extraction shared by the Reddit scrapers (live and dump)
+Everything is compiled once at import instead of on every comment:
+
+- KeywordMatcher: a keyword/phrase list folded into a trie and compiled
+  into ONE regex, so a comment is scanned once for all of them
+  (Aho-Corasick style) instead of once per phrase. For a handful of
+  plain keywords (the 8 music indicators) CPython's `in` is faster than
+  any regex, so short lists stay substring checks on the lower-cased text.
+- the "Song" by Artist / Artist - Song / "Quoted" patterns of
+  find_music_mentions, precompiled, each skipped when the literal it
+  needs (a dash, a quote, "by") isn't in the comment
+- the reddit_scraper_v5 artist-name filter (non-musical phrases +
+  sentence words) as one regex pass instead of 14 substring checks and
+  3 regex searches
+
+find_music_mentions returns exactly what RedditVibeScraper's inline
+version did (same candidates, same order) - see scrapers/bench_mention_extractor.py.
+
+    from mention_extractor import find_music_mentions, is_likely_artist_name
+    from mention_extractor import find_mentions   # same, with the song/artist parts
+"""
+
+import re
+from collections import namedtuple
+
+# Up to this many plain keywords, `in` checks are faster than a regex
+SUBSTRING_KEYWORDS = 12
+
+
+def _trie_regex(trie):
+    """Regex source for a trie of characters ('' key = a word ends here)"""
+    ends = '' in trie
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(trie.items()) if char]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not ends:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if ends else group
+
+
+class KeywordMatcher:
+    """
+    Finds any of many keywords in one pass over the lower-cased text
+    A handful of plain keywords are checked with `in` (CPython's substring
+    search beats any regex there); longer lists go through the trie regex.
+    """
+
+    def __init__(self, keywords, whole_words=False):
+        self.keywords = tuple(sorted({k.lower() for k in keywords}))
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        source = _trie_regex(trie) if self.keywords else '(?!)'
+        self.source = r'\b(?:' + source + r')\b' if whole_words else source
+        self.pattern = re.compile(self.source)
+        self._substrings = self.keywords if not whole_words and len(self.keywords) <= SUBSTRING_KEYWORDS else None
+
+    def search(self, text, lowered=False):
+        """True if any keyword occurs (pass lowered=True if text is already lower-case)"""
+        if not lowered:
+            text = text.lower()
+        if self._substrings is not None:
+            return any(keyword in text for keyword in self._substrings)
+        return self.pattern.search(text) is not None
+
+    def findall(self, text):
+        """Keywords found (non-overlapping, left to right)"""
+        return self.pattern.findall(text.lower())
+
+
+# ---- find_music_mentions ----
+
+MUSIC_INDICATORS = ['song', 'track', 'album', 'artist', 'band', 'listen', 'music', 'playlist']
+MUSIC_WORDS = KeywordMatcher(MUSIC_INDICATORS)
+
+# Pattern 1: "Song Title" by Artist
+BY_PATTERN = re.compile(r'["\']([^"\']{3,60})["\']?\s+by\s+([A-Za-z][^\n,;]{2,40})(?:\.|,|\n|;|$)', re.IGNORECASE)
+# Pattern 2: Artist - Song (both must start with capital)
+DASH_PATTERN = re.compile(r'([A-Z][A-Za-z\s&\',]{2,40})\s*[-–—]\s*([A-Z][^\n]{3,60}?)(?:\.|,|\n|;|$)')
+# Pattern 3: Quoted titles (only if text contains music indicators)
+QUOTED_PATTERN = re.compile(r'"([A-Z][^"]{3,60})"')
+
+
+def is_music_comment(text):
+    """Check if comment is actually about music"""
+    return MUSIC_WORDS.search(text)
+
+
+# One candidate: the search text plus the parts it was built from (artist is '' for a bare quoted title)
+Mention = namedtuple('Mention', ['text', 'pattern', 'song', 'artist'])
+
+
+def _mention(song, artist, pattern):
+    song, artist = song.strip(), artist.strip()
+    return Mention(f"{song} {artist}" if pattern != 'quoted' else song, pattern, song, artist)
+
+
+def find_mentions(text):
+    """[Mention] candidates - more conservative patterns"""
+    lowered = text.lower()
+    if not MUSIC_WORDS.search(lowered, lowered=True):
+        return []
+
+    # Each pattern only runs if the literal it needs is there (most comments have no dash)
+    candidates = []
+    if 'by' in lowered and ('"' in text or "'" in text):
+        candidates += [_mention(song, artist, 'by_pattern') for song, artist in BY_PATTERN.findall(text)]
+    if '-' in text or '–' in text or '—' in text:
+        candidates += [_mention(song, artist, 'dash') for artist, song in DASH_PATTERN.findall(text)]
+    if '"' in text:
+        candidates += [_mention(title, '', 'quoted') for title in QUOTED_PATTERN.findall(text)]
+    return candidates
+
+
+def find_music_mentions(text):
+    """[(search text, pattern name)] candidates - more conservative patterns"""
+    return [(mention.text, mention.pattern) for mention in find_mentions(text)]
+
+
+# ---- song/artist-name validation (reddit_scraper_v5) ----
+
+# Common non-musical phrases (substring match) and sentence words (whole words)
+NON_MUSICAL_PHRASES = [
+    'giving me a hug', 'bob ross', 'mr rogers', 'mr. rogers', 'feels like', 'sounds like', 'reminds me',
+    'makes me feel', 'welcome to the', 'ed to listen', "couldn't sleep", 'late teens', 'old classics', 'check out',
+]
+SENTENCE_WORDS = [
+    'giving', 'makes', 'feels', 'couldn', 'want to', 'need to', 'have to', 'used to',
+    'listen', 'sleep', 'feel', 'love', 'hate', 'prefer',
+    'welcome', 'check', 'suggest', 'recommend', 'think',
+]
+# Both lists in one pass over the lower-cased text
+NOT_AN_ARTIST = re.compile(KeywordMatcher(NON_MUSICAL_PHRASES).source + '|'
+                           + KeywordMatcher(SENTENCE_WORDS, whole_words=True).source)
+FRAGMENT_WORDS = frozenset(['is', 'the', 'was', 'from', 'does', 'has', 'movie', 'song', 'album', 'similar', 'like'])
+COMMON_WORDS = frozenset(['the', 'to', 'of', 'a', 'in', 'is', 'or', 'and', 'me', 'my', 'you', 'your'])
+RANDOM_STRING = re.compile(r'[A-Za-z0-9]{15,}')
+LONG_RANDOM_STRING = re.compile(r'[A-Za-z0-9]{20,}')
+SONG_START = re.compile(r'[A-Za-z0-9"\']')
+
+
+def is_valid_song_name(song):
+    """Strict validation for song names (inherited from V4)"""
+    if not song or len(song) < 3 or len(song) > 150:
+        return False
+    lower = song.lower()
+    if 'http' in lower or 'www.' in lower or '[' in song or ']' in song:
+        return False
+    # No long random strings (URL fragments); must start with alphanumeric or quote
+    return not LONG_RANDOM_STRING.search(song) and bool(SONG_START.match(song))
+
+
+def is_valid_artist_name(artist):
+    """Strict validation for artist names (inherited from V4)"""
+    if not artist or len(artist) < 2 or len(artist) > 100:
+        return False
+    lower = artist.lower()
+    if 'http' in lower or 'www.' in lower or '[' in artist or ']' in artist:
+        return False
+    if RANDOM_STRING.search(artist):
+        return False
+    words = lower.split()
+    # No sentence fragments (common parsing error)
+    if len(words) > 4 and sum(1 for w in words if w in FRAGMENT_WORDS) > 2:
+        return False
+    return True
+
+
+def is_likely_artist_name(text):
+    """is_valid_artist_name + rejects non-musical phrases and sentence fragments"""
+    if not is_valid_artist_name(text):
+        return False
+    lower = text.lower()
+    if NOT_AN_ARTIST.search(lower):
+        return False
+    words = lower.split()
+    # Too many common words: likely a sentence fragment
+    if len(words) > 3 and sum(1 for w in words if w in COMMON_WORDS) / len(words) > 0.4:
+        return False
+    return True
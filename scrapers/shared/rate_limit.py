@@ -0,0 +1,221 @@
+"""
+Global rate-limit scheduler for all scrapers
+One token bucket per API, shared by every thread (and every vibe) in the
+process, so concurrent workers never exceed the quota together.
+
+On a rate-limit error we DON'T stop - we pause the bucket (honouring
+Retry-After), halve its rate, retry, and creep back up on success.
+Limiters can opt into retrying every transient error (overload / 5xx /
+timeouts) and into a circuit breaker that pauses ALL workers after a run
+of consecutive failures.
+"""
+
+import os
+import random
+import threading
+import time
+
+# Reddit OAuth quota: 100 queries per minute per client ID
+REDDIT_REQUESTS_PER_MINUTE = int(os.getenv('REDDIT_REQUESTS_PER_MINUTE', 100))
+
+# Spotify only documents a rolling 30s window (no fixed number);
+# 10/s matches the old 0.1s-per-candidate pacing of the scrapers
+SPOTIFY_REQUESTS_PER_SECOND = float(os.getenv('SPOTIFY_REQUESTS_PER_SECOND', 10))
+
+# YouTube Data API quota is per day (units), not per second;
+# ~3/s matches the old 0.3s-per-video pacing of the YouTube scrapers
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv('YOUTUBE_REQUESTS_PER_SECOND', 3))
+
+
+# HTTP statuses worth retrying besides 429 (529 = Anthropic "overloaded")
+TRANSIENT_STATUSES = {'408', '500', '502', '503', '504', '529'}
+
+
+def error_status(exc):
+    """HTTP status of an API exception (spotipy, prawcore, googleapiclient, anthropic), or None"""
+    status = getattr(exc, 'http_status', None)
+    if status is None:
+        response = getattr(exc, 'response', None)
+        if response is None:
+            response = getattr(exc, 'resp', None)  # googleapiclient HttpError
+        status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    return status
+
+
+def is_rate_limit_error(exc):
+    """Recognise 429s from spotipy, prawcore and googleapiclient"""
+    if str(error_status(exc)) == '429':
+        return True
+
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(s in text for s in ('toomanyrequests', 'too many requests', 'rate limit', 'ratelimit', '429'))
+
+
+def is_transient_error(exc):
+    """Rate limits plus overload, 5xx, timeouts and dropped connections"""
+    if is_rate_limit_error(exc) or str(error_status(exc)) in TRANSIENT_STATUSES:
+        return True
+
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(s in text for s in ('overloaded', 'timeout', 'timed out', 'connection', 'temporarily unavailable'))
+
+
+def retry_after_seconds(exc):
+    """Server-suggested wait from the Retry-After header, if any"""
+    headers = getattr(exc, 'headers', None)
+    if headers is None:
+        response = getattr(exc, 'response', None)
+        headers = getattr(response, 'headers', None)
+    try:
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)              # tokens per second
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Block every caller for `seconds` (e.g. after a 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    TokenBucket + retry policy
+    call(fn) waits for a token, runs fn, and on a rate-limit error pauses the
+    bucket (Retry-After or jittered exponential backoff), halves the rate and
+    retries. Successful calls slowly restore the nominal rate.
+
+    retryable: which errors are retried (default: rate limits only)
+    breaker_after: after this many consecutive retryable errors the circuit
+    opens - the shared bucket is paused for breaker_cooldown seconds
+    (doubling while the overload lasts), so every worker stops at once
+    instead of each one hammering the API with its own retries.
+    """
+
+    def __init__(self, name, rate, capacity=None, max_retries=6, base_delay=2.0, max_delay=300.0,
+                 retryable=is_rate_limit_error, breaker_after=None, breaker_cooldown=60.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.nominal_rate = float(rate)
+        self.min_rate = self.nominal_rate / 16
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.breaker_after = breaker_after
+        self.breaker_cooldown = breaker_cooldown
+        self.rate_limited = 0
+        self.retried = 0
+        self.breaker_trips = 0
+        self._consecutive_failures = 0
+        self._open_streak = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        self.bucket.acquire()
+
+    def on_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._open_streak = 0
+            if self.bucket.rate < self.nominal_rate:
+                self.bucket.rate = min(self.nominal_rate, self.bucket.rate * 1.05)
+
+    def on_rate_limit(self, exc, attempt):
+        delay = retry_after_seconds(exc)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            delay *= 0.5 + random.random() / 2
+        rate_limited = is_rate_limit_error(exc)
+        cooldown = None
+        with self._lock:
+            self.retried += 1
+            self.rate_limited += rate_limited
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            self._consecutive_failures += 1
+            if self.breaker_after and self._consecutive_failures >= self.breaker_after:
+                self._consecutive_failures = 0
+                self._open_streak += 1
+                self.breaker_trips += 1
+                cooldown = min(self.max_delay, self.breaker_cooldown * 2 ** (self._open_streak - 1))
+        if cooldown is not None:
+            delay = max(delay, cooldown)
+            print(f"  [CIRCUIT OPEN] {self.name}: {self.breaker_after} failures in a row "
+                  f"({type(exc).__name__}) - pausing all workers for {delay:.0f}s")
+        else:
+            print(f"  [{'RATE LIMIT' if rate_limited else 'RETRY'}] {self.name}: backing off {delay:.1f}s "
+                  f"(now {self.bucket.rate:.2f} req/s, retry {attempt + 1}/{self.max_retries})")
+        self.bucket.pause(delay)
+
+    def call(self, fn, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.wait()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.retryable(e):
+                    raise
+                self.on_rate_limit(e, attempt)
+                continue
+            self.on_success()
+            return result
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _get_shared(name, factory):
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = factory()
+        return _shared[name]
+
+
+def reddit_limiter():
+    """Process-wide Reddit limiter (all threads, all vibes)"""
+    return _get_shared('reddit', lambda: AdaptiveRateLimiter(
+        'Reddit', REDDIT_REQUESTS_PER_MINUTE / 60.0, capacity=10))
+
+
+def spotify_limiter():
+    """Process-wide Spotify limiter (all threads, all vibes)"""
+    return _get_shared('spotify', lambda: AdaptiveRateLimiter(
+        'Spotify', SPOTIFY_REQUESTS_PER_SECOND, capacity=SPOTIFY_REQUESTS_PER_SECOND))
+
+
+def youtube_limiter():
+    """Process-wide YouTube Data API limiter (all threads, all vibes)"""
+    return _get_shared('youtube', lambda: AdaptiveRateLimiter(
+        'YouTube', YOUTUBE_REQUESTS_PER_SECOND, capacity=YOUTUBE_REQUESTS_PER_SECOND))
@@ -0,0 +1,416 @@
+"""
+Offline Reddit dump ingestion for the smart-scraper extractor
+The live PRAW path is capped at 100 requests/minute. Reddit data dumps
+(zstd-compressed NDJSON, one submission/comment per line - the monthly
+RS_/RC_ files or per-subreddit _submissions/_comments files) let us mine
+r/musicsuggestions, r/ifyoulikeblank, r/listentothis... years deep.
+
+Two streaming passes, constant memory however big the dumps are:
+
+  1. submissions -> keep posts in the subreddits whose title/body match a
+     vibe's Reddit queries; written to an on-disk SQLite post index
+     (id -> vibes, title, body) instead of a dict
+  2. comments    -> keep comments under an indexed post, run the SAME
+     find_music_mentions / extract_from_comment as the live scraper
+     (Spotify resolution, cache, validation) and append the songs to each
+     matching vibe's checkpoint
+
+The main process only decompresses and cheaply pre-filters lines by
+subreddit; JSON parsing, query matching and extraction run in a
+multiprocessing pool, with at most a few chunks in flight. The Spotify
+quota is split between the worker processes. Output is the standard
+1_raw_scrapes format (<vibe>_reddit_dump_extraction.json). Comments already
+mined (live or from a dump) are skipped through the SeenRegistry, so an
+interrupted run resumes where it stopped.
+
+zstandard is only needed for .zst dumps (pip install zstandard); .gz and
+plain .ndjson/.jsonl samples work without it. See scrapers/ingest_reddit_dump.py.
+"""
+
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+import candidate_scorer
+import rate_limit
+from checkpoint_utils import CheckpointManager
+from reddit_engine import DEFAULT_SUBREDDITS
+from vibe_config import display_name, get_queries
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'data' / '1_raw_scrapes'
+OUTPUT_NAME = '{vibe}_reddit_dump_extraction.json'
+
+CHUNK_LINES = 2000           # lines per task sent to a worker
+IN_FLIGHT_PER_WORKER = 2     # chunks queued per worker (bounds memory)
+ZSTD_WINDOW = 2 ** 31        # the Pushshift dumps are compressed with --long=31
+MIN_COMMENT_SCORE = 1        # same as the live engine
+MAX_POST_BODY = 2000
+
+# Words that say nothing about a vibe ("sad songs playlist" -> "sad")
+QUERY_STOPWORDS = {
+    'a', 'an', 'and', 'for', 'i', 'im', 'in', 'is', 'me', 'my', 'need', 'of', 'on', 'or', 'the', 'to',
+    'when', 'with', 'music', 'song', 'songs', 'playlist', 'playlists', 'track', 'tracks', 'mix',
+}
+
+_DELETED = {'[deleted]', '[removed]', ''}
+
+
+def open_dump(path):
+    """Text stream over a .zst / .gz / plain NDJSON dump"""
+    path = Path(path)
+    if path.suffix == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst dumps needs the zstandard package: pip install zstandard")
+        reader = zstandard.ZstdDecompressor(max_window_size=ZSTD_WINDOW).stream_reader(open(path, 'rb'))
+        return io.TextIOWrapper(reader, encoding='utf-8', errors='replace')
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 4 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def query_patterns(vibes, with_keywords=False):
+    """{vibe: [[word regex, ...] per query]} - a post matches a query if it has all its words"""
+    patterns = {}
+    for vibe in vibes:
+        queries = []
+        for query in get_queries(vibe, 'reddit', with_keywords):
+            words = [w for w in re.findall(r"[a-z0-9']+", query.lower()) if w not in QUERY_STOPWORDS]
+            if words:
+                # Word-prefix match ('villains' finds 'villain'; 'sad' doesn't match 'crusade')
+                queries.append([re.compile(r"\b" + re.escape(_stem(w))) for w in words])
+        patterns[vibe] = queries
+    return patterns
+
+
+def subreddit_filter(subreddits):
+    """Cheap regex on the raw line, so the main process doesn't ship every line of a full monthly dump"""
+    names = '|'.join(re.escape(s) for s in subreddits)
+    return re.compile(r'"subreddit"\s*:\s*"(?:' + names + r')"', re.IGNORECASE)
+
+
+def chunks(path, line_filter, limit_lines=None, stats=None):
+    """Lists of CHUNK_LINES raw lines that pass line_filter"""
+    chunk = []
+    with open_dump(path) as f:
+        for n, line in enumerate(f, 1):
+            if limit_lines and n > limit_lines:
+                break
+            if stats is not None:
+                stats['lines'] += 1
+                stats['bytes'] += len(line)
+            if line_filter.search(line):
+                chunk.append(line)
+                if len(chunk) >= CHUNK_LINES:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def bounded_map(pool, func, tasks, in_flight):
+    """pool.imap that only reads `in_flight` tasks ahead (imap would read the whole dump into its queue)"""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task,)))
+        if len(pending) >= in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+# ---- worker side (one set of these per process) ----
+
+_worker = {}
+
+
+def _init_worker(config):
+    # Each process has its own limiter: give it its share of the Spotify quota
+    rate_limit.SPOTIFY_REQUESTS_PER_SECOND = config['spotify_rate']
+    _worker.clear()
+    _worker['config'] = config
+    _worker['subreddits'] = {s.lower() for s in config['subreddits']}
+
+
+def _patterns():
+    if 'patterns' not in _worker:
+        config = _worker['config']
+        _worker['patterns'] = query_patterns(config['vibes'], config['with_keywords'])
+    return _worker['patterns']
+
+
+def _scraper():
+    if 'scraper' not in _worker:
+        from vibe_scrapers import RedditVibeScraper, ScraperClients
+        config = _worker['config']
+        _worker['scraper'] = RedditVibeScraper(config['vibes'][0], ScraperClients(),
+                                               skip_known=config['skip_known'], use_registry=False,
+                                               score_candidates=config['score_candidates'])
+    return _worker['scraper']
+
+
+def _registry():
+    """Read-only view of the SeenRegistry (the main process records new IDs)"""
+    if 'registry' not in _worker:
+        registry = None
+        if _worker['config']['use_registry']:
+            from seen_registry import SeenRegistry
+            registry = SeenRegistry()
+        _worker['registry'] = registry
+    return _worker['registry']
+
+
+def _posts_db():
+    if 'posts' not in _worker:
+        _worker['posts'] = sqlite3.connect(f"file:{_worker['config']['post_index']}?mode=ro", uri=True)
+    return _worker['posts']
+
+
+def _records(lines, stats):
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            stats['bad_lines'] += 1
+            continue
+        if str(record.get('subreddit', '')).lower() in _worker['subreddits']:
+            yield record
+
+
+def match_submissions(lines):
+    """Pass 1 task: [(id, vibes, title, body)] for posts matching a vibe query"""
+    stats = Counter()
+    rows = []
+    for post in _records(lines, stats):
+        stats['posts'] += 1
+        title = post.get('title') or ''
+        body = post.get('selftext') or ''
+        if body in _DELETED:
+            body = ''
+        text = f"{title}\n{body}".lower()
+        vibes = [vibe for vibe, queries in _patterns().items()
+                 if any(all(p.search(text) for p in query) for query in queries)]
+        if vibes and post.get('id'):
+            rows.append((post['id'], ','.join(vibes), title, body[:MAX_POST_BODY]))
+    stats['matched_posts'] = len(rows)
+    return rows, stats
+
+
+def extract_comments(lines):
+    """Pass 2 task: [(comment id, vibes, songs)] for comments under an indexed post"""
+    stats = Counter()
+    comments = []
+    for comment in _records(lines, stats):
+        stats['comments'] += 1
+        body = comment.get('body') or ''
+        if body in _DELETED or (comment.get('score') or 0) < _worker['config']['min_score']:
+            continue
+        comments.append(comment)
+
+    # One indexed lookup per chunk for the posts these comments belong to
+    post_ids = {str(c.get('link_id', '')).split('_')[-1] for c in comments}
+    posts = {}
+    ids = list(post_ids)
+    for i in range(0, len(ids), 500):
+        batch = ids[i:i + 500]
+        posts.update((row[0], row[1:]) for row in _posts_db().execute(
+            f"SELECT id, vibes, title, body FROM posts WHERE id IN ({','.join('?' * len(batch))})", batch))
+
+    scraper = _scraper()
+    registry = _registry()
+    results = []
+    for comment in comments:
+        post_id = str(comment.get('link_id', '')).split('_')[-1]
+        if post_id not in posts:
+            continue
+        stats['under_matched_posts'] += 1
+        if registry is not None and registry.seen('reddit_comment', comment.get('id')):
+            stats['already_scraped'] += 1
+            continue
+        body = comment['body']
+        mentions = scraper.find_music_mentions(body)
+        if not mentions:
+            continue
+        stats['music_comments'] += 1
+        vibes, title, post_body = posts[post_id]
+        permalink = comment.get('permalink') or \
+            f"/r/{comment.get('subreddit')}/comments/{post_id}/_/{comment.get('id')}/"
+        url = f"https://reddit.com{permalink}"
+
+        if _worker['config']['dry_run']:
+            songs = []
+            stats['candidates'] += len(mentions)
+        else:
+            try:
+                songs = scraper.extract_from_comment(body, url, comment.get('score', 0), title, post_body)
+            except Exception as e:
+                print(f"  Error extracting {url}: {e}")
+                continue
+            for song in songs:
+                song['source'] = 'reddit_dump'
+                song['subreddit'] = comment.get('subreddit')
+        stats['songs'] += len(songs)
+        results.append((comment.get('id'), vibes.split(','), songs))
+    if not _worker['config']['dry_run']:
+        # Pool workers are never closed: commit the tracks learned in this chunk
+        scraper.clients.flush()
+        if scraper.score_candidates:
+            # Scorer counts live in this process: hand them over with the chunk's stats
+            stats.update(scraper.clients.scorer.take_counts())
+    return results, stats
+
+
+# ---- main process ----
+
+class RedditDumpIngester:
+    """Streams submission + comment dumps through the live extractor into per-vibe raw scrape files"""
+
+    def __init__(self, vibes, subreddits=None, workers=None, output_dir=None, target_songs=None,
+                 min_score=MIN_COMMENT_SCORE, skip_known=False, with_keywords=False, use_registry=True,
+                 dry_run=False, limit_lines=None, post_index=None, score_candidates=True):
+        self.vibes = list(vibes)
+        self.subreddits = subreddits or DEFAULT_SUBREDDITS
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.output_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
+        self.target_songs = target_songs
+        self.dry_run = dry_run
+        self.limit_lines = limit_lines
+        self.use_registry = use_registry and not dry_run
+        self.line_filter = subreddit_filter(self.subreddits)
+        self.stats = Counter()
+
+        # Post index on disk: years of r/musicsuggestions don't fit in a dict
+        self._temp_index = post_index is None
+        self.post_index = Path(post_index) if post_index else \
+            Path(tempfile.mkdtemp(prefix='reddit_dump_')) / 'posts.sqlite'
+
+        self.config = {
+            'vibes': self.vibes,
+            'subreddits': self.subreddits,
+            'with_keywords': with_keywords,
+            'skip_known': skip_known,
+            'use_registry': self.use_registry,
+            'score_candidates': score_candidates,
+            'min_score': min_score,
+            'dry_run': dry_run,
+            'post_index': str(self.post_index),
+            'spotify_rate': rate_limit.SPOTIFY_REQUESTS_PER_SECOND / self.workers,
+        }
+
+    def _pool(self):
+        return multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.config,))
+
+    def _stream(self, pool, func, paths):
+        for path in paths:
+            print(f"  [DUMP] Streaming {Path(path).name}...")
+            tasks = chunks(path, self.line_filter, self.limit_lines, self.stats)
+            for result, stats in bounded_map(pool, func, tasks, self.workers * IN_FLIGHT_PER_WORKER):
+                self.stats.update(stats)
+                yield result
+
+    def index_posts(self, pool, submission_files):
+        """Pass 1: matching posts -> SQLite post index"""
+        self.post_index.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.post_index))
+        db.execute('CREATE TABLE IF NOT EXISTS posts (id TEXT PRIMARY KEY, vibes TEXT, title TEXT, body TEXT)')
+        for rows in self._stream(pool, match_submissions, submission_files):
+            db.executemany('INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?)', rows)
+            db.commit()
+        indexed = db.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+        db.close()
+        print(f"  [DUMP] {self.stats['posts']:,} posts in the subreddits, {indexed:,} match a vibe query")
+        return indexed
+
+    def extract(self, pool, comment_files):
+        """Pass 2: comments under indexed posts -> per-vibe checkpoints"""
+        checkpoints = {} if self.dry_run else \
+            {vibe: CheckpointManager(display_name(vibe), source='reddit_dump') for vibe in self.vibes}
+        registry = None
+        if self.use_registry:
+            from seen_registry import SeenRegistry
+            registry = SeenRegistry()
+
+        def done(vibe):
+            return bool(self.target_songs and vibe in checkpoints
+                        and len(checkpoints[vibe].all_results) >= self.target_songs)
+
+        try:
+            for results in self._stream(pool, extract_comments, comment_files):
+                for comment_id, vibes, songs in results:
+                    for vibe in vibes:
+                        if vibe in checkpoints and songs and not done(vibe):
+                            checkpoints[vibe].update_progress([dict(song) for song in songs])
+                    if registry is not None:
+                        registry.add('reddit_comment', comment_id, ','.join(vibes))
+                if checkpoints and all(done(vibe) for vibe in self.vibes):
+                    print(f"  [DUMP] Every vibe reached {self.target_songs} songs - stopping early")
+                    break
+        finally:
+            if registry is not None:
+                print(registry.summary())
+                registry.close()
+
+        counts = {}
+        for vibe, cp in checkpoints.items():
+            output = self.output_dir / OUTPUT_NAME.format(vibe=vibe)
+            counts[vibe] = len(cp.finalize(output, self.target_songs))
+            if not counts[vibe]:
+                output.unlink()  # nothing for the pipeline to pick up
+                continue
+            print(f"  [{display_name(vibe)}] {counts[vibe]} unique songs -> {output}")
+        return counts
+
+    def run(self, submission_files, comment_files):
+        """Returns {vibe: unique songs written}"""
+        if not self.dry_run:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        start = time.time()
+        print(f"[DUMP] {len(self.vibes)} vibes | r/{', r/'.join(self.subreddits)} | {self.workers} worker processes")
+
+        pool = self._pool()
+        try:
+            if not self.index_posts(pool, submission_files):
+                print("[DUMP] No submission matches a vibe query - nothing to extract")
+                return {}
+            counts = self.extract(pool, comment_files)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+            if self._temp_index:
+                for path in self.post_index.parent.glob('posts.sqlite*'):
+                    path.unlink()
+                self.post_index.parent.rmdir()
+
+        elapsed = time.time() - start
+        print(f"\n[DUMP] {self.stats['lines']:,} lines ({self.stats['bytes'] / 1e6:,.0f} MB) in {elapsed:.0f}s "
+              f"({self.stats['bytes'] / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+        print(f"  comments in the subreddits: {self.stats['comments']:,} | under matching posts: "
+              f"{self.stats['under_matched_posts']:,} | with music mentions: {self.stats['music_comments']:,}")
+        if self.stats['already_scraped']:
+            print(f"  already scraped (registry): {self.stats['already_scraped']:,}")
+        if self.dry_run:
+            print(f"  DRY RUN: {self.stats['candidates']:,} candidate mentions (no Spotify calls, nothing written)")
+        else:
+            print(f"  songs resolved: {self.stats['songs']:,}")
+            if self.stats['candidates_scored']:
+                print(f"  {candidate_scorer.summary(self.stats)}")
+        if self.stats['bad_lines']:
+            print(f"  unreadable lines skipped: {self.stats['bad_lines']:,}")
+        return counts
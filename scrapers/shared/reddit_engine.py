@@ -0,0 +1,171 @@
+"""
+Concurrent Reddit scraping engine shared by all Reddit smart scrapers
+Replaces the strictly serial queries x subreddits x posts x comments walk:
+
+  search tasks   -> one per (query, subreddit)
+  comment tasks  -> one per post (fetch + flatten its comment tree)
+  extract tasks  -> one per comment (regex + Spotify resolution)
+
+All tasks run in one thread pool. Every Reddit request goes through the
+process-wide Reddit limiter and every Spotify call through the Spotify
+limiter (see rate_limit.py), so adding workers never breaks the quotas.
+Rate-limit errors back off and retry instead of ending the run.
+
+PRAW is not thread safe, so each worker thread gets its own Reddit
+instance built from the caller's credentials. CheckpointManager is only
+touched from the calling thread.
+
+With a SeenRegistry, posts and comments already mined for ANY vibe (in
+this or an earlier run) are skipped before their comments are fetched /
+their songs are resolved.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from rate_limit import reddit_limiter
+
+DEFAULT_SUBREDDITS = ['musicsuggestions', 'ifyoulikeblank', 'Music', 'listentothis']
+
+
+class ConcurrentRedditEngine:
+    def __init__(self, reddit, extract_fn, subreddits=None, max_workers=8,
+                 posts_per_search=20, comments_per_post=30, min_comment_score=1,
+                 time_filter='year', limiter=None, registry=None, vibe=None):
+        """
+        reddit: a configured praw.Reddit (its credentials are cloned per thread)
+        extract_fn: scraper.extract_from_comment(text, url, score, post_title, post_body)
+        registry: optional SeenRegistry shared across vibes/runs (vibe is recorded with new IDs)
+        """
+        self.reddit = reddit
+        self.extract_fn = extract_fn
+        self.subreddits = subreddits or DEFAULT_SUBREDDITS
+        self.max_workers = max_workers
+        self.posts_per_search = posts_per_search
+        self.comments_per_post = comments_per_post
+        self.min_comment_score = min_comment_score
+        self.time_filter = time_filter
+        self.limiter = limiter or reddit_limiter()
+        self.registry = registry
+        self.vibe = vibe
+        self._local = threading.local()
+
+    def _thread_reddit(self):
+        """One praw.Reddit per worker thread"""
+        if not hasattr(self._local, 'reddit'):
+            import praw
+            config = self.reddit.config
+            self._local.reddit = praw.Reddit(
+                client_id=config.client_id,
+                client_secret=config.client_secret,
+                user_agent=config.user_agent
+            )
+        return self._local.reddit
+
+    # ---- worker tasks (run in the pool) ----
+
+    def _search(self, query, sub_name):
+        def fetch():
+            sub = self._thread_reddit().subreddit(sub_name)
+            return [
+                {'id': p.id, 'title': p.title, 'body': getattr(p, 'selftext', '') or ''}
+                for p in sub.search(query, limit=self.posts_per_search, time_filter=self.time_filter)
+            ]
+        return 'posts', sub_name, self.limiter.call(fetch)
+
+    def _comments(self, post):
+        def fetch():
+            submission = self._thread_reddit().submission(id=post['id'])
+            submission.comments.replace_more(limit=0)
+            return [
+                {'id': c.id, 'body': c.body, 'score': c.score, 'url': f'https://reddit.com{c.permalink}'}
+                for c in submission.comments.list()[:self.comments_per_post]
+                if hasattr(c, 'body') and c.score >= self.min_comment_score
+            ]
+        return 'comments', post, self.limiter.call(fetch)
+
+    def _extract(self, post, comment):
+        try:
+            songs = self.extract_fn(comment['body'], comment['url'], comment['score'],
+                                    post['title'], post['body'])
+        except Exception as e:
+            # e.g. Spotify down: the comment stays unscraped, so a later run retries it
+            print(f"  Error extracting {comment['url']}: {e}")
+            return 'failed', (post, comment), None
+        return 'songs', (post, comment), songs
+
+    # ---- scheduler (runs in the calling thread) ----
+
+    def _seen(self, kind, item_id):
+        return self.registry is not None and self.registry.seen(kind, item_id)
+
+    def _mark_post(self, cp, post_id):
+        cp.mark_post_processed(post_id)
+        if self.registry is not None:
+            self.registry.add('reddit_post', post_id, self.vibe)
+
+    def run(self, queries, cp, target_songs):
+        """Scrape until target_songs are collected or the work runs out"""
+        # Older CheckpointManagers (data/ copies) also track fully processed posts
+        tracks_posts = hasattr(cp, 'is_post_processed')
+        outstanding = {}  # post id -> comments still being extracted
+        queued_posts = set()  # several searches return the same post; fetch its comments once
+        failed_posts = set()  # posts with a comment whose extraction failed are not marked processed
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {pool.submit(self._search, q, sub) for q in queries for sub in self.subreddits}
+        print(f"  [ENGINE] {len(pending)} searches queued on {self.max_workers} workers")
+
+        try:
+            while pending and len(cp.all_results) < target_songs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        kind, context, payload = future.result()
+                    except Exception as e:
+                        print(f"  Error: {e}")
+                        continue
+
+                    if kind == 'posts':
+                        for post in payload:
+                            if tracks_posts and cp.is_post_processed(post['id']):
+                                continue
+                            if post['id'] in queued_posts:
+                                continue
+                            if self._seen('reddit_post', post['id']):
+                                continue  # fully mined for another vibe / in an earlier run
+                            queued_posts.add(post['id'])
+                            pending.add(pool.submit(self._comments, post))
+
+                    elif kind == 'comments':
+                        post = context
+                        new_comments = [c for c in payload if c['url'] not in cp.scraped_urls
+                                        and not self._seen('reddit_comment', c.get('id'))]
+                        for comment in new_comments:
+                            pending.add(pool.submit(self._extract, post, comment))
+                        outstanding[post['id']] = outstanding.get(post['id'], 0) + len(new_comments)
+                        if outstanding[post['id']] == 0 and tracks_posts:
+                            self._mark_post(cp, post['id'])
+
+                    elif kind == 'songs':
+                        post, comment = context
+                        cp.update_progress(payload)
+                        # Only now: a cancelled / crashed extraction is redone on resume
+                        cp.scraped_urls.add(comment['url'])
+                        if self.registry is not None:
+                            self.registry.add('reddit_comment', comment.get('id'), self.vibe)
+                        outstanding[post['id']] -= 1
+                        if outstanding[post['id']] == 0 and tracks_posts and post['id'] not in failed_posts:
+                            self._mark_post(cp, post['id'])
+
+                    elif kind == 'failed':
+                        post, comment = context
+                        failed_posts.add(post['id'])
+                        outstanding[post['id']] -= 1
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+        print(f"  Progress: {len(cp.all_results)} songs")
+        return cp.all_results
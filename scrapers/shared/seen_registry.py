@@ -0,0 +1,255 @@
+"""
+Persistent "already scraped" registry shared by ALL scrapers
+CheckpointManager only remembers what ONE vibe has scraped, and forgets it
+on finalize(). The same r/ifyoulikeblank threads and YouTube playlists come
+back for "dark", "night" and "introspective" queries; this registry
+remembers every processed Reddit post/comment and YouTube playlist/video
+across vibes and across runs, so they are not fetched and resolved again.
+
+- Exact on-disk set: SQLite (kind, id) table with when / for which vibe it
+  was first scraped
+- Compact in-memory Bloom filter in front of it: most lookups are for
+  content never seen before, and those are answered without touching disk.
+  A Bloom "maybe" is confirmed against SQLite, so a false positive never
+  skips new content.
+- The filter is saved next to the database on close() and rebuilt from
+  SQLite when it is missing, too small or out of date (e.g. another
+  process added IDs, or a run was killed before saving)
+
+    registry = SeenRegistry()
+    if not registry.seen('reddit_post', post_id):
+        ...
+        registry.add('reddit_post', post_id, vibe='dark')
+    registry.close()
+
+    python seen_registry.py stats
+    python seen_registry.py prune 90     # forget content scraped more than 90 days ago
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_REGISTRY_PATH = Path(__file__).parent / 'cache' / 'seen_registry.sqlite'
+
+KINDS = ('reddit_post', 'reddit_comment', 'youtube_playlist', 'youtube_video')
+
+DEFAULT_CAPACITY = 2_000_000   # IDs before the filter is grown (~3.6 MB at 0.1%)
+DEFAULT_ERROR_RATE = 0.001     # Bloom false positives (each costs one SQLite lookup)
+COMMIT_EVERY = 200             # Batch inserts into one transaction
+
+_BLOOM_MAGIC = b'SEEN1'
+_BLOOM_HEADER = struct.Struct('<5sQIQQ')  # magic, bits, hashes, capacity, IDs in the database
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter (double hashing over one blake2b digest)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE, bits=None, hashes=None):
+        self.capacity = max(capacity, 1)
+        self.bits = bits or max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.bits / self.capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path, count):
+        """Write atomically with the database row count it was built from"""
+        tmp = Path(str(path) + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.bits, self.hashes, self.capacity, count))
+            f.write(self.array)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """(filter, count) or (None, None) if the file is missing or damaged"""
+        try:
+            with open(path, 'rb') as f:
+                magic, bits, hashes, capacity, count = _BLOOM_HEADER.unpack(f.read(_BLOOM_HEADER.size))
+                array = f.read()
+        except (OSError, struct.error):
+            return None, None
+        if magic != _BLOOM_MAGIC or len(array) != (bits + 7) // 8:
+            return None, None
+        bloom = cls(capacity, bits=bits, hashes=hashes)
+        bloom.array = bytearray(array)
+        return bloom, count
+
+
+class SeenRegistry:
+    """Bloom filter + exact SQLite set of scraped content IDs (thread-safe)"""
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.path = Path(path or os.getenv('SEEN_REGISTRY_PATH') or DEFAULT_REGISTRY_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bloom_path = self.path.with_suffix('.bloom')
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                vibe TEXT,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (kind, id)
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+        self._uncommitted = 0
+
+        self.count = self._db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+        self.bloom = self._load_bloom()
+
+        self.bloom_skips = 0      # answered "new" without touching disk
+        self.hits = 0             # really seen before
+        self.false_positives = 0  # Bloom said maybe, SQLite said no
+        self.added = 0
+
+    @staticmethod
+    def _key(kind, item_id):
+        return f"{kind}:{item_id}"
+
+    def _load_bloom(self):
+        bloom, count = BloomFilter.load(self.bloom_path)
+        # Usable only if it was built from exactly what is in the database and still has room
+        if bloom is not None and count == self.count and self.count <= bloom.capacity:
+            return bloom
+        return self._rebuild()
+
+    def _rebuild(self):
+        # Twice the current size, so a full filter isn't rebuilt again on the next run
+        bloom = BloomFilter(max(self.capacity, 2 * self.count), self.error_rate)
+        for kind, item_id in self._db.execute('SELECT kind, id FROM seen'):
+            bloom.add(self._key(kind, item_id))
+        if self.count:
+            print(f"[REGISTRY] Rebuilt Bloom filter from {self.count:,} scraped IDs")
+        return bloom
+
+    # ---- lookups ----
+
+    def seen(self, kind, item_id):
+        """True if this post / comment / playlist / video was scraped before (any vibe, any run)"""
+        if item_id is None:
+            return False
+        key = self._key(kind, item_id)
+        with self._lock:
+            if key not in self.bloom:
+                self.bloom_skips += 1
+                return False
+            row = self._db.execute('SELECT 1 FROM seen WHERE kind = ? AND id = ?',
+                                   (kind, str(item_id))).fetchone()
+            if row is None:
+                self.false_positives += 1
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, kind, item_id, vibe=None):
+        """Record scraped content (no-op if it is already known)"""
+        if item_id is None:
+            return
+        with self._lock:
+            cursor = self._db.execute('INSERT OR IGNORE INTO seen (kind, id, vibe, first_seen) VALUES (?, ?, ?, ?)',
+                                      (kind, str(item_id), vibe, time.time()))
+            self.bloom.add(self._key(kind, item_id))
+            if cursor.rowcount:
+                self.count += 1
+                self.added += 1
+                self._uncommitted += 1
+                if self._uncommitted >= COMMIT_EVERY:
+                    self._db.commit()
+                    self._uncommitted = 0
+                if self.count > self.bloom.capacity:
+                    # Past capacity the false-positive rate climbs fast - grow now, not next run
+                    self.bloom = self._rebuild()
+
+    # ---- persistence ----
+
+    def flush(self):
+        """Commit pending IDs and save the filter"""
+        with self._lock:
+            self._db.commit()
+            self._uncommitted = 0
+            self.bloom.save(self.bloom_path, self.count)
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def prune(self, older_than_days):
+        """Forget content scraped more than N days ago (so it can be mined again); returns IDs removed"""
+        cutoff = time.time() - older_than_days * 24 * 60 * 60
+        with self._lock:
+            removed = self._db.execute('DELETE FROM seen WHERE first_seen < ?', (cutoff,)).rowcount
+            self._db.commit()
+            self.count -= removed
+            # A Bloom filter can't delete - rebuild from what is left
+            self.bloom = self._rebuild()
+            self.bloom.save(self.bloom_path, self.count)
+        return removed
+
+    def stats(self):
+        by_kind = dict(self._db.execute('SELECT kind, COUNT(*) FROM seen GROUP BY kind').fetchall())
+        return {
+            'ids': self.count,
+            'by_kind': by_kind,
+            'bloom_bits': self.bloom.bits,
+            'bloom_hashes': self.bloom.hashes,
+            'bloom_skips': self.bloom_skips,
+            'hits': self.hits,
+            'false_positives': self.false_positives,
+            'added': self.added,
+        }
+
+    def summary(self):
+        lookups = self.bloom_skips + self.hits + self.false_positives
+        return (f"[REGISTRY] {self.hits} already-scraped items skipped | {self.added} new IDs recorded | "
+                f"{self.bloom_skips}/{lookups} lookups answered by the Bloom filter "
+                f"({self.false_positives} false positives) | {self.count:,} IDs total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-vibe registry of already scraped content')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='IDs per kind and filter size')
+    prune = sub.add_parser('prune', help='Forget content scraped more than N days ago')
+    prune.add_argument('days', type=float)
+    args = parser.parse_args()
+
+    registry = SeenRegistry()
+    if args.command == 'prune':
+        print(f"Removed {registry.prune(args.days):,} IDs scraped more than {args.days:g} days ago")
+    stats = registry.stats()
+    print(f"Registry: {registry.path}")
+    print(f"  {stats['ids']:,} IDs")
+    for kind in KINDS:
+        print(f"    {kind:17} {stats['by_kind'].get(kind, 0):,}")
+    print(f"  Bloom filter: {stats['bloom_bits'] / 8 / 1024 / 1024:.1f} MB, {stats['bloom_hashes']} hashes")
+    registry.close()
+
+
+if __name__ == '__main__':
+    main()
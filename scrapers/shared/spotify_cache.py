@@ -0,0 +1,344 @@
+"""
+Persistent Spotify search cache shared by ALL scrapers
+Wrap a spotipy client with CachedSpotify and every search() checks an
+on-disk SQLite cache first - the same "Artist - Song" string is only ever
+resolved once across all 23 vibes and across re-runs.
+
+- Normalized keys (case, unicode, dashes/quotes, whitespace)
+- TTL on hits, shorter TTL on "no result" answers (negative caching)
+- Size-bounded: least recently used entries are evicted past max_entries
+
+Artist lookups (popularity/genres for is_valid_track) go through
+ArtistInfoCache: in-process LRU in front of the same SQLite file, filled
+with Spotify's batched 'artists' endpoint (50 IDs per call).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from rate_limit import spotify_limiter
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / 'cache' / 'spotify_cache.sqlite'
+
+DAY = 24 * 60 * 60
+DEFAULT_TTL = 30 * DAY           # Found tracks rarely change
+DEFAULT_NEGATIVE_TTL = 3 * DAY   # Re-check misses sooner (catalog grows)
+DEFAULT_MAX_ENTRIES = 500_000
+DEFAULT_ARTIST_TTL = 14 * DAY    # Popularity drifts, refresh every 2 weeks
+ARTIST_LRU_SIZE = 10_000
+ARTISTS_PER_CALL = 50            # Spotify 'artists' endpoint limit
+
+_DASHES = re.compile(r'[‐-―−]')
+_QUOTES = re.compile(r'[‘’‚‛“”„‟`]')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_query(query):
+    """Normalize a search string so trivial variations share a cache entry"""
+    text = unicodedata.normalize('NFKC', query or '')
+    text = _DASHES.sub('-', text)
+    text = _QUOTES.sub("'", text)
+    text = _SPACES.sub(' ', text).strip().casefold()
+    return text.strip('\'" ')
+
+
+def _is_empty_response(response):
+    """True if a search response has no usable items in any result section"""
+    if not response:
+        return True
+    for section in response.values():
+        if isinstance(section, dict) and any(section.get('items') or []):
+            return False
+    return True
+
+
+class SpotifySearchCache:
+    """SQLite-backed query -> search response cache (thread-safe)"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path or os.getenv('SPOTIFY_CACHE_PATH') or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT,
+                is_negative INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_search_last_access ON search_cache(last_access)')
+        self._db.commit()
+
+        self._entries = self._db.execute('SELECT COUNT(*) FROM search_cache').fetchone()[0]
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query, search_type='track', limit=10, offset=0, market=None):
+        return f"{search_type}|{limit}|{offset}|{market or ''}|{normalize_query(query)}"
+
+    def get(self, key):
+        """Return (found, response). found=False means not cached or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT response, is_negative, created_at FROM search_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            response, is_negative, created_at = row
+            ttl = self.negative_ttl if is_negative else self.ttl
+            if now - created_at > ttl:
+                self._db.execute('DELETE FROM search_cache WHERE key = ?', (key,))
+                self._db.commit()
+                self._entries -= 1
+                self.misses += 1
+                return False, None
+
+            self._db.execute('UPDATE search_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._db.commit()
+
+        if is_negative:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return True, json.loads(response)
+
+    def put(self, key, response):
+        now = time.time()
+        is_negative = 1 if _is_empty_response(response) else 0
+        with self._lock:
+            existed = self._db.execute('SELECT 1 FROM search_cache WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO search_cache (key, response, is_negative, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(response, ensure_ascii=False), is_negative, now, now)
+            )
+            if not existed:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of max_entries (lock held)"""
+        target = int(self.max_entries * 0.9)
+        excess = self._entries - target
+        self._db.execute(
+            'DELETE FROM search_cache WHERE key IN '
+            '(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)', (excess,)
+        )
+        self._entries = self._db.execute('SELECT COUNT(*) FROM search_cache').fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            'entries': self._entries,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ArtistInfoCache:
+    """Artist metadata cache: in-process LRU backed by a persistent SQLite table"""
+
+    def __init__(self, path=None, ttl=DEFAULT_ARTIST_TTL, lru_size=ARTIST_LRU_SIZE):
+        self.path = Path(path or os.getenv('SPOTIFY_CACHE_PATH') or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS artist_cache (
+                artist_id TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, artist_id, info):
+        """Insert into the LRU (lock held)"""
+        self._lru[artist_id] = info
+        self._lru.move_to_end(artist_id)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, artist_ids):
+        """Return {artist_id: info} for every ID we have fresh data for"""
+        found = {}
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for artist_id in artist_ids:
+                if artist_id in found:
+                    continue
+                if artist_id in self._lru:
+                    self._lru.move_to_end(artist_id)
+                    found[artist_id] = self._lru[artist_id]
+                    self.memory_hits += 1
+                    continue
+                row = self._db.execute(
+                    'SELECT info, fetched_at FROM artist_cache WHERE artist_id = ?', (artist_id,)
+                ).fetchone()
+                if row and row[1] >= cutoff:
+                    info = json.loads(row[0])
+                    self._remember(artist_id, info)
+                    found[artist_id] = info
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, infos):
+        now = time.time()
+        with self._lock:
+            for info in infos:
+                self._remember(info['id'], info)
+            self._db.executemany(
+                'INSERT OR REPLACE INTO artist_cache (artist_id, info, fetched_at) VALUES (?, ?, ?)',
+                [(info['id'], json.dumps(info, ensure_ascii=False), now) for info in infos]
+            )
+            self._db.commit()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedSpotify:
+    """
+    Drop-in wrapper around spotipy.Spotify
+    search() is served from SpotifySearchCache, artist()/artists() from
+    ArtistInfoCache; everything else is passed through.
+    Real network calls go through a rate limiter (default: the process-wide
+    Spotify token bucket) instead of a fixed per-candidate sleep, so cache
+    hits are instant and concurrent workers share one quota.
+    """
+
+    def __init__(self, sp, cache=None, artist_cache=None, limiter=None):
+        self.sp = sp
+        self.cache = cache or SpotifySearchCache()
+        self.artist_cache = artist_cache or ArtistInfoCache(self.cache.path)
+        self.limiter = limiter or spotify_limiter()
+        self.network_calls = 0
+        self._count_lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.sp, name)
+
+    @property
+    def last_from_cache(self):
+        """Whether the most recent search() on this thread was served from cache"""
+        return getattr(self._local, 'from_cache', False)
+
+    def _network(self, fn, *args, **kwargs):
+        with self._count_lock:
+            self.network_calls += 1
+        return self.limiter.call(fn, *args, **kwargs)
+
+    def search(self, q, limit=10, offset=0, type='track', market=None, **kwargs):
+        key = self.cache.make_key(q, type, limit, offset, market)
+        found, response = self.cache.get(key)
+        if found:
+            self._local.from_cache = True
+            return response
+
+        response = self._network(self.sp.search, q=q, limit=limit, offset=offset,
+                                 type=type, market=market, **kwargs)
+        self._local.from_cache = False
+        self.cache.put(key, response)
+        return response
+
+    def artists(self, artist_ids):
+        """Same shape as spotipy's artists(), but cached and batched 50 IDs per call"""
+        artist_ids = list(artist_ids)
+        found = self.artist_cache.get_many(artist_ids)
+
+        missing = list(dict.fromkeys(a for a in artist_ids if a not in found))
+        for i in range(0, len(missing), ARTISTS_PER_CALL):
+            response = self._network(self.sp.artists, missing[i:i + ARTISTS_PER_CALL])
+            fetched = [a for a in response.get('artists', []) if a]
+            self.artist_cache.put_many(fetched)
+            found.update((a['id'], a) for a in fetched)
+
+        return {'artists': [found.get(a) for a in artist_ids]}
+
+    def artist(self, artist_id):
+        info = self.artists([artist_id])['artists'][0]
+        if info is None:
+            raise LookupError(f"Artist not found: {artist_id}")
+        return info
+
+    def prefetch_track_artists(self, queries, limit=1):
+        """
+        Resolve a batch of track queries (e.g. every candidate in one comment)
+        and load all of their primary artists with ONE batched 'artists' call.
+        Later search()/artist() calls for these queries are then cache hits.
+        """
+        artist_ids = []
+        for query in queries:
+            try:
+                items = self.search(q=query, type='track', limit=limit)['tracks']['items']
+            except Exception:
+                continue
+            if items and items[0] and items[0].get('artists'):
+                artist_ids.append(items[0]['artists'][0]['id'])
+        if artist_ids:
+            try:
+                self.artists(artist_ids)
+            except Exception:
+                pass  # is_valid_track falls back to single lookups
+
+    def cache_summary(self):
+        """One-line summary for end-of-run logs"""
+        s = self.cache.stats()
+        a = self.artist_cache.stats()
+        return (f"[SPOTIFY CACHE] {s['hits']} hits, {s['negative_hits']} negative hits, "
+                f"{s['misses']} misses ({s['hit_rate']*100:.1f}% hit rate) | "
+                f"{self.network_calls} API calls | {s['entries']} cached queries | "
+                f"artists {a['hit_rate']*100:.1f}% cached")
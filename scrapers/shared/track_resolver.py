@@ -0,0 +1,416 @@
+"""
+Local fuzzy track resolver shared by the scrapers and the validator
+Most song candidates pulled from comments and playlists are songs we have
+resolved before: they sit in core/tapestry.json, the archives and earlier
+scrapes, every one with its spotify_id. Looking them up here first means
+popular songs never cost a Spotify search (latency + rate limit).
+
+- Index: every (spotify_id, artist, song) found in the project's JSON data
+  and the tapestry store, plus whatever Spotify resolves from now on
+  (learn()), persisted in SQLite. Sources are re-read only when they change.
+- Candidates: in-memory trigram inverted index over the normalized
+  "artist song" text, shortlisted by trigram overlap (Dice coefficient).
+  Trigrams shared by too many tracks ("the", " lo") are skipped.
+- Acceptance: the shortlist is scored with calculate_confidence - the same
+  scoring SpotifyValidatorV2 applies to Spotify's answer - and only a match
+  at min_confidence (EXCELLENT, 0.8) is used. Anything else goes to Spotify.
+
+    resolver = TrackResolver()
+    match = resolver.lookup('Radiohead', 'Creep')        # artist + song
+    match = resolver.lookup_text('Creep Radiohead')      # one free-text candidate
+    resolver.learn(track['id'], track['artists'][0]['name'], track['name'])
+    resolver.close()
+
+    python track_resolver.py build
+    python track_resolver.py stats
+    python track_resolver.py lookup "Radiohead" "Creep"
+    python track_resolver.py lookup --text "Creep Radiohead"
+"""
+
+import argparse
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from spotify_cache import normalize_query
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_INDEX_PATH = Path(__file__).parent / 'cache' / 'track_index.sqlite'
+
+# JSON files that carry resolved songs (spotify_id + artist/song or clean_artist/clean_song)
+SOURCE_GLOBS = ('core/*.json', 'data/**/*.json')
+TAPESTRY_DB = PROJECT_ROOT / 'core' / 'tapestry.sqlite'
+
+DEFAULT_MIN_CONFIDENCE = 0.8  # calculate_confidence's EXCELLENT
+SHORTLIST = 12                # candidates scored with calculate_confidence
+MIN_DICE = 0.3                # trigram overlap below this is not a candidate
+STOPGRAM_FRACTION = 0.05      # trigrams in more than 5% of tracks don't select candidates...
+STOPGRAM_MIN = 500            # ...once they are in more than this many
+RECENT_LOOKUPS = 4096         # free-text answers remembered (the same mentions keep coming back)
+COMMIT_EVERY = 200
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+# ---- scoring (SpotifyValidatorV2's, shared) ----
+
+def similarity(str1, str2):
+    """Calculate similarity between two strings (0.0 to 1.0)"""
+    if not str1 or not str2:
+        return 0.0
+    return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+
+
+def calculate_confidence(original_artist, original_song, matched_artist, matched_song):
+    """
+    Calculate confidence score for a match
+    Returns: (confidence_score, explanation)
+    """
+    artist_sim = similarity(original_artist, matched_artist)
+    song_sim = similarity(original_song, matched_song)
+
+    # Check for artist/song swap (common with Reddit data)
+    swap_artist_sim = similarity(original_artist, matched_song)
+    swap_song_sim = similarity(original_song, matched_artist)
+
+    # If swapped version is better, use that
+    swapped = (swap_artist_sim + swap_song_sim) > (artist_sim + song_sim)
+    if swapped:
+        artist_sim, song_sim = swap_artist_sim, swap_song_sim
+
+    # Weighted: artist 40%, song 60%
+    confidence = (artist_sim * 0.4) + (song_sim * 0.6)
+
+    if confidence >= 0.8:
+        quality = "EXCELLENT"
+    elif confidence >= 0.6:
+        quality = "GOOD"
+    elif confidence >= 0.4:
+        quality = "QUESTIONABLE"
+    else:
+        quality = "POOR"
+
+    explanation = f"{quality} - Artist: {artist_sim:.2f}, Song: {song_sim:.2f}"
+    if swapped:
+        explanation += " (swapped)"
+
+    return confidence, explanation
+
+
+# ---- normalization ----
+
+def match_text(text):
+    """normalize_query + punctuation folded to spaces ("Guns N' Roses" == "guns n roses")"""
+    return ' '.join(_NON_WORD.sub(' ', normalize_query(text).replace("'", '')).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def song_records(data):
+    """(spotify_id, artist, song) for every resolved song anywhere in a JSON document"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            spotify_id = node.get('spotify_id')
+            if spotify_id and isinstance(spotify_id, str):
+                # Validator output keeps the Reddit text in artist/song and Spotify's in clean_*
+                artist = node.get('clean_artist') or node.get('artist')
+                song = node.get('clean_song') or node.get('song')
+                if isinstance(artist, str) and isinstance(song, str) and artist.strip() and song.strip():
+                    yield spotify_id, artist.strip(), song.strip()
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+class TrackResolver:
+    """Trigram-indexed local copy of every song we have a spotify_id for (thread-safe)"""
+
+    def __init__(self, path=None, min_confidence=DEFAULT_MIN_CONFIDENCE, refresh=True):
+        self.path = Path(path or os.getenv('TRACK_INDEX_PATH') or DEFAULT_INDEX_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_confidence = min_confidence
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                spotify_id TEXT PRIMARY KEY,
+                artist TEXT NOT NULL,
+                song TEXT NOT NULL,
+                source TEXT,
+                added REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+        """)
+        self._db.commit()
+        self._uncommitted = 0
+
+        # In-memory index: parallel lists + trigram -> row numbers
+        self.ids, self.artists, self.songs, self.sizes = [], [], [], []
+        self.postings = {}
+        self._keys = set()
+        self._recent = OrderedDict()
+
+        self.hits = 0            # answered locally
+        self.low_confidence = 0  # had candidates, none good enough
+        self.misses = 0          # no candidate at all
+        self.learned = 0
+
+        if refresh:
+            self.refresh()
+        self._load()
+
+    # ---- index ----
+
+    def _index(self, spotify_id, artist, song):
+        key = (match_text(artist), match_text(song))
+        # One entry per song (album/single/remaster IDs of it add nothing)
+        if key in self._keys or not key[0] or not key[1]:
+            return
+        self._keys.add(key)
+        row = len(self.ids)
+        self.ids.append(spotify_id)
+        self.artists.append(artist)
+        self.songs.append(song)
+        grams = trigrams(f"{key[0]} {key[1]}")
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(row)
+
+    def _load(self):
+        for spotify_id, artist, song in self._db.execute('SELECT spotify_id, artist, song FROM tracks ORDER BY rowid'):
+            self._index(spotify_id, artist, song)
+
+    def _sources(self):
+        paths = []
+        for pattern in SOURCE_GLOBS:
+            paths.extend(p for p in PROJECT_ROOT.glob(pattern) if 'cache' not in p.parts)
+        return sorted(set(paths))
+
+    def _read_tapestry_db(self):
+        db = sqlite3.connect(f"file:{TAPESTRY_DB}?mode=ro", uri=True, timeout=30)
+        try:
+            for (data,) in db.execute('SELECT data FROM songs WHERE spotify_id IS NOT NULL'):
+                yield from song_records(json.loads(data))
+        finally:
+            db.close()
+
+    def refresh(self):
+        """Read new/changed source files into the index; returns tracks added"""
+        known = {path: (mtime, size) for path, mtime, size in self._db.execute('SELECT path, mtime, size FROM sources')}
+        changed = []
+        for path in self._sources():
+            stat = path.stat()
+            changed.append((path, stat.st_mtime, stat.st_size, lambda p=path: self._read_json(p)))
+        if TAPESTRY_DB.exists():
+            # The WAL holds recent injections: count its changes too
+            stats = [p.stat() for p in (TAPESTRY_DB, Path(str(TAPESTRY_DB) + '-wal')) if p.exists()]
+            changed.append((TAPESTRY_DB, max(s.st_mtime for s in stats), sum(s.st_size for s in stats),
+                            self._read_tapestry_db))
+        changed = [c for c in changed if known.get(str(c[0])) != (c[1], c[2])]
+        if not changed:
+            return 0
+
+        added = 0
+        now = time.time()
+        with self._lock:
+            for path, mtime, size, read in changed:
+                try:
+                    rows = [(spotify_id, artist, song, path.name, now) for spotify_id, artist, song in read()]
+                except (OSError, ValueError, sqlite3.Error):
+                    continue
+                before = self._db.total_changes
+                self._db.executemany('INSERT OR IGNORE INTO tracks VALUES (?, ?, ?, ?, ?)', rows)
+                added += self._db.total_changes - before
+                self._db.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?)', (str(path), mtime, size))
+            self._db.commit()
+        if added:
+            print(f"[TRACK INDEX] {added:,} new tracks from {len(changed)} changed sources")
+        return added
+
+    @staticmethod
+    def _read_json(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return list(song_records(json.load(f)))
+
+    def learn(self, spotify_id, artist, song, source='spotify'):
+        """Remember a track Spotify resolved, so the next mention of it is answered locally"""
+        if not spotify_id or not artist or not song:
+            return
+        with self._lock:
+            cursor = self._db.execute('INSERT OR IGNORE INTO tracks VALUES (?, ?, ?, ?, ?)',
+                                      (spotify_id, artist, song, source, time.time()))
+            if not cursor.rowcount:
+                return
+            self._index(spotify_id, artist, song)
+            self._recent.clear()  # a remembered miss may be a hit now
+            self.learned += 1
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._db.commit()
+                self._uncommitted = 0
+
+    # ---- lookups ----
+
+    def _shortlist(self, text):
+        """Row numbers of the best trigram-overlap candidates for a normalized text"""
+        grams = trigrams(text)
+        limit = max(STOPGRAM_MIN, len(self.ids) * STOPGRAM_FRACTION)
+        shared = Counter()
+        for gram in grams:
+            rows = self.postings.get(gram)
+            if rows and len(rows) <= limit:
+                shared.update(rows)
+        scored = ((2 * count / (len(grams) + self.sizes[row]), row) for row, count in shared.items())
+        return [row for dice, row in heapq.nlargest(SHORTLIST, scored) if dice >= MIN_DICE]
+
+    def _match(self, row, confidence, explanation):
+        return {
+            'artist': self.artists[row],
+            'song': self.songs[row],
+            'spotify_id': self.ids[row],
+            'spotify_uri': f"spotify:track:{self.ids[row]}",
+            'confidence': confidence,
+            'confidence_explanation': explanation,
+        }
+
+    def _best(self, rows, score):
+        """(match or None, 'hits' / 'low_confidence' / 'misses') for the best-scoring candidate"""
+        best = None
+        for row in rows:
+            confidence, explanation = score(self.artists[row], self.songs[row])
+            if best is None or confidence > best[1]:
+                best = (row, confidence, explanation)
+        if best is None:
+            return None, 'misses'
+        if best[1] < self.min_confidence:
+            return None, 'low_confidence'
+        return self._match(*best), 'hits'
+
+    def _count(self, outcome):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def lookup(self, artist, song):
+        """Local match for an artist + song (scored like the validator) or None"""
+        text = match_text(f"{artist} {song}")
+        with self._lock:
+            rows = self._shortlist(text) if text else []
+            match, outcome = self._best(rows, lambda a, s: calculate_confidence(artist, song, a, s))
+            self._count(outcome)
+            return match
+
+    def lookup_text(self, text, count=True):
+        """
+        Local match for one free-text candidate ("Song Artist", "Artist - Song")
+        The text has no artist/song boundary, so every split is scored with
+        calculate_confidence (which also tries the swapped reading).
+        count=False: a look-ahead that isn't counted in the stats (the answer is
+        remembered, so the real lookup right after it is free).
+        """
+        words = text.replace(' - ', ' ').split()
+        key = match_text(text)
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                match, outcome = self._recent[key]
+                if count:
+                    self._count(outcome)
+                return match
+            splits = [(' '.join(words[i:]), ' '.join(words[:i])) for i in range(1, len(words))]
+
+            def score(artist, song):
+                return max((calculate_confidence(a, s, artist, song) for a, s in splits),
+                           key=lambda result: result[0], default=(0.0, ''))
+
+            match, outcome = self._best(self._shortlist(key) if key and splits else [], score)
+            if count:
+                self._count(outcome)
+            self._recent[key] = (match, outcome)
+            if len(self._recent) > RECENT_LOOKUPS:
+                self._recent.popitem(last=False)
+            return match
+
+    # ---- persistence / stats ----
+
+    def flush(self):
+        with self._lock:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def stats(self):
+        lookups = self.hits + self.low_confidence + self.misses
+        return {
+            'tracks': len(self.ids),
+            'trigrams': len(self.postings),
+            'lookups': lookups,
+            'hits': self.hits,
+            'low_confidence': self.low_confidence,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'learned': self.learned,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"[TRACK INDEX] {s['hits']}/{s['lookups']} lookups resolved locally ({s['hit_rate']*100:.1f}%) | "
+                f"{s['low_confidence']} low-confidence + {s['misses']} misses went to Spotify | "
+                f"{s['learned']} tracks learned | {s['tracks']:,} tracks indexed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fuzzy track resolver')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='Read new/changed sources into the index')
+    sub.add_parser('stats', help='Index size')
+    lookup = sub.add_parser('lookup', help='Resolve one song locally')
+    lookup.add_argument('artist', nargs='?')
+    lookup.add_argument('song', nargs='?')
+    lookup.add_argument('--text', help='Free-text candidate instead of artist + song')
+    lookup.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    resolver = TrackResolver(refresh=args.command != 'stats',
+                             min_confidence=getattr(args, 'min_confidence', DEFAULT_MIN_CONFIDENCE))
+    print(f"Index: {resolver.path} ({len(resolver.ids):,} tracks, {len(resolver.postings):,} trigrams, "
+          f"loaded in {time.perf_counter() - start:.1f}s)")
+
+    if args.command == 'lookup':
+        if args.text:
+            match = resolver.lookup_text(args.text)
+        elif args.artist and args.song:
+            match = resolver.lookup(args.artist, args.song)
+        else:
+            parser.error('give an artist and a song, or --text')
+        if match:
+            print(f"  {match['artist']} - {match['song']}  {match['spotify_id']}")
+            print(f"  {match['confidence']:.2f} {match['confidence_explanation']}")
+        else:
+            print("  No confident local match (would go to Spotify)")
+    resolver.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,933 @@
+"""
+Declarative per-vibe scraper config
+One place for every vibe's search queries and target counts - the
+scrape_<vibe>.py scripts used to carry their own copies. Read by
+vibe_scrapers.py (see scrapers/run_vibes.py for the CLI).
+
+To add a vibe: add its queries here, that's it.
+"""
+
+import importlib.util
+from pathlib import Path
+
+# Search queries per vibe and source.
+# Reddit lists come from scrapers/reddit, YouTube lists from scrapers/youtube;
+# queries that only existed in the older data/ copies are appended after them.
+VIBE_QUERIES = {
+    'angry': {
+        'reddit': [
+            'angry music playlist',
+            'rage songs',
+            'frustrated music',
+            'aggressive songs',
+            'cathartic anger music',
+            'breakup angry songs',
+
+            # From the data/ scraper copies
+            'pissed off need angry music',
+            'furious need aggressive songs',
+            'rage workout music',
+            'angry breakup songs',
+            'frustrated need heavy metal',
+            'mad need loud music'
+        ],
+        'youtube': [
+            'angry music playlist',
+            'rage songs',
+            'aggressive music mix',
+            'furious playlist',
+            'cathartic anger songs',
+            'frustrated music'
+        ],
+    },
+    'anxious': {
+        'reddit': [
+            'anxiety calming music',
+            'songs for panic attacks',
+            'overwhelmed playlist',
+            'nervous energy songs',
+            'existential dread music',
+            'calming anxiety playlist'
+        ],
+        'youtube': [
+            'anxious music playlist',
+            'nervous energy songs',
+            'panic attack playlist',
+            'overwhelming feelings music',
+            'existential dread songs',
+            'calming anxiety music'
+        ],
+    },
+    'bitter': {
+        'reddit': [
+            'bitter breakup songs',
+            'resentful music',
+            'betrayal songs playlist',
+            'angry at ex songs',
+            'bitter feelings music',
+            'songs about being wronged'
+        ],
+        'youtube': [
+            'bitter breakup songs',
+            'resentful music playlist',
+            'betrayal songs',
+            'bitter feelings playlist',
+            'songs about being wronged',
+            'resentment music'
+        ],
+    },
+    'bored': {
+        'reddit': [
+            'bored music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'bored music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room playlist',
+            'understimulated songs',
+            'boring day music'
+        ],
+    },
+    'chaotic': {
+        'reddit': [
+            'chaotic music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'chaotic music playlist',
+            'frantic songs',
+            'overwhelming music',
+            'scattered energy playlist',
+            'unhinged songs',
+            'frenetic music mix'
+        ],
+    },
+    'chill': {
+        'reddit': [
+            'chill music playlist',
+            'relaxing songs',
+            'rainy day music',
+            'morning coffee songs',
+            'sunday vibes playlist',
+            'lofi chill music',
+            'beach summer chill',
+            'ambient relaxing',
+            'peaceful meditative music',
+            'serene calm songs',
+
+            # From the data/ scraper copies
+            'feeling stressed need calm music',
+            'overwhelmed need relaxing songs',
+            'anxious need chill vibes',
+            "can't focus need calm background",
+            'need music to unwind after work',
+            'studying need peaceful music',
+            'rainy day cozy music recommendations',
+            'sunday morning coffee songs',
+            'meditation peaceful ambient',
+            'yoga relaxing instrumental'
+        ],
+        'youtube': [
+            # Original Chill queries
+            'chill vibes playlist',
+            'relaxing music mix',
+            'chill songs to vibe to',
+            'laid back playlist',
+            'mellow music mix',
+            'sunday morning chill',
+
+            # CONSOLIDATED: Peaceful sub-vibes
+            'peaceful music playlist',
+            'serene calm music',
+            'meditative peaceful songs',
+            'tranquil music',
+            'gentle peaceful playlist',
+
+            # CONSOLIDATED: Bored sub-vibes
+            'understimulated music',
+            'waiting room playlist',
+            'monotonous chill music',
+            'restless bored songs',
+
+            # From the data/ scraper copies
+            'lazy sunday playlist',
+            'cozy vibes music',
+            'coffee shop ambience playlist',
+            'just vibing music',
+            'rainy day chill songs',
+            'soft background music',
+            'study chill beats',
+            'calm your mind playlist',
+            'lofi type beats',
+            'perfect chill ratio music'
+        ],
+    },
+    'confident': {
+        'reddit': [
+            'confident music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'confidence music playlist',
+            'bold songs',
+            'boss music mix',
+            'powerful confidence playlist',
+            'unstoppable music',
+            'self assured songs'
+        ],
+    },
+    'dark': {
+        'reddit': [
+            # Original Dark queries
+            'dark music playlist',
+            'gothic songs',
+            'brooding music',
+            'haunting songs',
+            'noir playlist',
+            'villain arc music',
+            'apocalyptic songs',
+
+            # CONSOLIDATED: Anxious sub-vibes
+            'anxious dark songs',
+            'paranoid music',
+            'panic attack music',
+            'overwhelming anxiety songs',
+
+            # CONSOLIDATED: Bitter sub-vibes
+            'bitter cynical music',
+            'jaded songs',
+            'resentful music',
+
+            # CONSOLIDATED: Jealous sub-vibes
+            'jealous dark music',
+            'envious songs',
+            'possessive music',
+
+            # From the data/ scraper copies
+            'feeling depressed need dark music',
+            'going through dark time need songs',
+            'gothic moody music',
+            'haunting atmospheric songs',
+            'eerie unsettling music',
+            'black metal recommendations'
+        ],
+        'youtube': [
+            # Gothic (original)
+            'gothic music playlist',
+            'dark gothic songs',
+
+            # Apocalyptic (original)
+            'apocalyptic soundtrack',
+            'end of world music',
+            'dystopian playlist',
+
+            # Brooding (original)
+            'brooding dark music',
+            'moody brooding songs',
+
+            # Haunting (original)
+            'haunting atmospheric music',
+            'eerie haunting playlist',
+
+            # Noir (original)
+            'film noir soundtrack',
+            'noir jazz music',
+
+            # Villain Arc (original)
+            'villain theme songs',
+            'villain music playlist',
+            'antagonist soundtrack',
+
+            # Witchy (original)
+            'witchy dark music',
+            'witch aesthetic playlist',
+            'occult music',
+
+            # CONSOLIDATED: Anxious sub-vibes
+            'anxious dark music',
+            'paranoid music playlist',
+            'panic attack songs',
+            'overwhelming anxiety music',
+
+            # CONSOLIDATED: Bitter sub-vibes
+            'bitter cynical music',
+            'jaded dark songs',
+            'resentful music',
+
+            # CONSOLIDATED: Jealous sub-vibes
+            'jealous dark music',
+            'envious songs',
+            'possessive music playlist',
+            'insecurity songs dark',
+
+            # From the data/ scraper copies
+            'villain arc energy songs',
+            'walking through dark alley playlist',
+            'plotting my revenge music',
+            'dark aesthetic vibes',
+            'mysterious shadow music',
+            'dark thoughts playlist',
+            'main villain energy songs',
+            'sinister vibe music',
+            'haunting atmosphere songs',
+            'darkness within playlist'
+        ],
+    },
+    'drive': {
+        'reddit': [
+            'road trip playlist',
+            'driving music songs',
+            'night drive playlist',
+            'highway driving music',
+            'scenic drive songs',
+            'alone in car music',
+
+            # From the data/ scraper copies
+            'road trip hype music',
+            'driving fast need adrenaline songs',
+            'highway cruising music',
+            'long drive energetic playlist',
+            'car rides motivation music',
+            'need pump up driving songs'
+        ],
+        'youtube': [
+            'driving music playlist',
+            'road trip songs',
+            'highway music mix',
+            'night drive playlist',
+            'scenic drive music',
+            'alone in car songs',
+
+            # From the data/ scraper copies
+            'songs for driving at 3am',
+            'windows down music',
+            'highway escape playlist',
+            'midnight drive vibes',
+            'main character driving moment',
+            'cruising music perfect vibe',
+            'open road soundtrack',
+            'alone in the car therapy',
+            'driving through the city at night',
+            'road trip essential hits'
+        ],
+    },
+    'energy': {
+        'reddit': [
+            'workout music playlist',
+            'gym pump up songs',
+            'high energy music',
+            'adrenaline songs',
+            'motivational workout music',
+            'sports hype songs',
+            'running music',
+            'intense energy music',
+            'power songs',
+            'get pumped music',
+            'angry workout music',
+            'confident boss songs',
+            'chaotic energy music',
+            'excited hype'
+        ],
+        'youtube': [
+            # Original Energy queries
+            'energy music playlist',
+            'pump up songs',
+            'workout music mix',
+            'running playlist',
+            'sports hype music',
+            'high energy songs',
+
+            # CONSOLIDATED: Angry sub-vibes
+            'angry music playlist',
+            'rage songs',
+            'aggressive music',
+            'furious music workout',
+
+            # CONSOLIDATED: Confident sub-vibes
+            'confident music playlist',
+            'self assured songs',
+            'boss music',
+            'power moves playlist',
+            'unstoppable songs',
+
+            # CONSOLIDATED: Chaotic sub-vibes
+            'chaotic energy music',
+            'frantic playlist',
+            'wild energy songs',
+            'unhinged music',
+
+            # CONSOLIDATED: Excited sub-vibes
+            'excited energy music',
+            'hype anticipation playlist',
+            'adventure music',
+            'pumped up songs',
+
+            # From the data/ scraper copies
+            'songs that hype you up',
+            'workout beast mode playlist',
+            'adrenaline rush music',
+            'running like your life depends on it',
+            'unstoppable energy songs',
+            'boss mode activated playlist',
+            'gym motivation hits',
+            'rage workout music',
+            'feel invincible songs',
+            'absolute power playlist'
+        ],
+    },
+    'excited': {
+        'reddit': [
+            'excited music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'excited music playlist',
+            'hyper songs',
+            'thrilled music mix',
+            'anticipation playlist',
+            'pumped up songs',
+            'exhilarating music'
+        ],
+    },
+    'grateful': {
+        'reddit': [
+            'grateful music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'grateful music playlist',
+            'thankful songs',
+            'appreciation music',
+            'gratitude playlist',
+            'blessed feeling songs',
+            'counting blessings music'
+        ],
+    },
+    'happy': {
+        'reddit': [
+            'happy feel good songs',
+            'uplifting music songs',
+            'songs that make you smile',
+            'mood boosting songs playlist',
+            'feel good music recommendations',
+            'cheerful songs',
+            'positive vibes music',
+            'grateful thankful music',
+            'hopeful optimistic songs',
+            'playful fun music',
+
+            # From the data/ scraper copies
+            'feeling great need upbeat music',
+            'celebrating good news songs',
+            'cheerful positive vibes',
+            'happy mood boost music',
+            'feeling optimistic need happy songs',
+            'good day uplifting music'
+        ],
+        'youtube': [
+            # Original Happy queries
+            'happy music playlist',
+            'feel good songs',
+            'joyful music mix',
+            'upbeat happy playlist',
+            'cheerful songs',
+            'sunshine music',
+
+            # CONSOLIDATED: Grateful sub-vibes
+            'grateful music playlist',
+            'thankful songs',
+            'appreciation music',
+            'blessed songs',
+            'content happy music',
+
+            # CONSOLIDATED: Hopeful sub-vibes
+            'hopeful music playlist',
+            'optimistic songs',
+            'new beginnings music',
+            'rising hope songs',
+            'healing music',
+
+            # CONSOLIDATED: Playful sub-vibes
+            'playful music playlist',
+            'silly fun songs',
+            'whimsical music',
+            'carefree happy songs',
+            'childlike joy music',
+
+            # From the data/ scraper copies
+            'songs that make you smile',
+            'good vibes only playlist',
+            'happiness boost music',
+            'pure serotonin playlist',
+            'main character happy moment',
+            'summer day energy songs',
+            'life is good music',
+            'dancing in your room playlist',
+            'everything is possible songs',
+            'living your best life music'
+        ],
+    },
+    'hopeful': {
+        'reddit': [
+            'hopeful music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'hopeful music playlist',
+            'optimistic songs',
+            'looking forward music',
+            'hope playlist',
+            'better tomorrow songs',
+            'inspiring hope music'
+        ],
+    },
+    'introspective': {
+        'reddit': [
+            'introspective music',
+            'philosophical songs',
+            'self reflection playlist',
+            'contemplative music',
+            'life changes songs',
+            'questioning music'
+        ],
+        'youtube': [
+            'introspective music playlist',
+            'deep thinking songs',
+            'contemplative music',
+            'self reflection playlist',
+            'philosophical songs',
+            'pensive music'
+        ],
+    },
+    'jealous': {
+        'reddit': [
+            'jealous music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'jealous songs playlist',
+            'envious music',
+            'jealousy songs',
+            'seeing ex playlist',
+            'covet songs',
+            'envy music'
+        ],
+    },
+    'night': {
+        'reddit': [
+            'late night music',
+            '3am songs playlist',
+            'midnight drive music',
+            'night contemplative songs',
+            'city nights music',
+            'nighttime playlist',
+            'introspective deep thoughts',
+            'philosophical music',
+            'existential songs',
+            'soul searching',
+
+            # From the data/ scraper copies
+            'late night driving alone music',
+            'midnight melancholic songs',
+            '3am cant sleep music',
+            'nighttime introspective playlist',
+            'dark night atmospheric music',
+            'nocturnal moody vibes'
+        ],
+        'youtube': [
+            # Original Night queries
+            'late night music playlist',
+            '3am songs',
+            'midnight vibes',
+            'night time music',
+            'insomnia playlist',
+            'nighttime feelings',
+
+            # CONSOLIDATED: Introspective sub-vibes
+            'introspective music playlist',
+            'deep thoughts music',
+            'philosophical songs',
+            'existential music',
+            'questioning life playlist',
+            'self discovery songs',
+            'soul searching music',
+            'contemplative playlist',
+            'life changes music',
+            'personal growth songs',
+
+            # From the data/ scraper copies
+            '3am thoughts playlist',
+            'existential crisis music',
+            'staring at ceiling songs',
+            'night owl vibes',
+            'midnight drive through empty streets',
+            'cant sleep thinking music',
+            'deep night contemplation songs',
+            'moon gazing playlist',
+            'night time soul searching',
+            'alone with your thoughts music'
+        ],
+    },
+    'nostalgic': {
+        'reddit': [
+            'nostalgic songs playlist',
+            'childhood songs',
+            '90s nostalgia music',
+            '2000s throwback songs',
+            'simpler times playlist',
+            'teen years songs'
+        ],
+        'youtube': [
+            'nostalgic music playlist',
+            'throwback songs',
+            'memories music',
+            'nostalgia playlist',
+            'reminiscing songs',
+            'good old days music'
+        ],
+    },
+    'party': {
+        'reddit': [
+            'party music playlist',
+            'pregame songs',
+            'club bangers',
+            'house party music',
+            'festival vibes songs',
+            'dance party playlist',
+
+            # From the data/ scraper copies
+            'pregame hype music',
+            'getting ready to go out songs',
+            'club bangers playlist',
+            'party starter high energy',
+            'drunk dancing music',
+            'house party playlist'
+        ],
+        'youtube': [
+            'party music playlist',
+            'dance songs',
+            'club music mix',
+            'hype party playlist',
+            'pregame music',
+            'party vibes',
+
+            # From the data/ scraper copies
+            'pregame bangers that slap',
+            'club hits that go crazy',
+            'dance floor fire playlist',
+            'turn up music loud',
+            'party starter songs',
+            'getting lit playlist',
+            'hype music for the function',
+            'songs that make everyone dance',
+            'absolute bangers playlist',
+            'party anthems 2024'
+        ],
+    },
+    'peaceful': {
+        'reddit': [
+            'peaceful music playlist',
+            'serene songs',
+            'meditative music',
+            'quiet reflection songs',
+            'gentle music playlist'
+        ],
+        'youtube': [
+            'peaceful music playlist',
+            'calm songs',
+            'tranquil music',
+            'serene playlist',
+            'zen music',
+            'peace and calm songs'
+        ],
+    },
+    'playful': {
+        'reddit': [
+            'playful music playlist',
+            'monotonous songs',
+            'restless music',
+            'waiting room music',
+            'understimulated playlist',
+            'songs for boring day'
+        ],
+        'youtube': [
+            'playful music playlist',
+            'silly songs',
+            'fun lighthearted music',
+            'mischievous playlist',
+            'whimsical music',
+            'goofy songs'
+        ],
+    },
+    'romantic': {
+        'reddit': [
+            'love songs playlist',
+            'romantic music',
+            'first love songs',
+            'wedding first dance songs',
+            'soulmate music',
+            'falling in love playlist',
+            'slow dance romantic',
+            'deep love songs',
+            'longing for someone music',
+            'songs about being in love',
+            'romantic ballads',
+
+            # From the data/ scraper copies
+            'falling in love songs',
+            'first date music',
+            'crush butterflies music',
+            'romantic evening dinner songs',
+            'love confession music'
+        ],
+        'youtube': [
+            'romantic music playlist',
+            'love songs',
+            'romantic vibes',
+            'date night playlist',
+            'intimate music',
+            'couple songs',
+
+            # From the data/ scraper copies
+            'falling in love playlist',
+            'butterflies in stomach songs',
+            'slow dance with your person',
+            'hopeless romantic music',
+            'thinking about them songs',
+            'dreamy love playlist',
+            'first date energy music',
+            'love language songs',
+            'soulmate vibes playlist',
+            'romantic movie moment songs'
+        ],
+    },
+    'sad': {
+        'reddit': [
+            'sad songs that make you cry',
+            'heartbreak music',
+            'songs about loneliness',
+            'depressing music',
+            'grief songs',
+            'melancholic music',
+            'sad nostalgic songs',
+            'songs about loss',
+            'breakup playlist',
+            'crying songs',
+            'childhood nostalgia music',
+            '90s nostalgia songs',
+            '2000s throwback',
+            'yearning for the past',
+
+            # From the data/ scraper copies
+            'heartbroken need sad songs',
+            'crying in my room music',
+            'breakup devastated playlist',
+            'grieving loss sad music',
+            'feeling lonely depressing songs',
+            'tears emotional music'
+        ],
+        'youtube': [
+            # Original Sad queries
+            'sad music playlist',
+            'crying songs',
+            'heartbreak music',
+            'melancholic playlist',
+            'depressing songs',
+            'sadness music',
+
+            # CONSOLIDATED: Nostalgic sub-vibes
+            'nostalgic music playlist',
+            'childhood nostalgia songs',
+            '90s nostalgia music',
+            '2000s throwback playlist',
+            'miss the old days songs',
+            'simpler times music',
+            'first love nostalgia',
+            'summer nostalgia playlist',
+            'yearning for the past music',
+
+            # From the data/ scraper copies
+            'songs for crying in the shower',
+            'breakup anthems that hit different',
+            'rainy day feels music',
+            'songs that make you ugly cry',
+            'heartache playlist 3am',
+            'post breakup healing songs',
+            'emotional damage playlist',
+            'songs for when everything hurts',
+            'songs that bring back memories',
+            'throwback hits that hit different',
+            'childhood soundtrack playlist',
+            'songs from simpler times',
+            'music that takes you back',
+            'nostalgia trip playlist',
+            'remember when music',
+            'songs your younger self loved'
+        ],
+    },
+}
+
+VIBES = sorted(VIBE_QUERIES)
+SOURCES = ('reddit', 'youtube')
+
+# Standalone defaults (what each scrape_<vibe>.py used when run directly)
+DEFAULT_TARGETS = {
+    'reddit': {
+        'angry': 1500,
+        'anxious': 1500,
+        'bitter': 500,
+        'bored': 500,
+        'chaotic': 500,
+        'chill': 500,
+        'confident': 500,
+        'dark': 1500,
+        'drive': 1500,
+        'energy': 1500,
+        'excited': 500,
+        'grateful': 500,
+        'happy': 1500,
+        'hopeful': 500,
+        'introspective': 1500,
+        'jealous': 500,
+        'night': 500,
+        'nostalgic': 1500,
+        'party': 1500,
+        'peaceful': 1500,
+        'playful': 500,
+        'romantic': 1500,
+        'sad': 1500,
+    },
+    'youtube': {
+        'angry': 1000,
+        'anxious': 1000,
+        'bitter': 1000,
+        'bored': 1000,
+        'chaotic': 1000,
+        'chill': 1000,
+        'confident': 1000,
+        'dark': 1000,
+        'drive': 1000,
+        'energy': 1000,
+        'excited': 1000,
+        'grateful': 1000,
+        'happy': 1000,
+        'hopeful': 1000,
+        'introspective': 1000,
+        'jealous': 1000,
+        'night': 1000,
+        'nostalgic': 1000,
+        'party': 1000,
+        'peaceful': 1000,
+        'playful': 1000,
+        'romantic': 1000,
+        'sad': 1000,
+    },
+}
+
+# Batch runs (run_scrapers.py / run_reddit_scrapers.py / scrape_all.py)
+SCRAPER_CONFIG = {
+    # Vibes that need more songs (under 1000 in tapestry)
+    'youtube': {
+        'angry': 300,
+        'anxious': 300,
+        'bitter': 300,
+        'bored': 300,
+        'chaotic': 300,
+        'chill': 300,
+        'confident': 300,
+        'dark': 300,
+        'drive': 300,
+        'excited': 300,
+        'grateful': 300,
+        'happy': 300,
+        'hopeful': 300,
+        'introspective': 300,
+        'jealous': 300,
+        'night': 300,
+        'nostalgic': 300,
+        'party': 300,
+        'peaceful': 300,
+        'playful': 300,
+        'romantic': 300,
+        # Skip sad and energy - already over 1000
+    },
+    'reddit': {
+        'angry': 500,
+        'chill': 500,
+        'dark': 500,
+        'drive': 500,
+        'happy': 500,
+        'night': 500,
+        'party': 500,
+        'romantic': 500,
+        'sad': 500,
+        # Add more as needed
+    },
+}
+
+KEYWORD_MAP_FILE = Path(__file__).parent.parent.parent / 'data' / 'reddit' / 'COMPLETE_KEYWORD_MAP.py'
+
+
+def display_name(vibe):
+    """'introspective' -> 'Introspective' (meta_vibe name used in outputs)"""
+    return vibe.capitalize()
+
+
+def load_keyword_map():
+    """COMPLETE_KEYWORD_MAP (sub-vibe -> keywords), or {} if it's missing"""
+    if not KEYWORD_MAP_FILE.exists():
+        return {}
+    spec = importlib.util.spec_from_file_location('complete_keyword_map', KEYWORD_MAP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.COMPLETE_KEYWORD_MAP
+
+
+def keyword_queries(vibe):
+    """Extra queries from the keyword map: one per sub-vibe of this meta-vibe"""
+    prefix = f"{display_name(vibe)} - "
+    return [
+        f"{sub_vibe[len(prefix):].lower()} songs"
+        for sub_vibe in load_keyword_map()
+        if sub_vibe.startswith(prefix)
+    ]
+
+
+def get_queries(vibe, source, with_keywords=False):
+    """Query list for one vibe/source (optionally extended from the keyword map)"""
+    if vibe not in VIBE_QUERIES:
+        raise ValueError(f"Unknown vibe: {vibe} (known: {', '.join(VIBES)})")
+    queries = list(VIBE_QUERIES[vibe][source])
+    if with_keywords:
+        queries += [q for q in keyword_queries(vibe) if q not in queries]
+    return queries
@@ -0,0 +1,694 @@
+"""
+One scraper engine for every vibe
+Replaces the 46 copy-pasted scrape_<vibe>.py classes (plus their data/
+copies) that only differed in their query lists. Queries and targets now
+live in vibe_config.py; this module has one Reddit and one YouTube
+scraper parameterized by vibe.
+
+Many vibes can run in ONE process: Spotify/Reddit/YouTube clients, the
+Spotify cache and the rate limiters are built once (ScraperClients) and
+shared by every vibe, instead of being rebuilt by a subprocess per vibe.
+The SeenRegistry (seen_registry.py) is shared the same way: a Reddit post
+or YouTube playlist mined for one vibe is skipped by every other vibe and
+by later runs. So is the TrackResolver (track_resolver.py): songs already
+resolved once (tapestry, archives, earlier scrapes) are matched locally
+and only the rest go to Spotify search - and only if the CandidateScorer
+(candidate_scorer.py) thinks they are worth a search.
+
+Usage:
+    from vibe_scrapers import run_vibes
+    run_vibes(['reddit', 'youtube'], ['dark', 'night'], parallel=2)
+
+or from the command line: python scrapers/run_vibes.py --help
+"""
+
+import os
+import re
+import sys
+import random
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+import spotipy
+from spotipy.oauth2 import SpotifyClientCredentials
+
+import mention_extractor
+from checkpoint_utils import CheckpointManager
+from spotify_cache import CachedSpotify
+from reddit_engine import ConcurrentRedditEngine
+from rate_limit import is_transient_error, youtube_limiter
+from seen_registry import SeenRegistry
+from track_resolver import TrackResolver
+from candidate_scorer import CandidateScorer
+from vibe_config import VIBES, DEFAULT_TARGETS, display_name, get_queries
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / 'scrapers' / 'test_results'
+
+# Tapestry pre-filter + search diversity helpers (shared with the data/ scrapers)
+sys.path.append(str(PROJECT_ROOT / 'data' / 'youtube' / 'scrapers'))
+from improved_search_utils import load_tapestry_spotify_ids, diversify_queries, get_diverse_search_params
+
+# Every place the per-vibe scripts used to look for credentials
+ENV_FILES = [
+    PROJECT_ROOT / 'scrapers' / '.env',
+    PROJECT_ROOT / 'data' / 'reddit' / '.env',
+    PROJECT_ROOT / 'data' / 'youtube' / '.env',
+    PROJECT_ROOT / 'data' / 'spotify' / '.env',
+]
+
+OUTPUT_NAMES = {
+    'reddit': '{vibe}_smart_extraction.json',
+    'youtube': '{vibe}_youtube_extraction.json',
+}
+
+
+class ScraperClients:
+    """
+    API clients shared by all vibe scrapers in the process
+    Built lazily, so a Reddit-only run never needs a YouTube key.
+    """
+
+    def __init__(self):
+        load_dotenv()
+        for env_file in ENV_FILES:
+            load_dotenv(env_file)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sp = None
+        self._reddit = None
+        self._known_ids = None
+        self._registry = None
+        self._resolver = None
+        self._scorer = None
+
+    @property
+    def sp(self):
+        with self._lock:
+            if self._sp is None:
+                self._sp = CachedSpotify(spotipy.Spotify(
+                    auth_manager=SpotifyClientCredentials(
+                        client_id=os.getenv('SPOTIFY_CLIENT_ID'),
+                        client_secret=os.getenv('SPOTIFY_CLIENT_SECRET')
+                    )
+                ))
+            return self._sp
+
+    @property
+    def reddit(self):
+        """Template praw.Reddit (the engine clones it per worker thread)"""
+        with self._lock:
+            if self._reddit is None:
+                import praw
+                self._reddit = praw.Reddit(
+                    client_id=os.getenv('REDDIT_CLIENT_ID'),
+                    client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+                    user_agent=os.getenv('REDDIT_USER_AGENT')
+                )
+            return self._reddit
+
+    @property
+    def youtube(self):
+        """YouTube service, one per thread (googleapiclient/httplib2 isn't thread safe)"""
+        if not hasattr(self._local, 'youtube'):
+            from googleapiclient.discovery import build
+            api_key = os.getenv('YOUTUBE_API_KEY')
+            if not api_key:
+                raise ValueError("YOUTUBE_API_KEY not found in .env")
+            self._local.youtube = build('youtube', 'v3', developerKey=api_key)
+        return self._local.youtube
+
+    @property
+    def registry(self):
+        """Cross-vibe registry of already scraped posts/comments/playlists/videos"""
+        with self._lock:
+            if self._registry is None:
+                self._registry = SeenRegistry()
+            return self._registry
+
+    @property
+    def resolver(self):
+        """Local track index tried before every Spotify search"""
+        with self._lock:
+            if self._resolver is None:
+                self._resolver = TrackResolver()
+            return self._resolver
+
+    @property
+    def scorer(self):
+        """Candidate scorer that drops junk mentions before any Spotify search"""
+        with self._lock:
+            if self._scorer is None:
+                self._scorer = CandidateScorer()
+            return self._scorer
+
+    def flush(self):
+        """Commit learned tracks without closing anything (long-lived worker processes)"""
+        if self._resolver is not None:
+            self._resolver.flush()
+
+    def close(self):
+        """Persist the registry and learned tracks (call once all vibes are done)"""
+        if self._registry is not None:
+            print(self._registry.summary())
+            self._registry.close()
+            self._registry = None
+        if self._resolver is not None:
+            print(self._resolver.summary())
+            self._resolver.close()
+            self._resolver = None
+        if self._scorer is not None and self._scorer.counts:
+            print(self._scorer.summary())
+
+    @property
+    def known_spotify_ids(self):
+        """Spotify IDs already in the tapestry (loaded once for all vibes)"""
+        with self._lock:
+            if self._known_ids is None:
+                self._known_ids = load_tapestry_spotify_ids()
+            return self._known_ids
+
+
+class RedditVibeScraper:
+    """Reddit smart scraper for one vibe"""
+
+    def __init__(self, vibe, clients=None, skip_known=False, with_keywords=False, use_registry=True,
+                 score_candidates=True):
+        self.vibe = vibe
+        self.name = display_name(vibe)
+        self.clients = clients or ScraperClients()
+        self.queries = get_queries(vibe, 'reddit', with_keywords)
+        # Skip songs already in the tapestry (the data/ scrapers did this)
+        self.existing_spotify_ids = self.clients.known_spotify_ids if skip_known else set()
+        # Skip posts/comments already mined for any vibe
+        self.registry = self.clients.registry if use_registry else None
+        # Drop junk candidates before searching them (False: search every candidate)
+        self.score_candidates = score_candidates
+
+    @property
+    def sp(self):
+        # Built on first use, so mention-finding alone (dump dry runs) needs no Spotify credentials
+        return self.clients.sp
+
+    def is_music_comment(self, text):
+        """Check if comment is actually about music"""
+        return mention_extractor.is_music_comment(text)
+
+    def find_music_mentions(self, text):
+        """Find potential song mentions - more conservative patterns (precompiled, see mention_extractor.py)"""
+        return mention_extractor.find_music_mentions(text)
+
+    def is_valid_track(self, track):
+        """Validate Spotify result is actual music track"""
+        try:
+            # Check if it's a track type
+            if track.get('type') != 'track':
+                return False
+
+            # Get artist info to filter out spoken word/podcasts (cached, batch-prefetched)
+            artist_id = track['artists'][0]['id']
+            artist_info = self.sp.artist(artist_id)
+
+            # Filter out very obscure artists (likely false matches)
+            if artist_info.get('popularity', 0) < 3:
+                return False
+
+            # Check genres for spoken word indicators
+            genres = artist_info.get('genres', [])
+            spoken_genres = ['spoken word', 'audiobook', 'podcast', 'comedy']
+            if any(sg in ' '.join(genres).lower() for sg in spoken_genres):
+                return False
+
+            return True
+        except:
+            return True  # If we can't check, allow it (TRUE Ananki will catch false positives)
+
+    def search_spotify(self, query_text):
+        """Search Spotify with validation (songs resolved before are matched locally first)"""
+        try:
+            # Everything in the local index was resolved (and checked) by an earlier run
+            local = self.clients.resolver.lookup_text(query_text)
+            if local:
+                if local['spotify_id'] in self.existing_spotify_ids:
+                    return None
+                return {
+                    'artist': local['artist'],
+                    'song': local['song'],
+                    'spotify_id': local['spotify_id'],
+                    'spotify_uri': local['spotify_uri'],
+                    'query_used': query_text[:100]
+                }
+
+            results = self.sp.search(q=query_text, type='track', limit=1)
+            if results['tracks']['items']:
+                track = results['tracks']['items'][0]
+
+                # Skip if already in tapestry
+                if track['id'] in self.existing_spotify_ids:
+                    return None
+
+                # Validate it's actually music
+                if not self.is_valid_track(track):
+                    return None
+
+                self.clients.resolver.learn(track['id'], track['artists'][0]['name'], track['name'])
+                return {
+                    'artist': track['artists'][0]['name'],
+                    'song': track['name'],
+                    'spotify_id': track['id'],
+                    'spotify_uri': track['uri'],
+                    'query_used': query_text[:100]
+                }
+            return None
+        except Exception as e:
+            if is_transient_error(e):
+                raise  # outage / rate limit, not "no match": the comment must not be recorded as scraped
+            return None
+
+    def extract_from_comment(self, comment_text, source_url, score, post_title='', post_body=''):
+        """Extract with full context"""
+        mentions = [m for m in mention_extractor.find_mentions(comment_text) if len(m.text) <= 100]
+        songs = []
+        seen = set()
+
+        # Candidates the local track index can't answer need a Spotify search;
+        # only the ones the scorer accepts get one
+        resolver = self.clients.resolver
+        remote = {m.text for m in mentions if not resolver.lookup_text(m.text, count=False)}
+        scorer = self.clients.scorer if self.score_candidates else None
+        if scorer is not None:
+            mentions = [m for m in mentions if m.text not in remote or scorer.accept(m)]
+
+        # Batch-load artist info for every candidate that will be searched (one
+        # 'artists' call); is_valid_track's self.sp.artist() is then served from
+        # the cache. search_spotify reuses the remembered local lookups.
+        self.sp.prefetch_track_artists([m.text for m in mentions if m.text in remote])
+
+        for mention in mentions:
+            candidate_text, pattern_type = mention.text, mention.pattern
+            result = self.search_spotify(candidate_text)
+            if scorer is not None and candidate_text in remote:
+                scorer.record(result is not None)
+
+            if result:
+                key = (result['artist'].lower(), result['song'].lower())
+                if key not in seen:
+                    seen.add(key)
+                    songs.append({
+                        **result,
+                        'extraction_pattern': pattern_type,
+                        'comment_score': score,
+                        'source_url': source_url,
+                        'post_title': post_title,
+                        'comment_text': comment_text
+                    })
+
+        return songs
+
+    def scrape(self, target_songs, output_file):
+        """Scrape this vibe with checkpointing, write output_file"""
+        cp = CheckpointManager(self.name, source='reddit')
+
+        print("\n" + "="*70)
+        print(f"SMART SCRAPING - {self.name.upper()} VIBES")
+        print("="*70)
+        print(f"Target: {target_songs} songs")
+        print("Workflow: Scrape -> TRUE Ananki -> Tapestry")
+        print("="*70)
+
+        # Posts, comment trees and Spotify resolution are fetched concurrently
+        # behind the shared rate limiters (backs off on 429s instead of stopping)
+        engine = ConcurrentRedditEngine(self.clients.reddit, self.extract_from_comment,
+                                        registry=self.registry, vibe=self.vibe)
+        engine.run(self.queries, cp, target_songs)
+
+        return cp.finalize(output_file, target_songs)
+
+
+class YouTubeVibeScraper:
+    """
+    YouTube smart scraper for one vibe
+    Gets REAL HUMAN EMOTIONAL CONTEXT from playlist titles/descriptions
+    and high-like comments.
+    """
+
+    def __init__(self, vibe, clients=None, diversify=False, skip_known=False, with_keywords=False,
+                 use_registry=True):
+        self.vibe = vibe
+        self.name = display_name(vibe)
+        self.clients = clients or ScraperClients()
+        self.sp = self.clients.sp
+        self.limiter = youtube_limiter()
+        self.queries = get_queries(vibe, 'youtube', with_keywords)
+        # Randomized order/region and query modifiers (the data/ scrapers did this)
+        self.diversify = diversify
+        self.existing_spotify_ids = self.clients.known_spotify_ids if skip_known else set()
+        # Skip playlists/videos already mined for any vibe
+        self.registry = self.clients.registry if use_registry else None
+
+    @property
+    def youtube(self):
+        return self.clients.youtube
+
+    def clean_song_title(self, title):
+        """Clean YouTube video title to get actual song name"""
+        title = re.sub(r'\s*\(Official.*?\)', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\[Official.*?\]', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\(Lyrics?\)', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\[Lyrics?\]', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\(Lyric Video\)', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\(Audio\)', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'\s*\(Visuali[sz]er\)', '', title, flags=re.IGNORECASE)
+        title = re.sub(r'^\d+[\.\)]\s*', '', title)
+        return title.strip()
+
+    def parse_video_title(self, title):
+        """Extract artist and song from YouTube title"""
+        title = self.clean_song_title(title)
+
+        # Pattern: Artist - Song
+        if ' - ' in title:
+            parts = title.split(' - ', 1)
+            return parts[0].strip(), parts[1].strip()
+
+        # Pattern: "Song" by Artist
+        by_match = re.search(r'["\'](.+?)["\'] by (.+)', title, re.IGNORECASE)
+        if by_match:
+            return by_match.group(2).strip(), by_match.group(1).strip()
+
+        return None, None
+
+    def search_spotify(self, artist, song):
+        """Validate with Spotify (songs resolved before are matched locally first)"""
+        try:
+            local = self.clients.resolver.lookup(artist, song)
+            if local:
+                if local['spotify_id'] in self.existing_spotify_ids:
+                    return None
+                return {
+                    'artist': local['artist'],
+                    'song': local['song'],
+                    'spotify_id': local['spotify_id'],
+                    'spotify_uri': local['spotify_uri']
+                }
+
+            query = f"{artist} {song}"
+            results = self.sp.search(q=query, type='track', limit=1)
+            if results['tracks']['items']:
+                track = results['tracks']['items'][0]
+                if track['id'] in self.existing_spotify_ids:
+                    return None
+                self.clients.resolver.learn(track['id'], track['artists'][0]['name'], track['name'])
+                return {
+                    'artist': track['artists'][0]['name'],
+                    'song': track['name'],
+                    'spotify_id': track['id'],
+                    'spotify_uri': track['uri']
+                }
+            return None
+        except Exception as e:
+            if is_transient_error(e):
+                raise  # outage / rate limit, not "no match": the video must not be recorded as scraped
+            return None
+
+    def get_playlist_videos(self, playlist_id):
+        """Get all videos from a playlist"""
+        try:
+            videos = []
+            request = self.youtube.playlistItems().list(
+                part='snippet',
+                playlistId=playlist_id,
+                maxResults=50
+            )
+
+            while request and len(videos) < 100:  # Limit to 100 videos per playlist
+                response = self.limiter.call(request.execute)
+                videos.extend(response.get('items', []))
+                request = self.youtube.playlistItems().list_next(request, response)
+
+            return videos
+        except Exception as e:
+            print(f"  Error getting playlist: {e}")
+            return []
+
+    def get_video_comments(self, video_id, max_comments=20):
+        """Get top comments from a video"""
+        try:
+            request = self.youtube.commentThreads().list(
+                part='snippet',
+                videoId=video_id,
+                order='relevance',
+                maxResults=max_comments,
+                textFormat='plainText'
+            )
+            response = self.limiter.call(request.execute)
+
+            comments = []
+            for item in response.get('items', []):
+                snippet = item['snippet']['topLevelComment']['snippet']
+                comments.append({
+                    'text': snippet['textDisplay'],
+                    'likes': snippet['likeCount']
+                })
+
+            return comments
+        except:
+            return []
+
+    def search_playlists(self, query, max_results=10):
+        """Search for playlists"""
+        try:
+            kwargs = {'part': 'snippet', 'q': query, 'type': 'playlist', 'maxResults': max_results}
+            if self.diversify:
+                params = get_diverse_search_params()
+                kwargs['maxResults'] = max_results * 2  # Get more, then randomize
+                kwargs['order'] = params['order']  # Varies each run
+                kwargs['regionCode'] = params['regionCode']  # Regional diversity
+
+            request = self.youtube.search().list(**kwargs)
+            response = self.limiter.call(request.execute)
+
+            playlists = []
+            for item in response.get('items', []):
+                playlists.append({
+                    'id': item['id']['playlistId'],
+                    'title': item['snippet']['title'],
+                    'description': item['snippet']['description']
+                })
+
+            if self.diversify:
+                # Randomize playlist selection for diversity
+                random.shuffle(playlists)
+                playlists = playlists[:max_results]
+
+            return playlists
+        except Exception as e:
+            print(f"  Error searching playlists: {e}")
+            return []
+
+    def scrape(self, target_songs, output_file):
+        """Scrape this vibe with checkpointing, write output_file"""
+        cp = CheckpointManager(self.name, source='youtube')
+
+        queries = self.queries
+        if self.diversify:
+            # Add diversity modifiers (time, quality, etc.)
+            queries = diversify_queries(queries)
+
+        print("\n" + "="*70)
+        print(f"YOUTUBE SCRAPING - {self.name.upper()} VIBES")
+        print("="*70)
+        print(f"Target: {target_songs} songs")
+        print("Workflow: Scrape -> TRUE Ananki -> Tapestry")
+        print("="*70)
+
+        for query in queries:
+            if len(cp.all_results) >= target_songs:
+                break
+
+            print(f"\n[{self.name}] Searching: '{query}'")
+
+            # Find playlists
+            playlists = self.search_playlists(query, max_results=10 if self.diversify else 5)
+
+            for playlist in playlists:
+                if len(cp.all_results) >= target_songs:
+                    break
+
+                playlist_id = playlist['id']
+                playlist_title = playlist['title'][:50].encode('ascii', 'ignore').decode()
+
+                # SKIP if we've already processed this playlist
+                if cp.is_playlist_processed(playlist_id):
+                    print(f"  SKIP (already processed): {playlist_title}...")
+                    continue
+                if self.registry is not None and self.registry.seen('youtube_playlist', playlist_id):
+                    print(f"  SKIP (scraped for another vibe / earlier run): {playlist_title}...")
+                    continue
+
+                print(f"  Playlist: {playlist_title}...")
+
+                # Get videos from playlist
+                videos = self.get_playlist_videos(playlist_id)
+                finished = True
+                failed = False
+
+                for video in videos[:30]:  # First 30 songs per playlist
+                    if len(cp.all_results) >= target_songs:
+                        finished = False
+                        break
+
+                    video_id = video['snippet']['resourceId']['videoId']
+                    video_url = f"https://youtube.com/watch?v={video_id}"
+
+                    if video_url in cp.scraped_urls:
+                        continue
+                    if self.registry is not None and self.registry.seen('youtube_video', video_id):
+                        continue
+
+                    # Parse song info
+                    title = video['snippet']['title']
+                    artist, song = self.parse_video_title(title)
+
+                    # Validate with Spotify
+                    spotify_result = None
+                    if artist and song:
+                        try:
+                            spotify_result = self.search_spotify(artist, song)
+                        except Exception as e:
+                            # Retried on resume / by other vibes: only answered videos are remembered
+                            print(f"  Spotify unavailable for {video_url}: {e}")
+                            failed = True
+                            continue
+
+                    cp.scraped_urls.add(video_url)
+                    if self.registry is not None:
+                        self.registry.add('youtube_video', video_id, self.vibe)
+
+                    if spotify_result:
+                        # Get comments for emotional context
+                        comments = self.get_video_comments(video_id, max_comments=10)
+
+                        # Find best emotional comment
+                        best_comment = ""
+                        best_likes = 0
+                        for comment in comments:
+                            if comment['likes'] > best_likes and len(comment['text']) > 20:
+                                best_comment = comment['text']
+                                best_likes = comment['likes']
+
+                        song_data = {
+                            **spotify_result,
+                            'source_url': video_url,
+                            'source': 'youtube',
+                            'post_title': playlist['title'],
+                            'comment_text': best_comment if best_comment else playlist['description'][:500],
+                            'comment_score': best_likes,
+                            'playlist_id': playlist_id
+                        }
+
+                        cp.update_progress([song_data])
+
+                if failed:
+                    continue  # walk it again on resume for the videos Spotify didn't answer
+                cp.mark_playlist_processed(playlist_id)
+                # Other vibes only skip playlists that were walked to the end
+                if finished and self.registry is not None:
+                    self.registry.add('youtube_playlist', playlist_id, self.vibe)
+
+        return cp.finalize(output_file, target_songs)
+
+
+SCRAPERS = {
+    'reddit': RedditVibeScraper,
+    'youtube': YouTubeVibeScraper,
+}
+
+
+def output_path(source, vibe, output_dir=None):
+    return Path(output_dir or DEFAULT_OUTPUT_DIR) / OUTPUT_NAMES[source].format(vibe=vibe)
+
+
+def run_vibe(source, vibe, target_songs=None, clients=None, output_dir=None, **options):
+    """Scrape one vibe from one source, returns the unique songs written"""
+    if target_songs is None:
+        target_songs = DEFAULT_TARGETS[source][vibe]
+    output = output_path(source, vibe, output_dir)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if source == 'reddit':
+        options.pop('diversify', None)
+    else:
+        options.pop('score_candidates', None)
+    scraper = SCRAPERS[source](vibe, clients, **options)
+    return scraper.scrape(target_songs, output)
+
+
+def run_vibes(sources, vibes=None, targets=None, parallel=1, output_dir=None, clients=None, **options):
+    """
+    Scrape many vibes in one process with shared clients/caches/limiters
+
+    targets: {source: {vibe: n}} or a single int for everything
+             (default: DEFAULT_TARGETS)
+    parallel: vibes scraped at once (API limits are shared, not multiplied)
+    Returns {(source, vibe): song count, or None if it failed}
+    """
+    # Clients passed in are shared with the caller's other runs: the caller closes them
+    own = clients is None
+    clients = clients or ScraperClients()
+    vibes = vibes or VIBES
+    jobs = [(source, vibe) for source in sources for vibe in vibes]
+
+    def target_for(source, vibe):
+        if isinstance(targets, int):
+            return targets
+        if targets and vibe in targets.get(source, {}):
+            return targets[source][vibe]
+        return DEFAULT_TARGETS[source][vibe]
+
+    def run_job(job):
+        source, vibe = job
+        try:
+            songs = run_vibe(source, vibe, target_for(source, vibe), clients, output_dir, **options)
+            print(f"\n  [{source.upper()}] {display_name(vibe)}: {len(songs)} unique songs")
+            return len(songs)
+        except Exception as e:
+            print(f"\n  [{source.upper()}] {display_name(vibe)} FAILED: {e}")
+            return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            counts = list(pool.map(run_job, jobs))
+    finally:
+        if own:
+            clients.close()
+
+    print(clients.sp.cache_summary())
+    return dict(zip(jobs, counts))
+
+
+def run_vibe_cli(source, vibe, output_dir=None, **options):
+    """
+    Entry point for the thin scrape_<vibe>.py scripts
+    Usage: python scrape_<vibe>.py [target_songs]
+    """
+    target_songs = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TARGETS[source][vibe]
+    clients = ScraperClients()
+    try:
+        results = run_vibe(source, vibe, target_songs, clients, output_dir, **options)
+    finally:
+        clients.close()
+    output = output_path(source, vibe, output_dir)
+    print(clients.sp.cache_summary())
+
+    print(f"\n{'='*70}")
+    print(f"SCRAPING COMPLETE!")
+    print(f"{'='*70}")
+    print(f"Total unique songs: {len(results)}")
+    print(f"All validated with Spotify IDs!")
+    print(f"\nSaved to: {output}")
+    print(f"\nNext step: python data/scripts/true_ananki_claude_api.py {output}")
+    return results